@@ -0,0 +1,85 @@
+"""Schéma initial : utilisateurs, types de congés, demandes et soldes
+
+Schéma tel que le créait Base.metadata.create_all avant l'introduction d'Alembic.
+Une base créée par une version antérieure de l'application se marque avec
+"alembic stamp 0001" avant "alembic upgrade head".
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("first_name", sa.String(), nullable=True),
+        sa.Column("last_name", sa.String(), nullable=True),
+        sa.Column("hashed_password", sa.String(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("is_admin", sa.Boolean(), nullable=True),
+        sa.Column("is_approver", sa.Boolean(), nullable=True),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "leave_types",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("requires_proof", sa.Boolean(), nullable=True),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("default_days", sa.Float(), nullable=True),
+    )
+    op.create_index("ix_leave_types_id", "leave_types", ["id"])
+    op.create_index("ix_leave_types_name", "leave_types", ["name"], unique=True)
+
+    op.create_table(
+        "leave_requests",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("start_date", sa.Date(), nullable=True),
+        sa.Column("end_date", sa.Date(), nullable=True),
+        sa.Column("days_count", sa.Float(), nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("comment", sa.String(), nullable=True),
+        sa.Column("response_comment", sa.String(), nullable=True),
+        sa.Column("proof_document", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("approver_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("leave_type_id", sa.Integer(), sa.ForeignKey("leave_types.id"), nullable=True),
+    )
+    op.create_index("ix_leave_requests_id", "leave_requests", ["id"])
+    op.create_index("ix_leave_requests_start_date", "leave_requests", ["start_date"])
+    op.create_index("ix_leave_requests_end_date", "leave_requests", ["end_date"])
+
+    op.create_table(
+        "leave_balances",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("balance", sa.Float(), nullable=True),
+        sa.Column("year", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("leave_type_id", sa.Integer(), sa.ForeignKey("leave_types.id"), nullable=True),
+    )
+    op.create_index("ix_leave_balances_id", "leave_balances", ["id"])
+    op.create_index("ix_leave_balances_year", "leave_balances", ["year"])
+
+
+def downgrade() -> None:
+    op.drop_table("leave_balances")
+    op.drop_table("leave_requests")
+    op.drop_table("leave_types")
+    op.drop_table("users")
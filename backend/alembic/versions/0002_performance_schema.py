@@ -0,0 +1,395 @@
+"""Tables, colonnes et index ajoutés depuis le schéma initial
+
+- colonnes leave_types.consumes_balance, users.email_digest,
+  leave_requests.start_half_day et end_half_day ;
+- tables email_outbox, cache_generations, leave_request_months et daily_occupancy,
+  ces deux dernières remplies à partir des demandes existantes ;
+- contrainte unique (user_id, leave_type_id, year) sur leave_balances ;
+- index de pagination (created_at, id), (status, created_at, id) et
+  (employee_id, created_at, id), index de détection des chevauchements,
+  index des clés étrangères approver_id et leave_type_id ;
+- suppression des index ix_<table>_id, redondants avec les clés primaires.
+
+Jusqu'ici le schéma était créé par Base.metadata.create_all au démarrage : une
+base existante peut donc déjà contenir une partie de ces objets. Chaque étape
+vérifie ce qui existe avant de le créer, si bien qu'une base marquée 0001
+("alembic stamp 0001") passe en 0002 quelle que soit la version qui l'a créée.
+Les soldes en double pour un même (user_id, leave_type_id, year) sont supprimés
+avant la création de la contrainte unique : seule la ligne d'id le plus petit (la
+plus ancienne) est gardée. Faute d'ORDER BY, rien ne garantit que c'était celle que
+l'application lisait : chaque ligne supprimée est journalisée avec son solde pour
+permettre une correction manuelle.
+
+Les calculs repris de l'application (mois couverts, jours ouvrés) sont copiés ici
+tels qu'ils étaient : une évolution ultérieure du code ne change pas cette migration.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+import logging
+from collections import Counter
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import FrozenSet, List
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import false, true
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# Types de congés non débités du solde dans les données initiales (app.utils.init_db)
+NON_CONSUMING_LEAVE_TYPES = ("Congé maladie", "Congé sans solde")
+
+# Index ix_<table>_id créés par index=True sur les clés primaires
+REDUNDANT_ID_INDEXES = ("users", "leave_types", "leave_requests", "leave_balances", "email_outbox")
+
+LEAVE_REQUEST_INDEXES = {
+    "ix_leave_requests_created_at_id": ["created_at", "id"],
+    "ix_leave_requests_status_created_at_id": ["status", "created_at", "id"],
+    "ix_leave_requests_employee_id_created_at_id": ["employee_id", "created_at", "id"],
+    "ix_leave_requests_employee_id_start_date_end_date": ["employee_id", "start_date", "end_date"],
+    "ix_leave_requests_approver_id": ["approver_id"],
+    "ix_leave_requests_leave_type_id": ["leave_type_id"],
+}
+
+# Tables allégées pour le remplissage, indépendantes des modèles
+leave_types = sa.table(
+    "leave_types",
+    sa.column("name", sa.String),
+    sa.column("consumes_balance", sa.Boolean),
+)
+users = sa.table("users", sa.column("email_digest", sa.Boolean))
+leave_requests = sa.table(
+    "leave_requests",
+    sa.column("id", sa.Integer),
+    sa.column("start_date", sa.Date),
+    sa.column("end_date", sa.Date),
+    sa.column("status", sa.String),
+    sa.column("leave_type_id", sa.Integer),
+)
+leave_request_months = sa.table(
+    "leave_request_months",
+    sa.column("leave_request_id", sa.Integer),
+    sa.column("month", sa.Date),
+    sa.column("status", sa.String),
+)
+daily_occupancy = sa.table(
+    "daily_occupancy",
+    sa.column("day", sa.Date),
+    sa.column("leave_type_id", sa.Integer),
+    sa.column("absent_count", sa.Integer),
+)
+leave_balances = sa.table(
+    "leave_balances",
+    sa.column("id", sa.Integer),
+    sa.column("user_id", sa.Integer),
+    sa.column("leave_type_id", sa.Integer),
+    sa.column("year", sa.Integer),
+    sa.column("balance", sa.Float),
+)
+
+
+# Copies figées de app.crud.leave_request.month_starts et de
+# app.utils.working_days.working_days_between (calendrier français, le seul
+# disponible à l'écriture de cette migration)
+def _month_starts(start_date: date, end_date: date) -> List[date]:
+    months = []
+    current = start_date.replace(day=1)
+    while current <= end_date:
+        months.append(current)
+        current = (current + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def _easter_sunday(year: int) -> date:
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+@lru_cache(maxsize=None)
+def _public_holidays(year: int) -> FrozenSet[date]:
+    easter = _easter_sunday(year)
+    return frozenset([
+        date(year, 1, 1),
+        easter + timedelta(days=1),
+        date(year, 5, 1),
+        date(year, 5, 8),
+        easter + timedelta(days=39),
+        easter + timedelta(days=50),
+        date(year, 7, 14),
+        date(year, 8, 15),
+        date(year, 11, 1),
+        date(year, 11, 11),
+        date(year, 12, 25),
+    ])
+
+
+def _working_days_between(start_date: date, end_date: date) -> List[date]:
+    days = (start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1))
+    return [day for day in days if day.weekday() < 5 and day not in _public_holidays(day.year)]
+
+
+def _inspector() -> sa.Inspector:
+    # Un inspecteur par appel : il met ses résultats en cache
+    return sa.inspect(op.get_bind())
+
+
+def _has_table(table: str) -> bool:
+    return _inspector().has_table(table)
+
+
+def _has_column(table: str, column: str) -> bool:
+    return column in {c["name"] for c in _inspector().get_columns(table)}
+
+
+def _has_index(table: str, index: str) -> bool:
+    return index in {i["name"] for i in _inspector().get_indexes(table)}
+
+
+def _has_unique_constraint(table: str, columns: List[str]) -> bool:
+    return any(
+        sorted(constraint["column_names"]) == sorted(columns)
+        for constraint in _inspector().get_unique_constraints(table)
+    )
+
+
+def _add_columns() -> None:
+    if not _has_column("leave_types", "consumes_balance"):
+        op.add_column(
+            "leave_types",
+            sa.Column("consumes_balance", sa.Boolean(), nullable=False, server_default=true()),
+        )
+        op.execute(
+            leave_types.update()
+            .where(leave_types.c.name.in_(NON_CONSUMING_LEAVE_TYPES))
+            .values(consumes_balance=False)
+        )
+    if not _has_column("users", "email_digest"):
+        op.add_column("users", sa.Column("email_digest", sa.Boolean(), nullable=True))
+        op.execute(users.update().values(email_digest=False))
+    for column in ("start_half_day", "end_half_day"):
+        if not _has_column("leave_requests", column):
+            op.add_column(
+                "leave_requests",
+                sa.Column(column, sa.Boolean(), nullable=False, server_default=false()),
+            )
+
+
+def _create_tables() -> List[str]:
+    created = []
+    if not _has_table("email_outbox"):
+        op.create_table(
+            "email_outbox",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("recipient", sa.String(), nullable=False),
+            sa.Column("subject", sa.String(), nullable=False),
+            sa.Column("template", sa.String(), nullable=False),
+            sa.Column("context", sa.JSON(), nullable=True),
+            sa.Column("digest", sa.Boolean(), nullable=False),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("last_error", sa.String(), nullable=True),
+            sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+            sa.Column("sent_at", sa.DateTime(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index(
+            "ix_email_outbox_status_next_attempt_at", "email_outbox", ["status", "next_attempt_at"]
+        )
+        created.append("email_outbox")
+    if not _has_table("cache_generations"):
+        op.create_table(
+            "cache_generations",
+            sa.Column("name", sa.String(), primary_key=True),
+            sa.Column("generation", sa.BigInteger(), nullable=False),
+        )
+        created.append("cache_generations")
+    if not _has_table("leave_request_months"):
+        op.create_table(
+            "leave_request_months",
+            sa.Column(
+                "leave_request_id", sa.Integer(),
+                sa.ForeignKey("leave_requests.id", ondelete="CASCADE"), primary_key=True
+            ),
+            sa.Column("month", sa.Date(), primary_key=True),
+            sa.Column("status", sa.String(), nullable=False),
+        )
+        op.create_index(
+            "ix_leave_request_months_month_status", "leave_request_months", ["month", "status"]
+        )
+        created.append("leave_request_months")
+    if not _has_table("daily_occupancy"):
+        op.create_table(
+            "daily_occupancy",
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column(
+                "leave_type_id", sa.Integer(),
+                sa.ForeignKey("leave_types.id", ondelete="CASCADE"), primary_key=True
+            ),
+            sa.Column("absent_count", sa.Integer(), nullable=False),
+        )
+        created.append("daily_occupancy")
+    return created
+
+
+def _fill_leave_request_months() -> None:
+    # Même calcul que app.crud.leave_request.rebuild_leave_request_months
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(leave_requests.c.id, leave_requests.c.start_date,
+                      leave_requests.c.end_date, leave_requests.c.status)
+            .where(leave_requests.c.id > last_id)
+            .order_by(leave_requests.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        buckets = [
+            {"leave_request_id": row.id, "month": month, "status": row.status}
+            for row in rows
+            if row.start_date and row.end_date
+            for month in _month_starts(row.start_date, row.end_date)
+        ]
+        if buckets:
+            bind.execute(leave_request_months.insert(), buckets)
+        last_id = rows[-1].id
+
+
+def _fill_daily_occupancy() -> None:
+    # Même calcul que app.crud.daily_occupancy.rebuild_daily_occupancy
+    bind = op.get_bind()
+    counts: Counter = Counter()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(leave_requests.c.id, leave_requests.c.start_date,
+                      leave_requests.c.end_date, leave_requests.c.leave_type_id)
+            .where(leave_requests.c.id > last_id, leave_requests.c.status == "approved")
+            .order_by(leave_requests.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            if row.start_date and row.end_date and row.leave_type_id is not None:
+                for day in _working_days_between(row.start_date, row.end_date):
+                    counts[(day, row.leave_type_id)] += 1
+        last_id = rows[-1].id
+
+    items = sorted(counts.items())
+    for start in range(0, len(items), BATCH_SIZE):
+        bind.execute(daily_occupancy.insert(), [
+            {"day": day, "leave_type_id": leave_type_id, "absent_count": absent_count}
+            for (day, leave_type_id), absent_count in items[start:start + BATCH_SIZE]
+        ])
+
+
+def _delete_duplicate_balances() -> None:
+    # Garder la ligne la plus ancienne de chaque (user_id, leave_type_id, year). La
+    # lecture par first() sans ORDER BY ne dit pas laquelle l'application utilisait :
+    # les lignes supprimées sont journalisées une à une, solde compris
+    bind = op.get_bind()
+    key = (leave_balances.c.user_id, leave_balances.c.leave_type_id, leave_balances.c.year)
+    kept = (
+        sa.select(*key, sa.func.min(leave_balances.c.id).label("kept_id"))
+        .where(*(column.isnot(None) for column in key))
+        .group_by(*key)
+        .having(sa.func.count() > 1)
+        .subquery()
+    )
+    removed = bind.execute(
+        sa.select(
+            leave_balances.c.id, *key, leave_balances.c.balance, kept.c.kept_id
+        )
+        .join(kept, sa.and_(*(column == kept.c[column.name] for column in key)))
+        .where(leave_balances.c.id != kept.c.kept_id)
+        .order_by(leave_balances.c.id)
+    ).all()
+    for row in removed:
+        logger.warning(
+            "leave_balances : solde en double n°%d supprimé (utilisateur %d, type %d, "
+            "année %d, solde %s) ; solde conservé : n°%d",
+            row.id, row.user_id, row.leave_type_id, row.year, row.balance, row.kept_id,
+        )
+    ids = [row.id for row in removed]
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start:start + BATCH_SIZE]
+        bind.execute(leave_balances.delete().where(leave_balances.c.id.in_(batch)))
+
+
+def _tune_indexes() -> None:
+    for table in REDUNDANT_ID_INDEXES:
+        if _has_index(table, f"ix_{table}_id"):
+            op.drop_index(f"ix_{table}_id", table_name=table)
+
+    for name, columns in LEAVE_REQUEST_INDEXES.items():
+        if not _has_index("leave_requests", name):
+            op.create_index(name, "leave_requests", columns)
+    if not _has_index("leave_balances", "ix_leave_balances_leave_type_id"):
+        op.create_index("ix_leave_balances_leave_type_id", "leave_balances", ["leave_type_id"])
+    if not _has_index("daily_occupancy", "ix_daily_occupancy_leave_type_id"):
+        op.create_index("ix_daily_occupancy_leave_type_id", "daily_occupancy", ["leave_type_id"])
+
+    # Sert aussi d'index (user_id, leave_type_id, year) pour les débits de solde
+    if not _has_unique_constraint("leave_balances", ["user_id", "leave_type_id", "year"]):
+        _delete_duplicate_balances()
+        with op.batch_alter_table("leave_balances") as batch_op:
+            batch_op.create_unique_constraint(
+                "uq_leave_balances_user_type_year", ["user_id", "leave_type_id", "year"]
+            )
+
+
+def upgrade() -> None:
+    _add_columns()
+    created = _create_tables()
+    # Tables déjà présentes : tenues à jour par l'application depuis leur création
+    if "leave_request_months" in created:
+        _fill_leave_request_months()
+    if "daily_occupancy" in created:
+        _fill_daily_occupancy()
+    _tune_indexes()
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("leave_balances") as batch_op:
+        batch_op.drop_constraint("uq_leave_balances_user_type_year", type_="unique")
+    op.drop_index("ix_leave_balances_leave_type_id", table_name="leave_balances")
+    for name in LEAVE_REQUEST_INDEXES:
+        op.drop_index(name, table_name="leave_requests")
+    for table in ("users", "leave_types", "leave_requests", "leave_balances"):
+        op.create_index(f"ix_{table}_id", table, ["id"])
+
+    op.drop_table("daily_occupancy")
+    op.drop_table("leave_request_months")
+    op.drop_table("cache_generations")
+    op.drop_table("email_outbox")
+
+    with op.batch_alter_table("leave_requests") as batch_op:
+        batch_op.drop_column("end_half_day")
+        batch_op.drop_column("start_half_day")
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("email_digest")
+    with op.batch_alter_table("leave_types") as batch_op:
+        batch_op.drop_column("consumes_balance")
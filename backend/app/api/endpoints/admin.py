@@ -0,0 +1,97 @@
+import io
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from sqlalchemy.orm import Session
+
+from app.core.cache import principal_cache
+from app.core.config import settings
+from app.core.deps import get_current_admin_user, Principal
+from app.core.security import password_hasher
+from app.db.database import get_db, get_pool_stats
+from app.schemas.admin import RecomputeDaysResult, RolloverResult, AdminStats
+from app.schemas.bulk_import import BulkImportResult
+from app.crud import recompute_days_counts, rollover_leave_balances
+from app.services.bulk_import import IMPORT_FORMATS, IMPORT_KINDS, bulk_import, detect_format
+
+router = APIRouter()
+
+
+@router.post("/leave-requests/recompute-days", response_model=RecomputeDaysResult)
+def recompute_leave_request_days(
+    db: Session = Depends(get_db),
+    batch_size: int = 50000,
+    current_user: Principal = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Recalculer le nombre de jours ouvrés de toutes les demandes (jours fériés, demi-journées).
+    Les soldes déjà débités ne sont pas modifiés. Accessible uniquement aux admins.
+    """
+    processed, updated = recompute_days_counts(db, batch_size=batch_size)
+    return {"processed": processed, "updated": updated}
+
+
+@router.post("/balances/rollover", response_model=RolloverResult)
+def rollover_balances(
+    year: Optional[int] = None,
+    carry_over_max: Optional[float] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Créer les soldes de l'année (par défaut l'année en cours) à partir des jours par défaut
+    des types et du reliquat plafonné de l'année précédente. Les soldes existants sont
+    conservés : l'appel peut être répété sans effet. Accessible uniquement aux admins.
+    """
+    year = year or datetime.now().year
+    if carry_over_max is None:
+        carry_over_max = settings.LEAVE_CARRY_OVER_MAX_DAYS
+    created = rollover_leave_balances(db, year=year, carry_over_max=carry_over_max)
+    return {"year": year, "carry_over_max": carry_over_max, "created": created}
+
+
+@router.post("/import/{kind}", response_model=BulkImportResult)
+def import_records(
+    kind: str,
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    chunk_size: int = 1000,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Importer en masse des utilisateurs (users), soldes (leave_balances) ou demandes
+    historiques (leave_requests) depuis un fichier CSV ou NDJSON, lu par lots.
+    Les lignes invalides sont ignorées et listées dans le résultat. Accessible uniquement aux admins.
+    """
+    if kind not in IMPORT_KINDS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Type d'import inconnu, attendu : {', '.join(IMPORT_KINDS)}"
+        )
+    fmt = format or detect_format(file.filename)
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Format non reconnu, attendu : {', '.join(IMPORT_FORMATS)}"
+        )
+    # Le fichier reçu est lu en flux, sans être chargé entièrement en mémoire
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    report = bulk_import(db, kind, stream, fmt, chunk_size=chunk_size)
+    return report.as_dict()
+
+
+@router.get("/stats", response_model=AdminStats)
+def read_stats(
+    current_user: Principal = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Statistiques internes du worker qui répond (caches en mémoire, pool de hachage,
+    pool de connexions). Accessible uniquement aux admins.
+    """
+    return {
+        "principal_cache": principal_cache.stats(),
+        "password_hashing": password_hasher.stats(),
+        "db_pool": get_pool_stats() or None
+    }
\ No newline at end of file
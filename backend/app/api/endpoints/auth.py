@@ -2,28 +2,46 @@ from datetime import timedelta
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.security import create_access_token
+from app.core.security import PasswordHashingOverloaded, create_access_token, password_hasher
 from app.db.database import get_db
 from app.models.user import User
 from app.schemas.token import Token
-from app.crud import authenticate, get_user_by_email
+from app.crud import get_user_by_email, set_password_hash
 
 router = APIRouter()
 
 
 @router.post("/login", response_model=Token)
-def login_access_token(
+async def login_access_token(
     db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = authenticate(db, email=form_data.username, password=form_data.password)
-    if not user:
+    user = await run_in_threadpool(get_user_by_email, db, email=form_data.username)
+    
+    # bcrypt tourne dans le pool de hachage : la boucle reste libre pour les autres requêtes
+    valid = False
+    if user:
+        try:
+            valid, new_hash = await password_hasher.verify_and_update(
+                form_data.password, user.hashed_password
+            )
+        except PasswordHashingOverloaded:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Trop de connexions simultanées, veuillez réessayer",
+                headers={"Retry-After": "1"},
+            )
+        # Coût bcrypt modifié depuis le dernier hachage : enregistrer le nouveau
+        if valid and new_hash:
+            await run_in_threadpool(set_password_hash, db, db_obj=user, hashed_password=new_hash)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou mot de passe incorrect",
@@ -1,91 +1,270 @@
-from typing import Any, List, Optional
-from datetime import date
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+from datetime import date, datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, File, UploadFile, Form
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_current_user, get_current_admin_user, get_current_approver_user
-from app.db.database import get_db
-from app.models.user import User
+from app.core.deps import get_current_user, get_current_admin_user, get_current_approver_user, Principal
+from app.db.database import SessionLocal, get_async_db, get_db
 from app.models.leave_request import LeaveStatus
-from app.models.leave_type import LeaveType
 from app.schemas.leave_request import (
     LeaveRequestCreate, LeaveRequestUpdate, LeaveRequestResponse,
-    LeaveRequestDetailResponse, LeaveRequestApproval
+    LeaveRequestDetailResponse, LeaveRequestApproval, DailyOccupancyResponse,
+    LeaveRequestBatchApproval, LeaveRequestBatchResult, check_leave_request_span
+)
+from app.services.email import (
+    send_leave_request_notification, send_leave_approval_notification, send_leave_approval_batch_notifications
 )
-from app.services.email import send_leave_request_notification, send_leave_approval_notification
 from app.crud import (
-    get_leave_request, get_leave_requests, get_leave_requests_by_employee,
-    get_pending_leave_requests, create_leave_request, update_leave_request,
-    process_leave_request, delete_leave_request, get_leave_requests_by_date_range,
-    get_leave_type, get_user, get_user_leave_balance_by_type, adjust_leave_balance
+    aio, get_leave_request, create_leave_request, update_leave_request, calculate_days,
+    process_leave_request, delete_leave_request,
+    get_user_leave_balance_by_type, leave_type_catalog,
+    stream_leave_requests_for_export, find_overlapping_leave_request, process_leave_requests_batch,
+    APPROVED_LEAVE_REQUESTS_CACHE, DECISION_ALREADY_PROCESSED, DECISION_INSUFFICIENT_BALANCE
 )
+from app.utils.fast_json import fast_json_enabled, rows_response
+from app.utils.http_cache import CACHE_REVALIDATE, etag_matches, make_etag, not_modified, set_cache_headers
+from app.utils.export import EXPORT_MEDIA_TYPES, EXPORT_WRITERS, ExportFormat
+from app.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
+# Fenêtre maximale de la carte des absences, en jours
+MAX_OCCUPANCY_DAYS = 731
+
+# En-tête portant le curseur de la page suivante (absent sur la dernière page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Curseur de pagination invalide",
+        )
+
+
+def _check_overlap(
+    db: Session, employee_id: int, start_date: date, end_date: date, exclude_id: Optional[int] = None
+) -> None:
+    overlapping = find_overlapping_leave_request(
+        db, employee_id=employee_id, start_date=start_date, end_date=end_date, exclude_id=exclude_id
+    )
+    if overlapping:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=(
+                f"Cette période chevauche la demande n°{overlapping.id} "
+                f"du {overlapping.start_date:%d/%m/%Y} au {overlapping.end_date:%d/%m/%Y}"
+            ),
+        )
+
+
+def _check_working_days(
+    start_date: date, end_date: date, start_half_day: bool = False, end_half_day: bool = False
+) -> None:
+    # Une période faite uniquement de week-ends ou de jours fériés ne décompte rien
+    if calculate_days(start_date, end_date, start_half_day, end_half_day) <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La période ne contient aucun jour ouvré",
+        )
+
+
+def _list_response(response: Response, leave_requests: Sequence[Any], fast: bool) -> Any:
+    # Lignes plates sérialisées directement, ou objets ORM validés par response_model
+    return rows_response(leave_requests, response) if fast else leave_requests
+
+
+def _set_next_cursor(response: Response, leave_requests: Sequence[Any], limit: int) -> None:
+    if leave_requests and len(leave_requests) == limit:
+        last = leave_requests[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+
 
 @router.get("/", response_model=List[LeaveRequestResponse])
-def read_leave_requests(
-    db: Session = Depends(get_db),
+async def read_leave_requests(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_approver_user),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_approver_user),
 ) -> Any:
     """
     Récupérer toutes les demandes de congés. Accessible uniquement aux approbateurs.
+
+    Passer le curseur reçu dans l'en-tête X-Next-Cursor pour obtenir la page suivante.
     """
-    leave_requests = get_leave_requests(db, skip=skip, limit=limit)
-    return leave_requests
+    fast = fast_json_enabled()
+    leave_requests = await aio.get_leave_requests(
+        db, skip=skip, limit=limit, after=_parse_cursor(cursor), as_rows=fast
+    )
+    _set_next_cursor(response, leave_requests, limit)
+    return _list_response(response, leave_requests, fast)
 
 
 @router.get("/pending", response_model=List[LeaveRequestResponse])
-def read_pending_leave_requests(
-    db: Session = Depends(get_db),
+async def read_pending_leave_requests(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_approver_user),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_approver_user),
 ) -> Any:
     """
     Récupérer toutes les demandes de congés en attente. Accessible uniquement aux approbateurs.
     """
-    leave_requests = get_pending_leave_requests(db, skip=skip, limit=limit)
-    return leave_requests
+    fast = fast_json_enabled()
+    leave_requests = await aio.get_pending_leave_requests(
+        db, skip=skip, limit=limit, after=_parse_cursor(cursor), as_rows=fast
+    )
+    _set_next_cursor(response, leave_requests, limit)
+    return _list_response(response, leave_requests, fast)
 
 
 @router.get("/me", response_model=List[LeaveRequestResponse])
-def read_my_leave_requests(
-    db: Session = Depends(get_db),
+async def read_my_leave_requests(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Récupérer toutes les demandes de congés de l'utilisateur connecté.
     """
-    leave_requests = get_leave_requests_by_employee(db, employee_id=current_user.id, skip=skip, limit=limit)
-    return leave_requests
+    fast = fast_json_enabled()
+    leave_requests = await aio.get_leave_requests_by_employee(
+        db, employee_id=current_user.id, skip=skip, limit=limit, after=_parse_cursor(cursor), as_rows=fast
+    )
+    _set_next_cursor(response, leave_requests, limit)
+    return _list_response(response, leave_requests, fast)
+
+
+@router.get("/details", response_model=List[LeaveRequestDetailResponse])
+async def read_leave_request_details(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    status_filter: Optional[LeaveStatus] = Query(None, alias="status"),
+    employee_id: Optional[int] = None,
+    current_user: Principal = Depends(get_current_user),
+) -> Any:
+    """
+    Récupérer une page de demandes avec les noms de l'employé, de l'approbateur et du type.
+    Les approbateurs voient toutes les demandes, les autres utilisateurs uniquement les leurs.
+    """
+    if not current_user.is_approver and not current_user.is_admin:
+        employee_id = current_user.id
+    
+    fast = fast_json_enabled()
+    leave_requests = await aio.get_leave_requests_with_details(
+        db, skip=skip, limit=limit, after=_parse_cursor(cursor),
+        employee_id=employee_id, status=status_filter, as_rows=fast
+    )
+    _set_next_cursor(response, leave_requests, limit)
+    return _list_response(response, leave_requests, fast)
+
+
+@router.get("/occupancy", response_model=List[DailyOccupancyResponse])
+async def read_daily_occupancy(
+    start_date: date,
+    end_date: date,
+    leave_type_id: Optional[int] = None,
+    by_leave_type: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_approver_user),
+) -> Any:
+    """
+    Nombre de personnes absentes (demandes approuvées) par jour ouvré sur la période,
+    tous types confondus, pour un type, ou par type avec by_leave_type. Les jours sans
+    absence sont omis. Accessible uniquement aux approbateurs.
+    """
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La date de fin doit être postérieure à la date de début",
+        )
+    if (end_date - start_date).days >= MAX_OCCUPANCY_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"La période ne peut pas dépasser {MAX_OCCUPANCY_DAYS} jours",
+        )
+    return await aio.get_daily_occupancy(
+        db, start_date=start_date, end_date=end_date,
+        leave_type_id=leave_type_id, by_leave_type=by_leave_type
+    )
+
+
+@router.get("/export")
+def export_leave_requests(
+    format: ExportFormat = ExportFormat.CSV,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status_filter: Optional[LeaveStatus] = Query(None, alias="status"),
+    leave_type_id: Optional[int] = None,
+    employee_id: Optional[int] = None,
+    current_user: Principal = Depends(get_current_user),
+) -> Any:
+    """
+    Exporter les demandes de congés en CSV ou NDJSON, produit au fil de la lecture.
+    Filtres : période (demandes la chevauchant), statut, type et employé.
+    Les approbateurs exportent toutes les demandes, les autres utilisateurs uniquement les leurs.
+    """
+    if not current_user.is_approver and not current_user.is_admin:
+        employee_id = current_user.id
+
+    def generate() -> Iterator[str]:
+        # Session propre au flux : celle de get_db serait fermée avant l'envoi du corps
+        db = SessionLocal()
+        try:
+            rows = stream_leave_requests_for_export(
+                db, start_date=start_date, end_date=end_date,
+                status=status_filter.value if status_filter else None,
+                leave_type_id=leave_type_id, employee_id=employee_id
+            )
+            yield from EXPORT_WRITERS[format](rows)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        generate(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="leave_requests.{format.value}"'}
+    )
 
 
 @router.post("/", response_model=LeaveRequestResponse)
-async def create_new_leave_request(
+def create_new_leave_request(
     *,
     db: Session = Depends(get_db),
     leave_request_in: LeaveRequestCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Créer une nouvelle demande de congé.
     """
     # Vérifier que le type de congé existe
-    leave_type = get_leave_type(db, leave_type_id=leave_request_in.leave_type_id)
+    leave_type = leave_type_catalog.get(db, leave_request_in.leave_type_id)
     if not leave_type:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Type de congé non trouvé",
         )
     
-    # Vérifier le solde de congés pour les types autres que maladie et sans solde
-    if leave_type.name not in ["Congé maladie", "Congé sans solde"]:
+    # Vérifier le solde de congés pour les types décomptés du solde
+    if leave_type.consumes_balance:
         balance = get_user_leave_balance_by_type(db, user_id=current_user.id, leave_type_id=leave_type.id)
         if not balance or balance.balance <= 0:
             raise HTTPException(
@@ -93,25 +272,62 @@ async def create_new_leave_request(
                 detail="Solde de congés insuffisant pour ce type",
             )
     
+    _check_working_days(
+        leave_request_in.start_date, leave_request_in.end_date,
+        leave_request_in.start_half_day, leave_request_in.end_half_day
+    )
+    
+    # Refuser une période déjà couverte par une autre demande de l'employé
+    _check_overlap(db, current_user.id, leave_request_in.start_date, leave_request_in.end_date)
+    
     # Créer la demande de congé
-    leave_request = create_leave_request(db, leave_request_in, current_user.id)
+    leave_request = create_leave_request(db, leave_request_in, current_user.id, commit=False)
     
-    # Envoyer un email de notification aux approbateurs
+    # Mettre en file les emails aux approbateurs, dans la même transaction que la demande
     send_leave_request_notification(db, leave_request)
+    db.commit()
+    db.refresh(leave_request)
     
     return leave_request
 
 
+@router.post("/approve-batch", response_model=LeaveRequestBatchResult)
+def approve_leave_requests_batch(
+    *,
+    db: Session = Depends(get_db),
+    batch_in: LeaveRequestBatchApproval,
+    current_user: Principal = Depends(get_current_approver_user),
+) -> Any:
+    """
+    Approuver ou rejeter plusieurs demandes en une transaction. Accessible uniquement aux approbateurs.
+
+    Chaque décision est appliquée ou refusée indépendamment des autres ; le résultat
+    indique pour chacune le statut appliqué ou le motif du refus (not_found,
+    already_processed, insufficient_balance). Chaque employé reçoit un seul email.
+    """
+    outcomes, processed = process_leave_requests_batch(
+        db, decisions=batch_in.decisions, approver_id=current_user.id
+    )
+    send_leave_approval_batch_notifications(db, processed)
+    db.commit()
+    
+    return {
+        "processed": len(processed),
+        "failed": len(outcomes) - len(processed),
+        "results": outcomes,
+    }
+
+
 @router.get("/{leave_request_id}", response_model=LeaveRequestDetailResponse)
-def read_leave_request_by_id(
+async def read_leave_request_by_id(
     leave_request_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Obtenir une demande de congé spécifique par son ID.
     """
-    leave_request = get_leave_request(db, leave_request_id=leave_request_id)
+    leave_request = await aio.get_leave_request_with_details(db, leave_request_id=leave_request_id)
     if not leave_request:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -127,19 +343,8 @@ def read_leave_request_by_id(
             detail="Vous n'avez pas l'autorisation pour accéder à cette demande",
         )
     
-    # Enrichir la réponse avec des données supplémentaires
-    employee = get_user(db, user_id=leave_request.employee_id)
-    leave_type = get_leave_type(db, leave_type_id=leave_request.leave_type_id)
-    
-    response_data = leave_request.__dict__.copy()
-    response_data["employee_name"] = f"{employee.first_name} {employee.last_name}"
-    response_data["leave_type_name"] = leave_type.name
-    
-    if leave_request.approver_id:
-        approver = get_user(db, user_id=leave_request.approver_id)
-        response_data["approver_name"] = f"{approver.first_name} {approver.last_name}"
-    
-    return LeaveRequestDetailResponse(**response_data)
+    # Les noms (employee_name, approver_name, leave_type_name) viennent des relations déjà chargées
+    return leave_request
 
 
 @router.put("/{leave_request_id}", response_model=LeaveRequestResponse)
@@ -148,7 +353,7 @@ def update_leave_request_by_id(
     db: Session = Depends(get_db),
     leave_request_id: int,
     leave_request_in: LeaveRequestUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Mettre à jour une demande de congé. L'employé peut uniquement mettre à jour ses propres demandes en attente.
@@ -176,13 +381,34 @@ def update_leave_request_by_id(
     
     # Vérifier le type de congé si changé
     if leave_request_in.leave_type_id and leave_request_in.leave_type_id != leave_request.leave_type_id:
-        leave_type = get_leave_type(db, leave_type_id=leave_request_in.leave_type_id)
+        leave_type = leave_type_catalog.get(db, leave_request_in.leave_type_id)
         if not leave_type:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Type de congé non trouvé",
             )
     
+    if {"start_date", "end_date", "start_half_day", "end_half_day"} & leave_request_in.dict(exclude_unset=True).keys():
+        _check_working_days(
+            leave_request_in.start_date or leave_request.start_date,
+            leave_request_in.end_date or leave_request.end_date,
+            leave_request.start_half_day if leave_request_in.start_half_day is None
+            else leave_request_in.start_half_day,
+            leave_request.end_half_day if leave_request_in.end_half_day is None
+            else leave_request_in.end_half_day
+        )
+    
+    if leave_request_in.start_date or leave_request_in.end_date:
+        start_date = leave_request_in.start_date or leave_request.start_date
+        end_date = leave_request_in.end_date or leave_request.end_date
+        try:
+            check_leave_request_span(start_date, end_date)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+        _check_overlap(
+            db, leave_request.employee_id, start_date, end_date, exclude_id=leave_request.id
+        )
+    
     leave_request = update_leave_request(db, db_obj=leave_request, obj_in=leave_request_in)
     return leave_request
 
@@ -193,7 +419,7 @@ def approve_leave_request(
     db: Session = Depends(get_db),
     leave_request_id: int,
     approval_in: LeaveRequestApproval,
-    current_user: User = Depends(get_current_approver_user),
+    current_user: Principal = Depends(get_current_approver_user),
 ) -> Any:
     """
     Approuver ou rejeter une demande de congé. Accessible uniquement aux approbateurs.
@@ -212,22 +438,28 @@ def approve_leave_request(
             detail="Cette demande a déjà été traitée",
         )
     
-    # Traiter la demande
-    leave_request = process_leave_request(db, db_obj=leave_request, obj_in=approval_in, approver_id=current_user.id)
-    
-    # Mettre à jour le solde de congés si approuvé et type pertinent
-    if approval_in.status == LeaveStatus.APPROVED:
-        leave_type = get_leave_type(db, leave_type_id=leave_request.leave_type_id)
-        if leave_type.name not in ["Congé maladie", "Congé sans solde"]:
-            adjust_leave_balance(
-                db, 
-                user_id=leave_request.employee_id, 
-                leave_type_id=leave_request.leave_type_id, 
-                days=-leave_request.days_count
-            )
+    # Traiter la demande ; le statut, le solde et la notification sont validés ensemble
+    outcome = process_leave_request(
+        db, db_obj=leave_request, obj_in=approval_in, approver_id=current_user.id, commit=False
+    )
+    if outcome == DECISION_ALREADY_PROCESSED:
+        # Traitée entre-temps par un autre approbateur
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cette demande a déjà été traitée",
+        )
+    if outcome == DECISION_INSUFFICIENT_BALANCE:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Solde de congés insuffisant pour approuver cette demande",
+        )
     
-    # Envoyer un email de notification à l'employé
+    # Mettre en file l'email de notification à l'employé, puis tout valider ensemble
     send_leave_approval_notification(db, leave_request)
+    db.commit()
+    db.refresh(leave_request)
     
     return leave_request
 
@@ -237,7 +469,7 @@ def delete_leave_request_by_id(
     *,
     db: Session = Depends(get_db),
     leave_request_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Supprimer une demande de congé. L'employé peut uniquement supprimer ses propres demandes en attente.
@@ -269,15 +501,28 @@ def delete_leave_request_by_id(
 
 
 @router.get("/calendar/{year}/{month}", response_model=List[LeaveRequestResponse])
-def get_leave_requests_for_calendar(
+async def get_leave_requests_for_calendar(
     year: int,
     month: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Récupérer les demandes de congés pour un mois spécifique (pour le calendrier).
+
+    Réponse accompagnée d'un ETag : avec If-None-Match, 304 sans corps si aucune
+    demande approuvée n'a changé depuis.
     """
+    # Génération lue avant les demandes : au pire un ETag plus ancien que le contenu
+    etag = make_etag(
+        APPROVED_LEAVE_REQUESTS_CACHE, await aio.get_cache_generation(db, APPROVED_LEAVE_REQUESTS_CACHE)
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag, CACHE_REVALIDATE)
+    set_cache_headers(response, etag, CACHE_REVALIDATE)
+    
     # Calculer les dates de début et de fin du mois
     import calendar
     from datetime import date
@@ -287,11 +532,13 @@ def get_leave_requests_for_calendar(
     end_date = date(year, month, last_day)
     
     # Récupérer uniquement les demandes approuvées pour le calendrier
-    leave_requests = get_leave_requests_by_date_range(
+    fast = fast_json_enabled()
+    leave_requests = await aio.get_leave_requests_by_date_range(
         db, 
         start_date=start_date, 
         end_date=end_date, 
-        status=LeaveStatus.APPROVED
+        status=LeaveStatus.APPROVED,
+        as_rows=fast
     )
     
-    return leave_requests
\ No newline at end of file
+    return _list_response(response, leave_requests, fast)
\ No newline at end of file
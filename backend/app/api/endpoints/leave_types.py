@@ -1,31 +1,41 @@
 from typing import Any, List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_current_user, get_current_admin_user
-from app.db.database import get_db
-from app.models.user import User
+from app.core.deps import get_current_user, get_current_admin_user, Principal
+from app.db.database import get_async_db, get_db
 from app.schemas.leave_type import LeaveTypeCreate, LeaveTypeUpdate, LeaveTypeResponse
 from app.crud import (
-    get_leave_type, get_leave_type_by_name, get_leave_types,
-    create_leave_type, update_leave_type, delete_leave_type
+    get_leave_type, get_leave_type_by_name, LEAVE_TYPES_CACHE,
+    aio, create_leave_type, update_leave_type, delete_leave_type
 )
+from app.utils.http_cache import CACHE_SHORT, etag_matches, make_etag, not_modified, set_cache_headers
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[LeaveTypeResponse])
-def read_leave_types(
-    db: Session = Depends(get_db),
+async def read_leave_types(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Récupérer tous les types de congés.
+
+    Réponse accompagnée d'un ETag : avec If-None-Match, 304 sans corps si rien n'a changé.
     """
-    leave_types = get_leave_types(db, skip=skip, limit=limit)
+    etag = make_etag(LEAVE_TYPES_CACHE, await aio.get_leave_types_generation(db))
+    if etag_matches(request, etag):
+        return not_modified(etag, CACHE_SHORT)
+    set_cache_headers(response, etag, CACHE_SHORT)
+    
+    leave_types = (await aio.get_leave_types(db))[skip:skip + limit]
     return leave_types
 
 
@@ -34,7 +44,7 @@ def create_new_leave_type(
     *,
     db: Session = Depends(get_db),
     leave_type_in: LeaveTypeCreate,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> Any:
     """
     Créer un nouveau type de congé. Accessible uniquement aux admins.
@@ -50,15 +60,15 @@ def create_new_leave_type(
 
 
 @router.get("/{leave_type_id}", response_model=LeaveTypeResponse)
-def read_leave_type_by_id(
+async def read_leave_type_by_id(
     leave_type_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Obtenir un type de congé spécifique par son ID.
     """
-    leave_type = get_leave_type(db, leave_type_id=leave_type_id)
+    leave_type = await aio.get_leave_type(db, leave_type_id)
     if not leave_type:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -73,7 +83,7 @@ def update_leave_type_by_id(
     db: Session = Depends(get_db),
     leave_type_id: int,
     leave_type_in: LeaveTypeUpdate,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> Any:
     """
     Mettre à jour un type de congé. Accessible uniquement aux admins.
@@ -103,7 +113,7 @@ def delete_leave_type_by_id(
     *,
     db: Session = Depends(get_db),
     leave_type_id: int,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> Any:
     """
     Supprimer un type de congé. Accessible uniquement aux admins.
@@ -1,16 +1,16 @@
 from typing import Any, List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_current_user, get_current_admin_user
+from app.core.deps import get_current_user, get_current_admin_user, Principal
 from app.db.database import get_db
-from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
 from app.crud import (
     get_user, get_user_by_email, get_users, get_approvers,
-    create_user, update_user, delete_user
+    create_user, update_user, delete_user, get_cache_generation, USERS_CACHE
 )
+from app.utils.http_cache import CACHE_SHORT, etag_matches, make_etag, not_modified, set_cache_headers
 
 router = APIRouter()
 
@@ -20,7 +20,7 @@ def read_users(
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> Any:
     """
     Récupérer tous les utilisateurs. Accessible uniquement aux admins.
@@ -31,12 +31,22 @@ def read_users(
 
 @router.get("/approvers", response_model=List[UserResponse])
 def read_approvers(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Récupérer tous les approbateurs.
+
+    Réponse accompagnée d'un ETag : avec If-None-Match, 304 sans corps si aucun
+    utilisateur n'a été modifié.
     """
+    etag = make_etag(USERS_CACHE, get_cache_generation(db, USERS_CACHE))
+    if etag_matches(request, etag):
+        return not_modified(etag, CACHE_SHORT)
+    set_cache_headers(response, etag, CACHE_SHORT)
+    
     approvers = get_approvers(db)
     return approvers
 
@@ -46,7 +56,7 @@ def create_new_user(
     *,
     db: Session = Depends(get_db),
     user_in: UserCreate,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> Any:
     """
     Créer un nouvel utilisateur. Accessible uniquement aux admins.
@@ -62,8 +72,8 @@ def create_new_user(
 
 
 @router.get("/me", response_model=UserResponse)
-def read_user_me(
-    current_user: User = Depends(get_current_user),
+async def read_user_me(
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Obtenir l'utilisateur actuel.
@@ -76,7 +86,7 @@ def update_user_me(
     *,
     db: Session = Depends(get_db),
     user_in: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Mettre à jour les informations de l'utilisateur connecté.
@@ -88,7 +98,9 @@ def update_user_me(
             detail="Vous ne pouvez pas modifier vos propres privilèges",
         )
     
-    user = update_user(db, db_obj=current_user, obj_in=user_in)
+    # current_user est une copie en cache : recharger l'utilisateur dans la session
+    user = get_user(db, user_id=current_user.id)
+    user = update_user(db, db_obj=user, obj_in=user_in)
     return user
 
 
@@ -96,7 +108,7 @@ def update_user_me(
 def read_user_by_id(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Obtenir un utilisateur spécifique par son ID.
@@ -121,7 +133,7 @@ def update_user_by_id(
     db: Session = Depends(get_db),
     user_id: int,
     user_in: UserUpdate,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> Any:
     """
     Mettre à jour un utilisateur. Accessible uniquement aux admins.
@@ -141,7 +153,7 @@ def delete_user_by_id(
     *,
     db: Session = Depends(get_db),
     user_id: int,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> Any:
     """
     Supprimer un utilisateur. Accessible uniquement aux admins.
@@ -1,38 +1,99 @@
+import time
+from dataclasses import dataclass
 from typing import Generator, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import principal_cache
 from app.core.config import settings
-from app.core.security import pwd_context
-from app.db.database import get_db
+from app.core.security import InvalidTokenError, decode_access_token, pwd_context
+from app.crud import aio, USERS_CACHE
+from app.db.database import get_async_db
 from app.models.user import User
 from app.schemas.token import TokenPayload
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"/api/auth/login")
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> User:
-    try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
+@dataclass(frozen=True)
+class Principal:
+    """
+    Utilisateur authentifié, copie détachée de la session mise en cache entre les requêtes.
+
+    Les routes qui modifient l'utilisateur doivent recharger l'objet User avec get_user.
+    """
+    id: int
+    email: str
+    first_name: str
+    last_name: str
+    is_active: bool
+    is_admin: bool
+    is_approver: bool
+    email_digest: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            is_active=bool(user.is_active),
+            is_admin=bool(user.is_admin),
+            is_approver=bool(user.is_approver),
+            email_digest=bool(user.email_digest)
         )
+
+class _UsersGeneration:
+    """
+    Dernière génération "users" lue en base par ce worker.
+
+    Relue au plus toutes les PRINCIPAL_CACHE_CHECK_SECONDS : un utilisateur modifié
+    ou supprimé par un autre worker fait avancer ce compteur, et les entrées de
+    principal_cache lues sous une génération antérieure ne sont plus servies.
+    """
+    value: Optional[int] = None
+    checked_at = 0.0
+
+    @classmethod
+    async def current(cls, db: AsyncSession) -> int:
+        now = time.monotonic()
+        if cls.value is not None and now - cls.checked_at < settings.PRINCIPAL_CACHE_CHECK_SECONDS:
+            return cls.value
+        generation = await aio.get_cache_generation(db, USERS_CACHE)
+        if generation != cls.value:
+            # Entrées devenues invalides : libérer la place tout de suite
+            principal_cache.clear()
+        cls.value, cls.checked_at = generation, now
+        return generation
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
+) -> Principal:
+    try:
+        payload = decode_access_token(token)
         token_data = TokenPayload(**payload)
-    except (jwt.JWTError, ValidationError):
+    except (InvalidTokenError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Impossible de valider les identifiants",
         )
-    user = db.query(User).filter(User.id == token_data.sub).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, 
-            detail="Utilisateur non trouvé"
-        )
+    # La session n'ouvre de connexion qu'à la première requête : aucune en cas de succès
+    # du cache, sauf pour relire la génération "users" quand le délai est écoulé
+    generation = await _UsersGeneration.current(db) if principal_cache.enabled else None
+    cached = principal_cache.get(token_data.sub)
+    user: Optional[Principal] = cached[1] if cached is not None and cached[0] == generation else None
+    if user is None:
+        db_user = await aio.get_user(db, user_id=token_data.sub) if token_data.sub else None
+        if not db_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, 
+                detail="Utilisateur non trouvé"
+            )
+        user = Principal.from_user(db_user)
+        principal_cache.set(user.id, (generation, user))
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, 
@@ -41,8 +102,8 @@ def get_current_user(
     return user
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, 
@@ -51,8 +112,8 @@ def get_current_active_user(
     return current_user
 
 def get_current_admin_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, 
@@ -61,8 +122,8 @@ def get_current_admin_user(
     return current_user
 
 def get_current_approver_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_approver and not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, 
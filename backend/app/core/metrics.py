@@ -0,0 +1,170 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+# Importé seulement si les métriques sont activées : rien à payer au démarrage sinon
+prometheus_client: Any = None
+if settings.METRICS_ENABLED:
+    try:
+        import prometheus_client
+    except ImportError:  # Dépendance facultative : sans prometheus_client, pas de métriques
+        pass
+
+NAMESPACE = "conges"
+
+# Nombre de requêtes SQL et temps passé en base par requête HTTP
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 250)
+DB_SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Requêtes non rattachées à une route (404) : un seul libellé, pour borner la cardinalité
+UNMATCHED_ROUTE = "unmatched"
+
+if prometheus_client is not None:
+    HTTP_REQUEST_DURATION = prometheus_client.Histogram(
+        "http_request_duration_seconds", "Durée des requêtes HTTP, par gabarit de route",
+        ["method", "route", "status"], namespace=NAMESPACE
+    )
+    HTTP_REQUESTS_IN_PROGRESS = prometheus_client.Gauge(
+        "http_requests_in_progress", "Requêtes HTTP en cours de traitement",
+        namespace=NAMESPACE, multiprocess_mode="livesum"
+    )
+    DB_QUERIES_PER_REQUEST = prometheus_client.Histogram(
+        "db_queries_per_request", "Requêtes SQL exécutées par requête HTTP",
+        ["method", "route"], namespace=NAMESPACE, buckets=QUERY_COUNT_BUCKETS
+    )
+    DB_SECONDS_PER_REQUEST = prometheus_client.Histogram(
+        "db_seconds_per_request", "Temps passé en base par requête HTTP",
+        ["method", "route"], namespace=NAMESPACE, buckets=DB_SECONDS_BUCKETS
+    )
+    EMAILS_SENT = prometheus_client.Counter(
+        "emails_sent", "Emails remis au serveur SMTP", ["kind"], namespace=NAMESPACE
+    )
+    EMAIL_FAILURES = prometheus_client.Counter(
+        "email_failures", "Envois d'emails en échec (nouvelle tentative ou abandon)",
+        ["kind"], namespace=NAMESPACE
+    )
+
+
+def metrics_enabled() -> bool:
+    return settings.METRICS_ENABLED and prometheus_client is not None
+
+
+class QueryStats:
+    """
+    Requêtes SQL d'une requête HTTP : nombre et durée cumulée.
+
+    Portée par une ContextVar, copiée (par référence) dans les threads du pool de
+    FastAPI et dans les greenlets de SQLAlchemy asynchrone : les deux moteurs
+    alimentent donc le même objet.
+    """
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _query_stats.get() is not None:
+        context.metrics_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _query_stats.get()
+    started_at = getattr(context, "metrics_started_at", None)
+    if stats is not None and started_at is not None:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - started_at
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Compter les requêtes SQL d'engine (pour un moteur asynchrone : engine.sync_engine).
+    Hors d'une requête HTTP (scripts, tâches de fond), les écouteurs ne font rien.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI : durée, requêtes SQL et temps en base par route, requêtes en cours.
+
+    La route est celle que FastAPI a retenue (gabarit "/api/leave-requests/{leave_request_id}"),
+    pas le chemin reçu, pour garder un nombre de séries borné. La durée s'arrête au
+    dernier fragment du corps de la réponse.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        status = 500
+        started_at = time.perf_counter()
+        finished_at: Optional[float] = None
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status, finished_at
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished_at = time.perf_counter()
+            await send(message)
+
+        token = _query_stats.set(stats)
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            _query_stats.reset(token)
+            route: Any = scope.get("route")
+            template = getattr(route, "path", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.labels(method, template, str(status)).observe(
+                (finished_at or time.perf_counter()) - started_at
+            )
+            DB_QUERIES_PER_REQUEST.labels(method, template).observe(stats.count)
+            DB_SECONDS_PER_REQUEST.labels(method, template).observe(stats.seconds)
+
+
+def metrics_endpoint(request: Request) -> Response:
+    """
+    Métriques au format texte de Prometheus. Avec plusieurs workers uvicorn,
+    PROMETHEUS_MULTIPROC_DIR (voir start.sh) agrège les valeurs de tous les workers.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return Response(
+        prometheus_client.generate_latest(registry), media_type=prometheus_client.CONTENT_TYPE_LATEST
+    )
+
+
+def record_email_delivery(kind: str, failed: bool) -> None:
+    if not metrics_enabled():
+        return
+    (EMAIL_FAILURES if failed else EMAILS_SENT).labels(kind).inc()
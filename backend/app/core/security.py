@@ -1,14 +1,29 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Les hachés produits avec un autre coût sont signalés par verify_and_update
+# et réécrits à la connexion suivante
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+class InvalidTokenError(Exception):
+    """
+    Jeton d'accès illisible, mal signé ou expiré.
+    """
+
 
 def create_access_token(subject: Any, expires_delta: Optional[timedelta] = None) -> str:
+    # jose (et cryptography) ne sont importés qu'au premier jeton : démarrage plus rapide
+    from jose import jwt
+
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -19,8 +34,121 @@ def create_access_token(subject: Any, expires_delta: Optional[timedelta] = None)
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
+def decode_access_token(token: str) -> Dict[str, Any]:
+    from jose import JWTError, jwt
+
+    try:
+        return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError as exc:
+        raise InvalidTokenError(str(exc)) from exc
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    # Retourne (valide, nouveau haché) ; le nouveau haché n'est fourni que si le coût a changé
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+
+class PasswordHashingOverloaded(Exception):
+    """
+    Trop de vérifications de mot de passe en attente.
+    """
+
+
+class PasswordHasher:
+    """
+    Hachage et vérification bcrypt hors de la boucle d'événements.
+
+    Les calculs partent dans un pool de PASSWORD_HASH_WORKERS processus
+    (ou dans le pool de threads si ce nombre vaut 0). Au plus
+    PASSWORD_HASH_MAX_CONCURRENCY calculs sont soumis à la fois ; au-delà de
+    PASSWORD_HASH_MAX_QUEUE appels en attente, les nouveaux sont refusés
+    plutôt que d'allonger indéfiniment la file lors des pics de connexion.
+    """
+
+    def __init__(self, workers: int, max_concurrency: int, max_queue: int) -> None:
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.workers <= 0:
+            return None
+        if self._executor is None:
+            # spawn plutôt que fork : le processus parent a déjà des threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise PasswordHashingOverloaded()
+
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    def hash_many(self, passwords: List[str]) -> List[str]:
+        # Version synchrone pour les imports en masse : tout le pool travaille sur le lot
+        executor = self._get_executor()
+        if executor is None:
+            return [get_password_hash(password) for password in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(executor.map(get_password_hash, passwords, chunksize=chunksize))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
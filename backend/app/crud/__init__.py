@@ -1,18 +1,32 @@
 from app.crud.user import (
-    get_user, get_user_by_email, get_users, get_approvers,
-    create_user, update_user, delete_user, authenticate
+    get_user, get_user_by_email, get_users, get_users_by_ids, get_approvers,
+    create_user, update_user, delete_user, set_password_hash, authenticate, USERS_CACHE
 )
+from app.crud.cache_generation import get_cache_generation, bump_cache_generation
+from app.crud.leave_type_catalog import LEAVE_TYPES_CACHE, CachedLeaveType, leave_type_catalog
 from app.crud.leave_type import (
     get_leave_type, get_leave_type_by_name, get_leave_types,
     create_leave_type, update_leave_type, delete_leave_type
 )
+from app.crud.daily_occupancy import (
+    APPROVED_LEAVE_REQUESTS_CACHE, update_daily_occupancy, add_daily_occupancy,
+    get_daily_occupancy, rebuild_daily_occupancy
+)
 from app.crud.leave_request import (
-    get_leave_request, get_leave_requests, get_leave_requests_by_employee,
-    get_pending_leave_requests, create_leave_request, update_leave_request,
-    process_leave_request, delete_leave_request, get_leave_requests_by_date_range
+    get_leave_request, get_leave_request_with_details, get_leave_requests,
+    get_leave_requests_with_details, get_leave_requests_by_employee,
+    get_pending_leave_requests, create_leave_request, update_leave_request, calculate_days,
+    process_leave_request, delete_leave_request, get_leave_requests_by_date_range,
+    rebuild_leave_request_months, recompute_days_counts, stream_leave_requests_for_export,
+    find_overlapping_leave_request, process_leave_requests_batch,
+    DECISION_NOT_FOUND, DECISION_ALREADY_PROCESSED, DECISION_INSUFFICIENT_BALANCE
 )
 from app.crud.leave_balance import (
     get_leave_balance, get_leave_balances, get_user_leave_balances,
     get_user_leave_balance_by_type, create_leave_balance, update_leave_balance,
-    delete_leave_balance, adjust_leave_balance
-)
\ No newline at end of file
+    delete_leave_balance, adjust_leave_balance, debit_leave_balance, rollover_leave_balances
+)
+from app.crud.email_outbox import (
+    enqueue_email, claim_due_emails, mark_emails_sent, mark_email_failed
+)
+from app.crud import aio
\ No newline at end of file
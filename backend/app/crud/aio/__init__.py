@@ -0,0 +1,10 @@
+# Lectures asynchrones (AsyncSession) utilisées par les routes les plus sollicitées ;
+# les écritures et les scripts passent par les fonctions synchrones de app.crud
+from app.crud.aio.user import get_user
+from app.crud.aio.cache_generation import get_cache_generation
+from app.crud.aio.leave_type import get_leave_type, get_leave_types, get_leave_types_generation
+from app.crud.aio.leave_request import (
+    get_leave_request_with_details, get_leave_requests, get_leave_requests_with_details,
+    get_leave_requests_by_employee, get_pending_leave_requests, get_leave_requests_by_date_range
+)
+from app.crud.aio.daily_occupancy import get_daily_occupancy
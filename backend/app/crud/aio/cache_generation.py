@@ -0,0 +1,9 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.models.cache_generation import CacheGeneration
+
+
+async def get_cache_generation(db: AsyncSession, name: str) -> int:
+    generation = await db.scalar(select(CacheGeneration.generation).where(CacheGeneration.name == name))
+    return generation or 0
@@ -0,0 +1,14 @@
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.daily_occupancy import daily_occupancy_query
+
+
+async def get_daily_occupancy(
+    db: AsyncSession, start_date: date, end_date: date, leave_type_id: Optional[int] = None,
+    by_leave_type: bool = False
+) -> List:
+    result = await db.execute(daily_occupancy_query(start_date, end_date, leave_type_id, by_leave_type))
+    return result.all()
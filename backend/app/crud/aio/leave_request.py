@@ -0,0 +1,129 @@
+from typing import Optional, List, Sequence, Tuple, Union
+from datetime import date, datetime
+
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload
+from sqlalchemy import Select, desc, and_, select, tuple_
+
+from app.models.leave_request import LeaveRequest, LeaveStatus
+from app.models.leave_request_month import LeaveRequestMonth
+from app.models.leave_type import LeaveType
+from app.models.user import User
+from app.schemas.leave_request import LeaveRequestResponse
+
+
+# Équivalents asynchrones des lectures de app.crud.leave_request, pour les routes async def.
+# Avec as_rows=True, les listes renvoient des lignes plates (Row) portant exactement les
+# champs des schémas de réponse, sans objets ORM : voir app.utils.fast_json
+
+LeaveRequestRows = Union[List[LeaveRequest], Sequence[Row]]
+
+
+def _with_details(stmt: Select) -> Select:
+    return stmt.options(
+        joinedload(LeaveRequest.employee),
+        joinedload(LeaveRequest.approver),
+        joinedload(LeaveRequest.leave_type)
+    )
+
+
+def _base(as_rows: bool, details: bool = False) -> Select:
+    if not as_rows:
+        stmt = select(LeaveRequest)
+        return _with_details(stmt) if details else stmt
+    
+    # Colonnes dans l'ordre des champs de LeaveRequestResponse (puis LeaveRequestDetailResponse)
+    stmt = select(*(LeaveRequest.__table__.c[name] for name in LeaveRequestResponse.model_fields))
+    if not details:
+        return stmt
+    employee = aliased(User)
+    approver = aliased(User)
+    return (
+        stmt.add_columns(
+            (employee.first_name + " " + employee.last_name).label("employee_name"),
+            (approver.first_name + " " + approver.last_name).label("approver_name"),
+            LeaveType.name.label("leave_type_name")
+        )
+        .join(employee, LeaveRequest.employee_id == employee.id)
+        .outerjoin(approver, LeaveRequest.approver_id == approver.id)
+        .join(LeaveType, LeaveRequest.leave_type_id == LeaveType.id)
+    )
+
+
+async def _all(db: AsyncSession, stmt: Select, as_rows: bool) -> LeaveRequestRows:
+    if as_rows:
+        return (await db.execute(stmt)).all()
+    return list((await db.scalars(stmt)).unique())
+
+
+async def get_leave_request_with_details(db: AsyncSession, leave_request_id: int) -> Optional[LeaveRequest]:
+    stmt = _with_details(select(LeaveRequest)).where(LeaveRequest.id == leave_request_id)
+    return (await db.scalars(stmt)).first()
+
+
+async def _paginate(
+    db: AsyncSession, stmt: Select, skip: int, limit: int, after: Optional[Tuple[datetime, int]],
+    as_rows: bool = False
+) -> LeaveRequestRows:
+    stmt = stmt.order_by(desc(LeaveRequest.created_at), desc(LeaveRequest.id))
+    if after is not None:
+        stmt = stmt.where(tuple_(LeaveRequest.created_at, LeaveRequest.id) < tuple_(*after))
+    else:
+        stmt = stmt.offset(skip)
+    return await _all(db, stmt.limit(limit), as_rows)
+
+
+async def get_leave_requests(
+    db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[Tuple[datetime, int]] = None,
+    as_rows: bool = False
+) -> LeaveRequestRows:
+    return await _paginate(db, _base(as_rows), skip, limit, after, as_rows)
+
+
+async def get_leave_requests_by_employee(
+    db: AsyncSession, employee_id: int, skip: int = 0, limit: int = 100,
+    after: Optional[Tuple[datetime, int]] = None, as_rows: bool = False
+) -> LeaveRequestRows:
+    stmt = _base(as_rows).where(LeaveRequest.employee_id == employee_id)
+    return await _paginate(db, stmt, skip, limit, after, as_rows)
+
+
+async def get_leave_requests_with_details(
+    db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[Tuple[datetime, int]] = None,
+    employee_id: Optional[int] = None, status: Optional[str] = None, as_rows: bool = False
+) -> LeaveRequestRows:
+    stmt = _base(as_rows, details=True)
+    if employee_id is not None:
+        stmt = stmt.where(LeaveRequest.employee_id == employee_id)
+    if status is not None:
+        stmt = stmt.where(LeaveRequest.status == status)
+    return await _paginate(db, stmt, skip, limit, after, as_rows)
+
+
+async def get_pending_leave_requests(
+    db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[Tuple[datetime, int]] = None,
+    as_rows: bool = False
+) -> LeaveRequestRows:
+    stmt = _base(as_rows).where(LeaveRequest.status == LeaveStatus.PENDING)
+    return await _paginate(db, stmt, skip, limit, after, as_rows)
+
+
+async def get_leave_requests_by_date_range(
+    db: AsyncSession, start_date: date, end_date: date, status: Optional[str] = None,
+    as_rows: bool = False
+) -> LeaveRequestRows:
+    months = select(LeaveRequestMonth.leave_request_id).where(
+        LeaveRequestMonth.month.between(start_date.replace(day=1), end_date.replace(day=1))
+    )
+    if status:
+        months = months.where(LeaveRequestMonth.status == status)
+    
+    stmt = _base(as_rows).where(
+        and_(
+            LeaveRequest.id.in_(months),
+            LeaveRequest.start_date <= end_date,
+            LeaveRequest.end_date >= start_date
+        )
+    )
+    return await _all(db, stmt, as_rows)
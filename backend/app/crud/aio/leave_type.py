@@ -0,0 +1,19 @@
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.leave_type_catalog import CachedLeaveType, leave_type_catalog
+
+
+# Le catalogue est synchrone ; run_sync lui prête une Session adossée à la connexion
+# asynchrone, la relecture occasionnelle de la génération ne bloque donc pas la boucle
+async def get_leave_type(db: AsyncSession, leave_type_id: int) -> Optional[CachedLeaveType]:
+    return await db.run_sync(leave_type_catalog.get, leave_type_id)
+
+
+async def get_leave_types(db: AsyncSession) -> List[CachedLeaveType]:
+    return await db.run_sync(leave_type_catalog.all)
+
+
+async def get_leave_types_generation(db: AsyncSession) -> int:
+    return await db.run_sync(leave_type_catalog.generation)
@@ -0,0 +1,75 @@
+from typing import Set
+
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy import event, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.models.cache_generation import CacheGeneration
+
+# Clé de Session.info : compteurs à avancer au commit de la transaction en cours
+_PENDING_GENERATIONS = "pending_cache_generations"
+
+
+def get_cache_generation(db: Session, name: str) -> int:
+    generation = db.scalar(select(CacheGeneration.generation).where(CacheGeneration.name == name))
+    return generation or 0
+
+
+def bump_cache_generation(db: Session, name: str) -> None:
+    """
+    Avancer le compteur name au commit de la transaction en cours.
+
+    Le compteur avance dans la transaction de la modification : les autres workers
+    ne rechargent jamais une donnée pas encore validée. L'UPDATE n'est exécuté qu'au
+    dernier moment (voir _bump_pending_generations), une fois par compteur : la ligne,
+    partagée par toutes les transactions qui modifient ces données, n'est verrouillée
+    que le temps du commit et toujours après les autres lignes.
+    """
+    if not db.in_transaction():
+        # Rattacher la marque à une transaction, oubliée si elle est annulée
+        db.begin()
+    db.info.setdefault(_PENDING_GENERATIONS, set()).add(name)
+
+
+def _increment(db: Session, name: str) -> None:
+    result = db.execute(
+        update(CacheGeneration)
+        .where(CacheGeneration.name == name)
+        .values(generation=CacheGeneration.generation + 1)
+    )
+    if result.rowcount:
+        return
+
+    try:
+        with db.begin_nested():
+            db.add(CacheGeneration(name=name, generation=1))
+    except IntegrityError:
+        # Créé entre-temps par un autre worker
+        db.execute(
+            update(CacheGeneration)
+            .where(CacheGeneration.name == name)
+            .values(generation=CacheGeneration.generation + 1)
+        )
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_pending_generations(db: Session) -> None:
+    # Aussi appelé à la libération d'un point de sauvegarde : attendre le vrai commit
+    if db.in_nested_transaction():
+        return
+    pending: Set[str] = db.info.pop(_PENDING_GENERATIONS, set())
+    if not pending:
+        return
+    # Écritures en attente d'abord : les compteurs restent les derniers verrous pris
+    db.flush()
+    # Ordre fixe entre compteurs, pour ne pas s'interbloquer entre eux
+    for name in sorted(pending):
+        _increment(db, name)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_generations(db: Session, transaction: SessionTransaction) -> None:
+    # Transaction annulée : rien à avancer. L'annulation d'un point de sauvegarde
+    # garde les compteurs marqués par le reste de la transaction
+    if transaction.parent is None:
+        db.info.pop(_PENDING_GENERATIONS, None)
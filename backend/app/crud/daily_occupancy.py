@@ -0,0 +1,152 @@
+from collections import Counter
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy import Select, delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.crud.cache_generation import bump_cache_generation
+from app.models.daily_occupancy import DailyOccupancy
+from app.models.leave_request import LeaveRequest, LeaveStatus
+from app.utils.working_days import working_days_between
+
+# Génération des demandes approuvées (table cache_generations), avancée avec l'occupation :
+# source des ETag du calendrier
+APPROVED_LEAVE_REQUESTS_CACHE = "approved_leave_requests"
+
+# Période occupée par une demande approuvée : (début, fin, type de congé)
+OccupancyKey = Tuple[date, date, int]
+
+
+def occupancy_key(leave_request: LeaveRequest) -> Optional[OccupancyKey]:
+    # Seules les demandes approuvées comptent dans l'occupation
+    if leave_request.status != LeaveStatus.APPROVED:
+        return None
+    return leave_request.start_date, leave_request.end_date, leave_request.leave_type_id
+
+
+def _upsert(db: Session, counts: Counter) -> None:
+    # Incrément en base (INSERT ... ON CONFLICT DO UPDATE) : deux approbations concurrentes
+    # sur les mêmes jours s'additionnent. Lignes triées pour verrouiller toujours dans le même ordre
+    rows = [
+        {"day": day, "leave_type_id": leave_type_id, "absent_count": count}
+        for (day, leave_type_id), count in sorted(counts.items())
+        if count
+    ]
+    if not rows:
+        return
+    
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        stmt = (postgresql if dialect == "postgresql" else sqlite).insert(DailyOccupancy)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyOccupancy.day, DailyOccupancy.leave_type_id],
+            set_={"absent_count": DailyOccupancy.absent_count + stmt.excluded.absent_count}
+        )
+        db.execute(stmt, rows)
+    else:
+        for row in rows:
+            result = db.execute(
+                update(DailyOccupancy)
+                .where(DailyOccupancy.day == row["day"], DailyOccupancy.leave_type_id == row["leave_type_id"])
+                .values(absent_count=DailyOccupancy.absent_count + row["absent_count"])
+            )
+            if not result.rowcount:
+                db.execute(insert(DailyOccupancy), [row])
+    
+    if any(row["absent_count"] < 0 for row in rows):
+        # Ne pas garder de jours vides
+        db.execute(
+            delete(DailyOccupancy).where(
+                DailyOccupancy.absent_count <= 0,
+                DailyOccupancy.day.between(rows[0]["day"], rows[-1]["day"])
+            )
+        )
+
+
+def update_daily_occupancy(
+    db: Session, previous: Optional[OccupancyKey], current: Optional[OccupancyKey]
+) -> None:
+    """
+    Reporter sur daily_occupancy le passage d'une demande de l'état previous à l'état
+    current (None : pas ou plus approuvée). Pas de commit : la mise à jour fait partie
+    de la transaction qui modifie la demande.
+    """
+    if previous is None and current is None:
+        return
+    # Même période : le calendrier peut tout de même changer (commentaires...)
+    bump_cache_generation(db, APPROVED_LEAVE_REQUESTS_CACHE)
+    if previous == current:
+        return
+    counts: Counter = Counter()
+    for key, delta in ((previous, -1), (current, 1)):
+        if key is not None:
+            start_date, end_date, leave_type_id = key
+            for day in working_days_between(start_date, end_date):
+                counts[(day, leave_type_id)] += delta
+    _upsert(db, counts)
+
+
+def add_daily_occupancy(db: Session, keys: List[OccupancyKey]) -> None:
+    # Plusieurs demandes approuvées d'un coup (import, approbation par lot)
+    if not keys:
+        return
+    bump_cache_generation(db, APPROVED_LEAVE_REQUESTS_CACHE)
+    counts: Counter = Counter()
+    for start_date, end_date, leave_type_id in keys:
+        for day in working_days_between(start_date, end_date):
+            counts[(day, leave_type_id)] += 1
+    _upsert(db, counts)
+
+
+def daily_occupancy_query(
+    start_date: date, end_date: date, leave_type_id: Optional[int] = None, by_leave_type: bool = False
+) -> Select:
+    # Partagée avec app.crud.aio.daily_occupancy
+    query = select(DailyOccupancy.day)
+    if by_leave_type or leave_type_id is not None:
+        query = query.add_columns(DailyOccupancy.leave_type_id, DailyOccupancy.absent_count)
+    else:
+        query = query.add_columns(
+            func.sum(DailyOccupancy.absent_count).label("absent_count")
+        ).group_by(DailyOccupancy.day)
+    query = query.where(DailyOccupancy.day.between(start_date, end_date))
+    if leave_type_id is not None:
+        query = query.where(DailyOccupancy.leave_type_id == leave_type_id)
+    return query.order_by(DailyOccupancy.day)
+
+
+def get_daily_occupancy(
+    db: Session, start_date: date, end_date: date, leave_type_id: Optional[int] = None,
+    by_leave_type: bool = False
+) -> List:
+    return db.execute(daily_occupancy_query(start_date, end_date, leave_type_id, by_leave_type)).all()
+
+
+def rebuild_daily_occupancy(db: Session, batch_size: int = 5000) -> int:
+    # Reconstruire entièrement daily_occupancy (données antérieures à la table)
+    db.execute(delete(DailyOccupancy))
+    
+    counts: Counter = Counter()
+    count = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(LeaveRequest.id, LeaveRequest.start_date, LeaveRequest.end_date, LeaveRequest.leave_type_id)
+            .where(LeaveRequest.id > last_id, LeaveRequest.status == LeaveStatus.APPROVED)
+            .order_by(LeaveRequest.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            for day in working_days_between(row.start_date, row.end_date):
+                counts[(day, row.leave_type_id)] += 1
+        count += len(rows)
+        last_id = rows[-1].id
+    
+    _upsert(db, counts)
+    bump_cache_generation(db, APPROVED_LEAVE_REQUESTS_CACHE)
+    db.commit()
+    return count
@@ -0,0 +1,81 @@
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+from sqlalchemy import update
+
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+
+
+def enqueue_email(
+    db: Session, *, recipient: str, subject: str, template: str, context: Dict[str, Any],
+    digest: bool = False, send_after: Optional[datetime] = None
+) -> EmailOutbox:
+    # Pas de commit ici : le message est écrit dans la transaction de l'appelant,
+    # il n'existe donc que si la modification métier est elle-même validée
+    db_email = EmailOutbox(
+        recipient=recipient,
+        subject=subject,
+        template=template,
+        context=context,
+        digest=digest,
+        status=OutboxStatus.PENDING,
+        attempts=0,
+        next_attempt_at=send_after or datetime.utcnow()
+    )
+    db.add(db_email)
+    return db_email
+
+
+def claim_due_emails(db: Session, *, limit: int, lease_seconds: int) -> List[EmailOutbox]:
+    now = datetime.utcnow()
+    emails = db.query(EmailOutbox).filter(
+        EmailOutbox.status == OutboxStatus.PENDING,
+        EmailOutbox.next_attempt_at <= now
+    ).order_by(EmailOutbox.next_attempt_at).limit(limit).with_for_update(skip_locked=True).all()
+
+    # Un résumé par destinataire : réserver aussi ses autres notifications dues, même
+    # au-delà de limit, pour qu'elles ne partent pas dans un second résumé
+    digest_recipients = {email.recipient for email in emails if email.digest}
+    if digest_recipients:
+        emails += db.query(EmailOutbox).filter(
+            EmailOutbox.status == OutboxStatus.PENDING,
+            EmailOutbox.next_attempt_at <= now,
+            EmailOutbox.digest.is_(True),
+            EmailOutbox.recipient.in_(digest_recipients),
+            EmailOutbox.id.notin_([email.id for email in emails])
+        ).with_for_update(skip_locked=True).all()
+
+    # Réserver les messages : si le worker s'arrête en cours d'envoi,
+    # ils redeviennent éligibles à l'expiration du bail
+    for email in emails:
+        email.attempts += 1
+        email.next_attempt_at = now + timedelta(seconds=lease_seconds)
+
+    db.commit()
+    return emails
+
+
+def mark_emails_sent(db: Session, *, email_ids: List[int]) -> None:
+    if not email_ids:
+        return
+    db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(email_ids))
+        .values(status=OutboxStatus.SENT, sent_at=datetime.utcnow(), last_error=None)
+    )
+    db.commit()
+
+
+def mark_email_failed(
+    db: Session, *, email_id: int, error: str, retry_at: Optional[datetime]
+) -> None:
+    # Sans date de nouvelle tentative, le message passe en lettre morte
+    values: Dict[str, Any] = {"last_error": error[:1000]}
+    if retry_at is None:
+        values["status"] = OutboxStatus.DEAD
+    else:
+        values["next_attempt_at"] = retry_at
+
+    db.execute(update(EmailOutbox).where(EmailOutbox.id == email_id).values(**values))
+    db.commit()
@@ -2,10 +2,13 @@ from typing import Any, Dict, Optional, Union, List
 from datetime import date
 import datetime
 
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, case, exists, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
 
 from app.models.leave_balance import LeaveBalance
+from app.models.leave_type import LeaveType
+from app.models.user import User
 from app.schemas.leave_balance import LeaveBalanceCreate, LeaveBalanceUpdate
 
 
@@ -89,27 +92,114 @@ def delete_leave_balance(db: Session, *, leave_balance_id: int) -> Optional[Leav
     return leave_balance
 
 
-def adjust_leave_balance(
+def _update_balance(
+    db: Session, user_id: int, leave_type_id: int, days: float, year: int,
+    minimum: Optional[float] = None
+) -> Optional[LeaveBalance]:
+    # Un seul UPDATE ... RETURNING : le calcul se fait en base, sans lecture préalable,
+    # donc deux ajustements concurrents ne peuvent pas s'écraser
+    stmt = update(LeaveBalance).where(
+        LeaveBalance.user_id == user_id,
+        LeaveBalance.leave_type_id == leave_type_id,
+        LeaveBalance.year == year
+    )
+    if minimum is not None:
+        stmt = stmt.where(LeaveBalance.balance >= minimum)
+    stmt = stmt.values(balance=LeaveBalance.balance + days).returning(LeaveBalance)
+    return db.scalars(stmt, execution_options={"populate_existing": True}).one_or_none()
+
+
+def debit_leave_balance(
     db: Session, user_id: int, leave_type_id: int, days: float, year: Optional[int] = None
+) -> Optional[LeaveBalance]:
+    # Vérifier et débiter en une instruction ; None si le solde est absent ou insuffisant.
+    # Pas de commit : le débit fait partie de la transaction de l'appelant
+    if not year:
+        year = datetime.datetime.now().year
+    return _update_balance(db, user_id, leave_type_id, -days, year, minimum=days)
+
+
+def adjust_leave_balance(
+    db: Session, user_id: int, leave_type_id: int, days: float, year: Optional[int] = None,
+    *, commit: bool = True
 ) -> LeaveBalance:
     if not year:
         year = datetime.datetime.now().year
         
-    balance = get_user_leave_balance_by_type(db, user_id, leave_type_id, year)
+    balance = _update_balance(db, user_id, leave_type_id, days, year)
     
     if not balance:
-        # Créer un nouveau solde si aucun n'existe
-        balance = LeaveBalance(
-            user_id=user_id,
-            leave_type_id=leave_type_id,
-            balance=days,
-            year=year
-        )
-        db.add(balance)
-    else:
-        # Ajuster le solde existant
-        balance.balance += days
+        # Créer un nouveau solde si aucun n'existe ; si un autre appel vient de le créer,
+        # la contrainte unique fait échouer l'insertion et l'ajustement est réappliqué
+        try:
+            with db.begin_nested():
+                balance = LeaveBalance(
+                    user_id=user_id,
+                    leave_type_id=leave_type_id,
+                    balance=days,
+                    year=year
+                )
+                db.add(balance)
+        except IntegrityError:
+            balance = _update_balance(db, user_id, leave_type_id, days, year)
         
+    if commit:
+        db.commit()
+        db.refresh(balance)
+    else:
+        db.flush()
+    return balance
+
+
+def rollover_leave_balances(db: Session, year: int, carry_over_max: float) -> int:
+    """
+    Créer en une instruction INSERT ... SELECT les soldes de l'année year de chaque
+    utilisateur actif et de chaque type décompté : jours par défaut du type, plus le
+    reliquat positif de l'année précédente plafonné à carry_over_max jours.
+
+    Les soldes déjà présents pour l'année ne sont pas modifiés, ce qui rend l'opération
+    idempotente ; la lancer avant le début de l'année, avant que adjust_leave_balance
+    ne crée des soldes à la volée. Retourne le nombre de soldes créés.
+    """
+    previous = aliased(LeaveBalance)
+    current = aliased(LeaveBalance)
+    carry_over = case(
+        (previous.balance.is_(None), literal(0.0)),
+        (previous.balance <= 0, literal(0.0)),
+        (previous.balance > carry_over_max, literal(carry_over_max)),
+        else_=previous.balance
+    )
+    rows = (
+        select(
+            User.id,
+            LeaveType.id,
+            literal(year),
+            func.coalesce(LeaveType.default_days, 0) + carry_over
+        )
+        .select_from(User)
+        .join(LeaveType, LeaveType.consumes_balance.is_(True))
+        .outerjoin(
+            previous,
+            and_(
+                previous.user_id == User.id,
+                previous.leave_type_id == LeaveType.id,
+                previous.year == year - 1
+            )
+        )
+        .where(
+            User.is_active.is_(True),
+            ~exists().where(
+                current.user_id == User.id,
+                current.leave_type_id == LeaveType.id,
+                current.year == year
+            )
+        )
+    )
+    result = db.execute(
+        insert(LeaveBalance).from_select(
+            [LeaveBalance.user_id, LeaveBalance.leave_type_id, LeaveBalance.year, LeaveBalance.balance],
+            rows
+        )
+    )
     db.commit()
-    db.refresh(balance)
-    return balance
\ No newline at end of file
+    return result.rowcount
@@ -1,54 +1,184 @@
-from typing import Any, Dict, Optional, Union, List
-from datetime import date, datetime
+from typing import Any, Dict, Iterator, Optional, Union, List, Tuple
+from datetime import date, datetime, timedelta
 
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, Query, aliased, joinedload
+from sqlalchemy import bindparam, desc, and_, delete, insert, select, tuple_, update
 
 from app.models.leave_request import LeaveRequest, LeaveStatus
-from app.schemas.leave_request import LeaveRequestCreate, LeaveRequestUpdate, LeaveRequestApproval
+from app.models.leave_request_month import LeaveRequestMonth
+from app.models.leave_type import LeaveType
+from app.models.user import User
+from app.crud.cache_generation import bump_cache_generation
+from app.crud.daily_occupancy import (
+    APPROVED_LEAVE_REQUESTS_CACHE, add_daily_occupancy, occupancy_key, update_daily_occupancy
+)
+from app.crud.leave_balance import debit_leave_balance
+from app.crud.leave_type_catalog import leave_type_catalog
+from app.models.leave_balance import LeaveBalance
+from app.schemas.leave_request import (
+    MAX_LEAVE_REQUEST_SPAN, LeaveRequestCreate, LeaveRequestUpdate, LeaveRequestApproval,
+    LeaveRequestBatchDecision
+)
+from app.utils.working_days import count_working_days, count_working_days_batch
 
 
 def get_leave_request(db: Session, leave_request_id: int) -> Optional[LeaveRequest]:
     return db.query(LeaveRequest).filter(LeaveRequest.id == leave_request_id).first()
 
 
-def get_leave_requests(db: Session, skip: int = 0, limit: int = 100) -> List[LeaveRequest]:
-    return db.query(LeaveRequest).order_by(desc(LeaveRequest.created_at)).offset(skip).limit(limit).all()
+def _with_details(query: Query) -> Query:
+    # Employé, approbateur et type chargés par jointure, dans la même requête
+    return query.options(
+        joinedload(LeaveRequest.employee),
+        joinedload(LeaveRequest.approver),
+        joinedload(LeaveRequest.leave_type)
+    )
+
+
+def get_leave_request_with_details(db: Session, leave_request_id: int) -> Optional[LeaveRequest]:
+    return _with_details(db.query(LeaveRequest)).filter(LeaveRequest.id == leave_request_id).first()
+
+
+def _paginate(
+    query: Query, skip: int, limit: int, after: Optional[Tuple[datetime, int]]
+) -> List[LeaveRequest]:
+    # Avec un curseur, reprendre après la dernière ligne vue (coût constant quelle que soit la page) ;
+    # sinon, pagination par décalage conservée pour compatibilité
+    query = query.order_by(desc(LeaveRequest.created_at), desc(LeaveRequest.id))
+    if after is not None:
+        query = query.filter(tuple_(LeaveRequest.created_at, LeaveRequest.id) < tuple_(*after))
+    else:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+
+def get_leave_requests(
+    db: Session, skip: int = 0, limit: int = 100, after: Optional[Tuple[datetime, int]] = None
+) -> List[LeaveRequest]:
+    return _paginate(db.query(LeaveRequest), skip, limit, after)
+
+
+def get_leave_requests_by_employee(
+    db: Session, employee_id: int, skip: int = 0, limit: int = 100,
+    after: Optional[Tuple[datetime, int]] = None
+) -> List[LeaveRequest]:
+    query = db.query(LeaveRequest).filter(LeaveRequest.employee_id == employee_id)
+    return _paginate(query, skip, limit, after)
+
+
+def get_leave_requests_with_details(
+    db: Session, skip: int = 0, limit: int = 100, after: Optional[Tuple[datetime, int]] = None,
+    employee_id: Optional[int] = None, status: Optional[str] = None
+) -> List[LeaveRequest]:
+    query = _with_details(db.query(LeaveRequest))
+    if employee_id is not None:
+        query = query.filter(LeaveRequest.employee_id == employee_id)
+    if status is not None:
+        query = query.filter(LeaveRequest.status == status)
+    return _paginate(query, skip, limit, after)
+
+
+def get_pending_leave_requests(
+    db: Session, skip: int = 0, limit: int = 100, after: Optional[Tuple[datetime, int]] = None
+) -> List[LeaveRequest]:
+    query = db.query(LeaveRequest).filter(LeaveRequest.status == LeaveStatus.PENDING)
+    return _paginate(query, skip, limit, after)
 
 
-def get_leave_requests_by_employee(db: Session, employee_id: int, skip: int = 0, limit: int = 100) -> List[LeaveRequest]:
-    return db.query(LeaveRequest).filter(
-        LeaveRequest.employee_id == employee_id
-    ).order_by(desc(LeaveRequest.created_at)).offset(skip).limit(limit).all()
+def month_starts(start_date: date, end_date: date) -> List[date]:
+    # Premier jour de chaque mois couvert par la période
+    months = []
+    current = start_date.replace(day=1)
+    while current <= end_date:
+        months.append(current)
+        current = (current + timedelta(days=32)).replace(day=1)
+    return months
 
 
-def get_pending_leave_requests(db: Session, skip: int = 0, limit: int = 100) -> List[LeaveRequest]:
-    return db.query(LeaveRequest).filter(
-        LeaveRequest.status == LeaveStatus.PENDING
-    ).order_by(desc(LeaveRequest.created_at)).offset(skip).limit(limit).all()
+def sync_leave_request_months(leave_request: LeaveRequest) -> None:
+    # Aligner les lignes de leave_request_months sur les dates et le statut de la demande
+    wanted = set(month_starts(leave_request.start_date, leave_request.end_date))
+    for bucket in list(leave_request.months):
+        if bucket.month in wanted:
+            bucket.status = leave_request.status
+            wanted.discard(bucket.month)
+        else:
+            leave_request.months.remove(bucket)
+    for month in sorted(wanted):
+        leave_request.months.append(LeaveRequestMonth(month=month, status=leave_request.status))
 
 
-def calculate_days(start_date: date, end_date: date) -> float:
-    # Simple calculation, can be improved to exclude weekends and holidays
-    delta = end_date - start_date
-    return delta.days + 1
+def find_overlapping_leave_request(
+    db: Session, *, employee_id: int, start_date: date, end_date: date,
+    exclude_id: Optional[int] = None
+) -> Optional[LeaveRequest]:
+    """
+    Demande en attente ou approuvée de l'employé chevauchant la période, ou None.
 
+    Verrouille d'abord la ligne de l'employé (SELECT ... FOR UPDATE) jusqu'à la fin de la
+    transaction de l'appelant : deux créations ou modifications simultanées pour le même
+    employé passent l'une après l'autre, la seconde voit la demande de la première.
 
-def create_leave_request(db: Session, leave_request_in: LeaveRequestCreate, employee_id: int) -> LeaveRequest:
-    days_count = calculate_days(leave_request_in.start_date, leave_request_in.end_date)
+    Filtre sur les deux bornes, sans supposer que les demandes actives de l'employé ne se
+    chevauchent pas entre elles (historique importé, données antérieures). Une demande
+    ne dépasse jamais MAX_LEAVE_REQUEST_SPAN (contrôlé à la création, à la modification
+    et à l'import) : celles qui chevauchent la période commencent donc entre
+    start_date - MAX_LEAVE_REQUEST_SPAN et end_date, et l'index (employee_id,
+    start_date, end_date) limite le parcours à cette fenêtre, quel que soit
+    l'historique de l'employé.
+    """
+    db.execute(select(User.id).where(User.id == employee_id).with_for_update())
+    
+    query = db.query(LeaveRequest).filter(
+        LeaveRequest.employee_id == employee_id,
+        LeaveRequest.start_date >= start_date - MAX_LEAVE_REQUEST_SPAN,
+        LeaveRequest.start_date <= end_date,
+        LeaveRequest.end_date >= start_date,
+        LeaveRequest.status.in_([LeaveStatus.PENDING, LeaveStatus.APPROVED])
+    )
+    if exclude_id is not None:
+        query = query.filter(LeaveRequest.id != exclude_id)
+    
+    return query.first()
+
+
+def calculate_days(
+    start_date: date, end_date: date, start_half_day: bool = False, end_half_day: bool = False
+) -> float:
+    # Jours ouvrés : hors week-ends et jours fériés, demi-journées comprises
+    return count_working_days(
+        start_date, end_date, start_half_day=start_half_day, end_half_day=end_half_day
+    )
+
+
+def create_leave_request(
+    db: Session, leave_request_in: LeaveRequestCreate, employee_id: int, *, commit: bool = True
+) -> LeaveRequest:
+    days_count = calculate_days(
+        leave_request_in.start_date, leave_request_in.end_date,
+        leave_request_in.start_half_day, leave_request_in.end_half_day
+    )
     
     db_leave_request = LeaveRequest(
         start_date=leave_request_in.start_date,
         end_date=leave_request_in.end_date,
         days_count=days_count,
+        start_half_day=leave_request_in.start_half_day,
+        end_half_day=leave_request_in.end_half_day,
         comment=leave_request_in.comment,
         employee_id=employee_id,
         leave_type_id=leave_request_in.leave_type_id,
         status=LeaveStatus.PENDING
     )
+    sync_leave_request_months(db_leave_request)
     db.add(db_leave_request)
-    db.commit()
-    db.refresh(db_leave_request)
+    if commit:
+        db.commit()
+        db.refresh(db_leave_request)
+    else:
+        # L'appelant valide la transaction (ex. avec les notifications en file)
+        db.flush()
     return db_leave_request
 
 
@@ -61,38 +191,191 @@ def update_leave_request(
         update_data = obj_in.dict(exclude_unset=True)
     
     # Recalculate days_count if dates change
-    if "start_date" in update_data or "end_date" in update_data:
-        start_date = update_data.get("start_date", db_obj.start_date)
-        end_date = update_data.get("end_date", db_obj.end_date)
-        update_data["days_count"] = calculate_days(start_date, end_date)
+    if {"start_date", "end_date", "start_half_day", "end_half_day"} & update_data.keys():
+        update_data["days_count"] = calculate_days(
+            update_data.get("start_date", db_obj.start_date),
+            update_data.get("end_date", db_obj.end_date),
+            update_data.get("start_half_day", db_obj.start_half_day),
+            update_data.get("end_half_day", db_obj.end_half_day)
+        )
     
+    previous_occupancy = occupancy_key(db_obj)
     for field in update_data:
         if field in update_data:
             setattr(db_obj, field, update_data[field])
     
+    if "start_date" in update_data or "end_date" in update_data or "status" in update_data:
+        sync_leave_request_months(db_obj)
+    update_daily_occupancy(db, previous_occupancy, occupancy_key(db_obj))
+    
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
     return db_obj
 
 
+# Motifs de refus d'une décision (process_leave_request, process_leave_requests_batch)
+DECISION_NOT_FOUND = "not_found"
+DECISION_ALREADY_PROCESSED = "already_processed"
+DECISION_INSUFFICIENT_BALANCE = "insufficient_balance"
+
+
 def process_leave_request(
-    db: Session, *, db_obj: LeaveRequest, obj_in: LeaveRequestApproval, approver_id: int
-) -> LeaveRequest:
-    # Mettre à jour le statut et les commentaires
-    db_obj.status = obj_in.status
-    db_obj.response_comment = obj_in.response_comment
-    db_obj.approver_id = approver_id
+    db: Session, *, db_obj: LeaveRequest, obj_in: LeaveRequestApproval, approver_id: int,
+    commit: bool = True
+) -> str:
+    """
+    Appliquer une décision sur une demande en attente : statut, index par mois, débit
+    du solde pour les types décomptés, puis occupation.
+
+    Les verrous sont pris dans le même ordre que process_leave_requests_batch
+    (demande, solde, occupation, génération au commit) : une approbation unitaire et
+    un lot concurrents sur le même solde ne peuvent pas s'interbloquer.
+
+    Retourne le statut appliqué, ou le motif du refus (DECISION_ALREADY_PROCESSED si un
+    autre traitement est passé avant, DECISION_INSUFFICIENT_BALANCE) ; en cas de refus
+    l'appelant annule la transaction.
+    """
+    # Seulement si la demande est encore en attente : de deux traitements concurrents,
+    # un seul modifie la ligne
+    result = db.execute(
+        update(LeaveRequest)
+        .where(LeaveRequest.id == db_obj.id, LeaveRequest.status == LeaveStatus.PENDING)
+        .values(status=obj_in.status, response_comment=obj_in.response_comment, approver_id=approver_id)
+    )
+    if result.rowcount == 0:
+        return DECISION_ALREADY_PROCESSED
+    sync_leave_request_months(db_obj)
+    if obj_in.status == LeaveStatus.APPROVED:
+        leave_type = leave_type_catalog.get(db, db_obj.leave_type_id)
+        if leave_type is not None and leave_type.consumes_balance:
+            balance = debit_leave_balance(
+                db, user_id=db_obj.employee_id, leave_type_id=db_obj.leave_type_id,
+                days=db_obj.days_count
+            )
+            if balance is None:
+                return DECISION_INSUFFICIENT_BALANCE
+        update_daily_occupancy(db, None, (db_obj.start_date, db_obj.end_date, db_obj.leave_type_id))
     
-    db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
-    return db_obj
+    if commit:
+        db.commit()
+        db.refresh(db_obj)
+    else:
+        db.flush()
+    return obj_in.status.value
+
+
+def process_leave_requests_batch(
+    db: Session, *, decisions: List[LeaveRequestBatchDecision], approver_id: int,
+    year: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], List[LeaveRequest]]:
+    """
+    Appliquer plusieurs décisions d'approbation ou de refus dans la transaction de
+    l'appelant, sans commit.
+
+    Les demandes puis les soldes concernés sont verrouillés chacun en une requête ;
+    les soldes sont répartis dans l'ordre des décisions, puis statuts, index par mois
+    et soldes sont écrits par instructions groupées plutôt que demande par demande.
+    Retourne le résultat de chaque décision (statut appliqué ou motif du refus) et
+    les demandes traitées.
+    """
+    if not year:
+        year = datetime.now().year
+    
+    leave_requests = {
+        leave_request.id: leave_request
+        for leave_request in db.query(LeaveRequest)
+        .filter(LeaveRequest.id.in_([decision.id for decision in decisions]))
+        .order_by(LeaveRequest.id)
+        .with_for_update()
+    }
+    
+    # Jours demandés par solde, pour verrouiller les soldes d'un coup
+    balance_keys = set()
+    for decision in decisions:
+        leave_request = leave_requests.get(decision.id)
+        if (leave_request is None or leave_request.status != LeaveStatus.PENDING
+                or decision.status != LeaveStatus.APPROVED):
+            continue
+        leave_type = leave_type_catalog.get(db, leave_request.leave_type_id)
+        if leave_type is not None and leave_type.consumes_balance:
+            balance_keys.add((leave_request.employee_id, leave_request.leave_type_id))
+    balances = {}
+    if balance_keys:
+        balances = {
+            (balance.user_id, balance.leave_type_id): balance
+            for balance in db.query(LeaveBalance)
+            .filter(
+                tuple_(LeaveBalance.user_id, LeaveBalance.leave_type_id).in_(sorted(balance_keys)),
+                LeaveBalance.year == year
+            )
+            .order_by(LeaveBalance.id)
+            .with_for_update()
+        }
+    remaining = {key: balance.balance for key, balance in balances.items()}
+    
+    outcomes: List[Dict[str, Any]] = []
+    processed: List[LeaveRequest] = []
+    debits: Dict[Tuple[int, int], float] = {}
+    for decision in decisions:
+        leave_request = leave_requests.get(decision.id)
+        if leave_request is None:
+            outcomes.append({"id": decision.id, "outcome": DECISION_NOT_FOUND})
+            continue
+        if leave_request.status != LeaveStatus.PENDING:
+            outcomes.append({"id": decision.id, "outcome": DECISION_ALREADY_PROCESSED})
+            continue
+        
+        key = (leave_request.employee_id, leave_request.leave_type_id)
+        if decision.status == LeaveStatus.APPROVED and key in balance_keys:
+            # Même règle que debit_leave_balance : le solde doit couvrir la demande
+            if key not in remaining or remaining[key] < leave_request.days_count:
+                outcomes.append({"id": decision.id, "outcome": DECISION_INSUFFICIENT_BALANCE})
+                continue
+            remaining[key] -= leave_request.days_count
+            debits[key] = debits.get(key, 0) + leave_request.days_count
+        
+        leave_request.status = decision.status.value
+        leave_request.response_comment = decision.response_comment
+        leave_request.approver_id = approver_id
+        outcomes.append({"id": decision.id, "outcome": decision.status.value})
+        processed.append(leave_request)
+    
+    if not processed:
+        return outcomes, processed
+    
+    # Statuts écrits au flush, en un UPDATE exécuté en lot (executemany)
+    db.flush()
+    
+    for decision_status in (LeaveStatus.APPROVED, LeaveStatus.REJECTED):
+        ids = [leave_request.id for leave_request in processed if leave_request.status == decision_status]
+        if ids:
+            db.execute(
+                update(LeaveRequestMonth)
+                .where(LeaveRequestMonth.leave_request_id.in_(ids))
+                .values(status=decision_status.value)
+            )
+    
+    if debits:
+        db.execute(
+            update(LeaveBalance.__table__)
+            .where(LeaveBalance.id == bindparam("b_id"))
+            .values(balance=LeaveBalance.balance - bindparam("b_days")),
+            [{"b_id": balances[key].id, "b_days": days} for key, days in sorted(debits.items())]
+        )
+    
+    add_daily_occupancy(db, [
+        (leave_request.start_date, leave_request.end_date, leave_request.leave_type_id)
+        for leave_request in processed
+        if leave_request.status == LeaveStatus.APPROVED
+    ])
+    return outcomes, processed
 
 
 def delete_leave_request(db: Session, *, leave_request_id: int) -> Optional[LeaveRequest]:
     leave_request = db.query(LeaveRequest).filter(LeaveRequest.id == leave_request_id).first()
     if leave_request:
+        update_daily_occupancy(db, occupancy_key(leave_request), None)
         db.delete(leave_request)
         db.commit()
     return leave_request
@@ -101,14 +384,135 @@ def delete_leave_request(db: Session, *, leave_request_id: int) -> Optional[Leav
 def get_leave_requests_by_date_range(
     db: Session, start_date: date, end_date: date, status: Optional[str] = None
 ) -> List[LeaveRequest]:
+    # Candidats issus de l'index par mois, puis filtre exact sur les dates
+    months = select(LeaveRequestMonth.leave_request_id).where(
+        LeaveRequestMonth.month.between(start_date.replace(day=1), end_date.replace(day=1))
+    )
+    if status:
+        months = months.where(LeaveRequestMonth.status == status)
+    
     query = db.query(LeaveRequest).filter(
         and_(
+            LeaveRequest.id.in_(months),
             LeaveRequest.start_date <= end_date,
             LeaveRequest.end_date >= start_date
         )
     )
     
-    if status:
-        query = query.filter(LeaveRequest.status == status)
+    return query.all()
+
+
+def stream_leave_requests_for_export(
+    db: Session, *, start_date: Optional[date] = None, end_date: Optional[date] = None,
+    status: Optional[str] = None, leave_type_id: Optional[int] = None,
+    employee_id: Optional[int] = None, yield_per: int = 1000
+) -> Iterator[Row]:
+    # Lignes plates (colonnes et noms joints, sans objets ORM) lues par un curseur
+    # côté serveur, yield_per lignes à la fois : la mémoire ne dépend pas du volume
+    employee = aliased(User)
+    approver = aliased(User)
+    query = (
+        select(
+            LeaveRequest.id, LeaveRequest.employee_id,
+            employee.email.label("employee_email"),
+            employee.first_name.label("employee_first_name"),
+            employee.last_name.label("employee_last_name"),
+            LeaveRequest.leave_type_id, LeaveType.name.label("leave_type_name"),
+            LeaveRequest.start_date, LeaveRequest.end_date,
+            LeaveRequest.start_half_day, LeaveRequest.end_half_day,
+            LeaveRequest.days_count, LeaveRequest.status, LeaveRequest.approver_id,
+            approver.first_name.label("approver_first_name"),
+            approver.last_name.label("approver_last_name"),
+            LeaveRequest.comment, LeaveRequest.response_comment,
+            LeaveRequest.created_at, LeaveRequest.updated_at
+        )
+        .join(employee, LeaveRequest.employee_id == employee.id)
+        .join(LeaveType, LeaveRequest.leave_type_id == LeaveType.id)
+        .outerjoin(approver, LeaveRequest.approver_id == approver.id)
+        .order_by(LeaveRequest.id)
+    )
+    # Demandes chevauchant la période, comme get_leave_requests_by_date_range
+    if start_date is not None:
+        query = query.where(LeaveRequest.end_date >= start_date)
+    if end_date is not None:
+        query = query.where(LeaveRequest.start_date <= end_date)
+    if status is not None:
+        query = query.where(LeaveRequest.status == status)
+    if leave_type_id is not None:
+        query = query.where(LeaveRequest.leave_type_id == leave_type_id)
+    if employee_id is not None:
+        query = query.where(LeaveRequest.employee_id == employee_id)
+    
+    yield from db.execute(query.execution_options(yield_per=yield_per))
+
+
+def rebuild_leave_request_months(db: Session, batch_size: int = 5000) -> int:
+    # Reconstruire entièrement leave_request_months (données antérieures à l'index)
+    db.execute(delete(LeaveRequestMonth))
+    
+    count = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(LeaveRequest.id, LeaveRequest.start_date, LeaveRequest.end_date, LeaveRequest.status)
+            .where(LeaveRequest.id > last_id)
+            .order_by(LeaveRequest.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        
+        buckets = [
+            {"leave_request_id": row.id, "month": month, "status": row.status}
+            for row in rows
+            for month in month_starts(row.start_date, row.end_date)
+        ]
+        db.execute(insert(LeaveRequestMonth), buckets)
+        count += len(rows)
+        last_id = rows[-1].id
+    
+    db.commit()
+    return count
+
+
+def recompute_days_counts(db: Session, batch_size: int = 50000) -> Tuple[int, int]:
+    # Recalculer days_count de tout l'historique par lots vectorisés ;
+    # les soldes déjà débités ne sont pas modifiés
+    processed = 0
+    updated = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(
+                LeaveRequest.id, LeaveRequest.start_date, LeaveRequest.end_date,
+                LeaveRequest.start_half_day, LeaveRequest.end_half_day, LeaveRequest.days_count
+            )
+            .where(LeaveRequest.id > last_id)
+            .order_by(LeaveRequest.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        
+        counts = count_working_days_batch(
+            [row.start_date for row in rows],
+            [row.end_date for row in rows],
+            [bool(row.start_half_day) for row in rows],
+            [bool(row.end_half_day) for row in rows]
+        )
+        changes = [
+            {"id": row.id, "days_count": float(count)}
+            for row, count in zip(rows, counts)
+            if row.days_count != count
+        ]
+        if changes:
+            db.execute(update(LeaveRequest), changes)
+            # days_count figure dans la réponse du calendrier : invalider son ETag
+            bump_cache_generation(db, APPROVED_LEAVE_REQUESTS_CACHE)
+        db.commit()
+        
+        processed += len(rows)
+        updated += len(changes)
+        last_id = rows[-1].id
     
-    return query.all()
\ No newline at end of file
+    return processed, updated
\ No newline at end of file
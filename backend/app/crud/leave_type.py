@@ -2,6 +2,8 @@ from typing import Any, Dict, Optional, Union, List
 
 from sqlalchemy.orm import Session
 
+from app.crud.cache_generation import bump_cache_generation
+from app.crud.leave_type_catalog import LEAVE_TYPES_CACHE, leave_type_catalog
 from app.models.leave_type import LeaveType
 from app.schemas.leave_type import LeaveTypeCreate, LeaveTypeUpdate
 
@@ -23,10 +25,13 @@ def create_leave_type(db: Session, leave_type_in: LeaveTypeCreate) -> LeaveType:
         name=leave_type_in.name,
         requires_proof=leave_type_in.requires_proof,
         description=leave_type_in.description,
-        default_days=leave_type_in.default_days
+        default_days=leave_type_in.default_days,
+        consumes_balance=leave_type_in.consumes_balance
     )
     db.add(db_leave_type)
+    bump_cache_generation(db, LEAVE_TYPES_CACHE)
     db.commit()
+    leave_type_catalog.invalidate()
     db.refresh(db_leave_type)
     return db_leave_type
 
@@ -44,7 +49,9 @@ def update_leave_type(
             setattr(db_obj, field, update_data[field])
     
     db.add(db_obj)
+    bump_cache_generation(db, LEAVE_TYPES_CACHE)
     db.commit()
+    leave_type_catalog.invalidate()
     db.refresh(db_obj)
     return db_obj
 
@@ -53,5 +60,7 @@ def delete_leave_type(db: Session, *, leave_type_id: int) -> Optional[LeaveType]
     leave_type = db.query(LeaveType).filter(LeaveType.id == leave_type_id).first()
     if leave_type:
         db.delete(leave_type)
+        bump_cache_generation(db, LEAVE_TYPES_CACHE)
         db.commit()
+        leave_type_catalog.invalidate()
     return leave_type
\ No newline at end of file
@@ -0,0 +1,117 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.cache_generation import get_cache_generation
+from app.models.leave_type import LeaveType
+
+# Nom du compteur de génération associé au catalogue dans la table cache_generations
+LEAVE_TYPES_CACHE = "leave_types"
+
+
+@dataclass(frozen=True)
+class CachedLeaveType:
+    """
+    Copie en mémoire d'un type de congé, détachée de toute session.
+    """
+    id: int
+    name: str
+    requires_proof: bool
+    description: Optional[str]
+    default_days: float
+    consumes_balance: bool
+
+
+class LeaveTypeCatalog:
+    """
+    Catalogue des types de congés conservé en mémoire par chaque worker.
+
+    Les types changent rarement : ils sont lus une fois puis servis depuis le cache.
+    Toute modification incrémente la génération "leave_types" en base ; au plus
+    toutes les LEAVE_TYPE_CACHE_CHECK_SECONDS, le catalogue relit ce compteur et se
+    recharge s'il a changé, ce qui garde les différents workers cohérents.
+    """
+
+    def __init__(self, check_interval: float) -> None:
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._by_id: Dict[int, CachedLeaveType] = {}
+        self._by_name: Dict[str, CachedLeaveType] = {}
+        self._generation: Optional[int] = None
+        self._checked_at = 0.0
+
+    def load(self, db: Session) -> None:
+        self._load(db)
+
+    def invalidate(self) -> None:
+        # Rechargement forcé au prochain accès (modification faite par ce worker)
+        with self._lock:
+            self._generation = None
+
+    def get(self, db: Session, leave_type_id: int) -> Optional[CachedLeaveType]:
+        self._refresh(db)
+        return self._by_id.get(leave_type_id)
+
+    def get_by_name(self, db: Session, name: str) -> Optional[CachedLeaveType]:
+        self._refresh(db)
+        return self._by_name.get(name)
+
+    def all(self, db: Session) -> List[CachedLeaveType]:
+        self._refresh(db)
+        return sorted(self._by_id.values(), key=lambda leave_type: leave_type.id)
+
+    def generation(self, db: Session) -> int:
+        # Génération des types actuellement servis (ETag de la liste des types)
+        self._refresh(db)
+        generation = self._generation
+        if generation is None:
+            # Invalidé entre-temps par une modification de ce worker
+            return get_cache_generation(db, LEAVE_TYPES_CACHE)
+        return generation
+
+    def _refresh(self, db: Session) -> None:
+        if self._generation is not None and time.monotonic() - self._checked_at < self._check_interval:
+            return
+        if self._generation is None:
+            self._load(db)
+            return
+        generation = get_cache_generation(db, LEAVE_TYPES_CACHE)
+        if generation != self._generation:
+            self._load(db)
+        else:
+            self._checked_at = time.monotonic()
+
+    def _load(self, db: Session) -> None:
+        # Les lectures se font hors du verrou : appelé via run_sync, le catalogue
+        # cède la boucle d'événements pendant la requête, et une autre coroutine
+        # bloquée sur le verrou figerait alors la boucle entière. Le verrou ne
+        # protège que le remplacement des données, sans revenir en arrière si
+        # un rechargement concurrent a déjà lu une génération plus récente.
+        # Lire la génération avant les types : une modification concurrente
+        # provoquera au pire un rechargement de trop, jamais un cache périmé
+        generation = get_cache_generation(db, LEAVE_TYPES_CACHE)
+        leave_types = [
+            CachedLeaveType(
+                id=leave_type.id,
+                name=leave_type.name,
+                requires_proof=bool(leave_type.requires_proof),
+                description=leave_type.description,
+                default_days=leave_type.default_days or 0,
+                consumes_balance=bool(leave_type.consumes_balance)
+            )
+            for leave_type in db.query(LeaveType).all()
+        ]
+        with self._lock:
+            if self._generation is not None and generation < self._generation:
+                return
+            self._by_id = {leave_type.id: leave_type for leave_type in leave_types}
+            self._by_name = {leave_type.name: leave_type for leave_type in leave_types}
+            self._generation = generation
+            self._checked_at = time.monotonic()
+
+
+leave_type_catalog = LeaveTypeCatalog(settings.LEAVE_TYPE_CACHE_CHECK_SECONDS)
@@ -2,10 +2,15 @@ from typing import Any, Dict, Optional, Union, List
 
 from sqlalchemy.orm import Session
 
-from app.core.security import get_password_hash, verify_password
+from app.core.cache import principal_cache
+from app.core.security import get_password_hash, verify_and_update_password
+from app.crud.cache_generation import bump_cache_generation
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
+# Génération des utilisateurs (table cache_generations), source des ETag des listes d'utilisateurs
+USERS_CACHE = "users"
+
 
 def get_user(db: Session, user_id: int) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
@@ -19,6 +24,12 @@ def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
     return db.query(User).offset(skip).limit(limit).all()
 
 
+def get_users_by_ids(db: Session, user_ids: List[int]) -> List[User]:
+    if not user_ids:
+        return []
+    return db.query(User).filter(User.id.in_(user_ids)).all()
+
+
 def get_approvers(db: Session) -> List[User]:
     return db.query(User).filter(User.is_approver == True).all()
 
@@ -31,9 +42,11 @@ def create_user(db: Session, user_in: UserCreate) -> User:
         hashed_password=get_password_hash(user_in.password),
         is_active=user_in.is_active,
         is_admin=user_in.is_admin,
-        is_approver=user_in.is_approver
+        is_approver=user_in.is_approver,
+        email_digest=user_in.email_digest
     )
     db.add(db_user)
+    bump_cache_generation(db, USERS_CACHE)
     db.commit()
     db.refresh(db_user)
     return db_user
@@ -54,7 +67,10 @@ def update_user(db: Session, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str
             setattr(db_obj, field, update_data[field])
     
     db.add(db_obj)
+    bump_cache_generation(db, USERS_CACHE)
     db.commit()
+    # Droits, statut actif ou identité modifiés : ne plus servir l'ancienne version
+    principal_cache.pop(db_obj.id)
     db.refresh(db_obj)
     return db_obj
 
@@ -63,14 +79,27 @@ def delete_user(db: Session, *, user_id: int) -> Optional[User]:
     user = db.query(User).filter(User.id == user_id).first()
     if user:
         db.delete(user)
+        bump_cache_generation(db, USERS_CACHE)
         db.commit()
+        principal_cache.pop(user_id)
     return user
 
 
+def set_password_hash(db: Session, *, db_obj: User, hashed_password: str) -> User:
+    db_obj.hashed_password = hashed_password
+    db.add(db_obj)
+    db.commit()
+    return db_obj
+
+
 def authenticate(db: Session, *, email: str, password: str) -> Optional[User]:
+    # Version synchrone pour les scripts ; l'API passe par password_hasher (app.core.security)
     user = get_user_by_email(db, email=email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        set_password_hash(db, db_obj=user, hashed_password=new_hash)
     return user
\ No newline at end of file
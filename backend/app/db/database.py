@@ -1,14 +1,159 @@
-from sqlalchemy import create_engine, MetaData
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy import create_engine, exc, MetaData
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.sql import functions
 
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool qui mesure le temps d'obtention des connexions.
+
+    Une attente est comptée quand toutes les connexions (pool_size + max_overflow)
+    existent et qu'aucune n'est libre au moment de la demande : c'est le signe qu'il
+    faut agrandir le pool ou réduire la concurrence du worker.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._nested = threading.local()
+        self.checkouts = 0
+        self.checkout_seconds_total = 0.0
+        self.checkout_seconds_max = 0.0
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        # QueuePool._do_get se rappelle lui-même après une course : ne mesurer que l'appel externe
+        if getattr(self._nested, "active", False):
+            return super()._do_get()
+
+        # Connexion libre dans la file : servie tout de suite, même pool plein
+        exhausted = (
+            self._max_overflow > -1 and self._overflow >= self._max_overflow and self._pool.empty()
+        )
+        self._nested.active = True
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            self._nested.active = False
+            elapsed = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.checkout_seconds_total += elapsed
+                self.checkout_seconds_max = max(self.checkout_seconds_max, elapsed)
+                if exhausted:
+                    self.waits += 1
+                    self.wait_seconds_total += elapsed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "size": self.size(),
+                "max_overflow": self._max_overflow,
+                "in_use": self.checkedout(),
+                "idle": self.checkedin(),
+                "overflow": max(self.overflow(), 0),
+                "checkouts": self.checkouts,
+                "checkout_seconds_total": self.checkout_seconds_total,
+                "checkout_seconds_max": self.checkout_seconds_max,
+                "waits": self.waits,
+                "wait_seconds_total": self.wait_seconds_total,
+                "timeouts": self.timeouts,
+            }
+
+
+def _engine_options(database_url: str) -> Dict[str, Any]:
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # Base en mémoire : une seule connexion par thread, pas de pool à régler
+        return {}
+
+    options: Dict[str, Any] = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_POOL_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.get_backend_name() == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        # Appliqué par le serveur à chaque instruction de la connexion
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Pilotes asynchrones utilisés pour chaque base de DATABASE_URL
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(database_url: str) -> URL:
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Pas de pilote asynchrone pour la base {backend}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    # Créé au premier usage : les scripts synchrones n'ont pas besoin d'asyncpg
+    global _async_engine
+    if _async_engine is None:
+        url = async_database_url(settings.DATABASE_URL)
+        options = _engine_options(settings.DATABASE_URL)
+        # Même réglage que le pool synchrone, avec la classe adaptée à asyncio (non instrumentée)
+        if "poolclass" in options:
+            options["poolclass"] = AsyncAdaptedQueuePool
+        if url.get_backend_name() == "postgresql" and "connect_args" in options:
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+            }
+        _async_engine = create_async_engine(url, **options)
+    return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    global _async_session_factory
+    if _async_session_factory is None:
+        # Pas d'expiration au commit : les objets restent lisibles sans rechargement implicite,
+        # impossible en asynchrone
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _async_session_factory()
+
 Base = declarative_base()
 
+# Sous SQLite, CURRENT_TIMESTAMP n'a ni le format ni la précision des dates écrites par
+# SQLAlchemy : les comparaisons (pagination par created_at) se feraient sur des chaînes
+# incohérentes. Produire le même format, à la milliseconde.
+@compiles(functions.now, "sqlite")
+def _sqlite_now(element, compiler, **kw):
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
 # Fonction pour obtenir une session de base de données
 def get_db():
     db = SessionLocal()
@@ -17,6 +162,25 @@ def get_db():
     finally:
         db.close()
 
-# Fonction pour créer les tables en base de données
+# Équivalent asynchrone de get_db, pour les routes async def
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Créer les tables sans passer par les migrations (bases jetables des benchmarks) ;
+# les bases de l'application sont gérées par Alembic
 def create_tables():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+
+# Statistiques du pool de connexions du worker (vide si le pool n'est pas instrumenté)
+def get_pool_stats() -> Dict[str, Any]:
+    pool = engine.pool
+    return pool.stats() if isinstance(pool, InstrumentedQueuePool) else {}
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
\ No newline at end of file
@@ -3,9 +3,18 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.api import api_router
 from app.core.config import settings
-from app.db.database import create_tables
+from app.core.metrics import MetricsMiddleware, instrument_engine, metrics_enabled, metrics_endpoint
+from app.core.security import password_hasher
+from app.crud import leave_type_catalog
+from app.db.database import SessionLocal, dispose_async_engine, engine, get_async_engine
+from app.services.email_dispatcher import email_dispatcher
+from app.utils.fast_json import FastJSONResponse, fast_json_enabled
 
-app = FastAPI(title="Système de Gestion des Congés", version="1.0.0")
+app = FastAPI(
+    title="Système de Gestion des Congés",
+    version="1.0.0",
+    **({"default_response_class": FastJSONResponse} if fast_json_enabled() else {})
+)
 
 # Configurer CORS
 app.add_middleware(
@@ -14,15 +23,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Ajouté en dernier, donc le plus à l'extérieur : mesure aussi les autres middlewares
+if metrics_enabled():
+    app.add_middleware(MetricsMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
 # Inclure les routes API
 app.include_router(api_router, prefix="/api")
 
 @app.on_event("startup")
 async def startup_event():
-    # Créer les tables au démarrage si elles n'existent pas
-    create_tables()
+    # Le schéma est géré par Alembic ("alembic upgrade head"), une fois avant le
+    # démarrage des workers (voir start.sh)
+
+    if metrics_enabled():
+        instrument_engine(engine)
+        instrument_engine(get_async_engine().sync_engine)
+
+    # Charger le catalogue des types de congés avant la première requête
+    db = SessionLocal()
+    try:
+        leave_type_catalog.load(db)
+    finally:
+        db.close()
+
+    # Vider la file des emails en arrière-plan, hors du chemin des requêtes
+    if settings.EMAIL_DISPATCHER_ENABLED:
+        email_dispatcher.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await email_dispatcher.stop()
+    password_hasher.shutdown()
+    await dispose_async_engine()
 
 @app.get("/")
 def read_root():
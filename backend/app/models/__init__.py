@@ -1,4 +1,8 @@
 from app.models.user import User
 from app.models.leave_type import LeaveType
 from app.models.leave_request import LeaveRequest, LeaveStatus
-from app.models.leave_balance import LeaveBalance
\ No newline at end of file
+from app.models.leave_request_month import LeaveRequestMonth
+from app.models.leave_balance import LeaveBalance
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+from app.models.cache_generation import CacheGeneration
+from app.models.daily_occupancy import DailyOccupancy
\ No newline at end of file
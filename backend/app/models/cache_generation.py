@@ -0,0 +1,15 @@
+from sqlalchemy import BigInteger, Column, String
+
+from app.db.database import Base
+
+class CacheGeneration(Base):
+    """
+    Compteur incrémenté à chaque modification d'une donnée mise en cache.
+
+    Chaque worker compare la valeur en base à celle de son cache local
+    pour savoir s'il doit le recharger.
+    """
+    __tablename__ = "cache_generations"
+
+    name = Column(String, primary_key=True)
+    generation = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, ForeignKey, Date
+
+from app.db.database import Base
+
+class DailyOccupancy(Base):
+    """
+    Nombre de personnes absentes par jour ouvré et par type de congé, d'après les
+    demandes approuvées. Tenu à jour par app.crud.daily_occupancy à chaque
+    approbation, modification ou suppression d'une demande approuvée.
+
+    La clé primaire (day, leave_type_id) sert d'index : une carte d'absences sur
+    un an est un parcours d'intervalle d'au plus 365 jours par type.
+    """
+    __tablename__ = "daily_occupancy"
+
+    day = Column(Date, primary_key=True)
+    # Index propre pour la suppression en cascade d'un type de congé
+    leave_type_id = Column(
+        Integer, ForeignKey("leave_types.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    absent_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,35 @@
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, JSON, Index
+from sqlalchemy.sql import func
+import enum
+
+from app.db.database import Base
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"  # Abandonné après trop de tentatives
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Sert la requête du dispatcher : messages en attente dont l'échéance est passée
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    template = Column(String, nullable=False)  # Nom du template dans app.services.email.TEMPLATES
+    context = Column(JSON, default=dict)  # Variables de rendu du template
+    digest = Column(Boolean, default=False, nullable=False)  # Regroupé par destinataire à l'envoi
+
+    # Suivi de l'envoi
+    status = Column(String, default=OutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(String, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=False)  # UTC, renseigné par app.crud.email_outbox
+    sent_at = Column(DateTime, nullable=True)
+
+    # Dates de création et mise à jour
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date, DateTime, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -6,8 +6,12 @@ from app.db.database import Base
 
 class LeaveBalance(Base):
     __tablename__ = "leave_balances"
+    __table_args__ = (
+        # Un seul solde par utilisateur, type et année : les débits concurrents portent sur la même ligne
+        UniqueConstraint("user_id", "leave_type_id", "year", name="uq_leave_balances_user_type_year"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     balance = Column(Float, default=0)  # Solde actuel
     year = Column(Integer, index=True)  # Année concernée
     
@@ -19,5 +23,5 @@ class LeaveBalance(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     user = relationship("User", back_populates="leave_balances")
     
-    leave_type_id = Column(Integer, ForeignKey("leave_types.id"))
+    leave_type_id = Column(Integer, ForeignKey("leave_types.id"), index=True)
     leave_type = relationship("LeaveType", back_populates="leave_balances")
\ No newline at end of file
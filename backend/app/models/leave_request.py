@@ -1,6 +1,6 @@
-from sqlalchemy import Boolean, Column, Integer, String, Float, ForeignKey, Date, DateTime, Enum
+from sqlalchemy import Boolean, Column, Integer, String, Float, ForeignKey, Date, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, false
 import enum
 
 from app.db.database import Base
@@ -12,11 +12,21 @@ class LeaveStatus(str, enum.Enum):
 
 class LeaveRequest(Base):
     __tablename__ = "leave_requests"
+    __table_args__ = (
+        # Pagination par clé (created_at, id) des listes, globale et filtrées
+        Index("ix_leave_requests_created_at_id", "created_at", "id"),
+        Index("ix_leave_requests_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_leave_requests_employee_id_created_at_id", "employee_id", "created_at", "id"),
+        # Détection des chevauchements : dernière demande de l'employé commençant avant une date
+        Index("ix_leave_requests_employee_id_start_date_end_date", "employee_id", "start_date", "end_date"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     start_date = Column(Date, index=True)
     end_date = Column(Date, index=True)
     days_count = Column(Float)  # Nombre de jours (peut être decimal pour demi-journées)
+    start_half_day = Column(Boolean, default=False, server_default=false(), nullable=False)  # Début l'après-midi
+    end_half_day = Column(Boolean, default=False, server_default=false(), nullable=False)  # Fin le matin
     
     # Statut de la demande
     status = Column(String, default=LeaveStatus.PENDING)
@@ -36,8 +46,27 @@ class LeaveRequest(Base):
     employee_id = Column(Integer, ForeignKey("users.id"))
     employee = relationship("User", back_populates="leave_requests", foreign_keys=[employee_id])
     
-    approver_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    approver_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     approver = relationship("User", back_populates="approved_requests", foreign_keys=[approver_id])
     
-    leave_type_id = Column(Integer, ForeignKey("leave_types.id"))
-    leave_type = relationship("LeaveType", back_populates="leave_requests")
\ No newline at end of file
+    leave_type_id = Column(Integer, ForeignKey("leave_types.id"), index=True)
+    leave_type = relationship("LeaveType", back_populates="leave_requests")
+    
+    # Index par mois, tenu à jour par app.crud.leave_request
+    months = relationship("LeaveRequestMonth", back_populates="leave_request", cascade="all, delete-orphan")
+    
+    # Noms affichés par LeaveRequestDetailResponse ; charger les relations avec
+    # app.crud.leave_request.get_leave_request_with_details pour éviter une requête par nom
+    @property
+    def employee_name(self) -> str:
+        return f"{self.employee.first_name} {self.employee.last_name}"
+    
+    @property
+    def approver_name(self):
+        if self.approver is None:
+            return None
+        return f"{self.approver.first_name} {self.approver.last_name}"
+    
+    @property
+    def leave_type_name(self) -> str:
+        return self.leave_type.name
\ No newline at end of file
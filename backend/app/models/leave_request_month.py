@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Index
+from sqlalchemy.orm import relationship
+
+from app.db.database import Base
+
+class LeaveRequestMonth(Base):
+    """
+    Mois couverts par une demande de congé : une ligne par (demande, mois).
+
+    Les recherches par période (calendrier, chevauchements, rapports) partent de
+    l'index (month, status) au lieu de parcourir toutes les demandes dont
+    start_date précède la fin de la période.
+    """
+    __tablename__ = "leave_request_months"
+    __table_args__ = (
+        Index("ix_leave_request_months_month_status", "month", "status"),
+    )
+
+    leave_request_id = Column(
+        Integer, ForeignKey("leave_requests.id", ondelete="CASCADE"), primary_key=True
+    )
+    month = Column(Date, primary_key=True)  # Premier jour du mois
+    status = Column(String, nullable=False)  # Copie de LeaveRequest.status
+
+    leave_request = relationship("LeaveRequest", back_populates="months")
\ No newline at end of file
@@ -1,16 +1,19 @@
 from sqlalchemy import Boolean, Column, Integer, String, Float, ForeignKey
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import true
 
 from app.db.database import Base
 
 class LeaveType(Base):
     __tablename__ = "leave_types"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, index=True)
     requires_proof = Column(Boolean, default=False)
     description = Column(String, nullable=True)
     default_days = Column(Float, default=0)  # Jours par défaut pour ce type de congé
+    # Les demandes approuvées de ce type sont débitées du solde (faux pour maladie, sans solde...)
+    consumes_balance = Column(Boolean, nullable=False, default=True, server_default=true())
     
     # Relation avec les demandes de congés
     leave_requests = relationship("LeaveRequest", back_populates="leave_type")
@@ -6,7 +6,7 @@ from app.db.database import Base
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     email = Column(String, unique=True, index=True)
     first_name = Column(String)
     last_name = Column(String)
@@ -14,9 +14,10 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
     is_approver = Column(Boolean, default=False)
+    email_digest = Column(Boolean, default=False)  # Notifications groupées par intervalle
     
     # Relation avec les demandes de congés (en tant que demandeur)
-    leave_requests = relationship("LeaveRequest", back_populates="employee")
+    leave_requests = relationship("LeaveRequest", back_populates="employee", foreign_keys="LeaveRequest.employee_id")
     
     # Relation avec les demandes de congés (en tant qu'approbateur)
     approved_requests = relationship("LeaveRequest", back_populates="approver", foreign_keys="LeaveRequest.approver_id")
@@ -2,10 +2,15 @@ from app.schemas.user import UserBase, UserCreate, UserUpdate, UserResponse
 from app.schemas.leave_type import LeaveTypeBase, LeaveTypeCreate, LeaveTypeUpdate, LeaveTypeResponse
 from app.schemas.leave_request import (
     LeaveRequestBase, LeaveRequestCreate, LeaveRequestUpdate, 
-    LeaveRequestResponse, LeaveRequestDetailResponse, LeaveRequestApproval
+    LeaveRequestResponse, LeaveRequestDetailResponse, LeaveRequestApproval, DailyOccupancyResponse,
+    LeaveRequestBatchDecision, LeaveRequestBatchApproval, LeaveRequestBatchOutcome, LeaveRequestBatchResult
 )
 from app.schemas.leave_balance import (
     LeaveBalanceBase, LeaveBalanceCreate, LeaveBalanceUpdate, 
     LeaveBalanceResponse, LeaveBalanceDetailResponse
 )
-from app.schemas.token import Token, TokenPayload
\ No newline at end of file
+from app.schemas.token import Token, TokenPayload
+from app.schemas.admin import RecomputeDaysResult, RolloverResult, CacheStats, PasswordHashingStats, DbPoolStats, AdminStats
+from app.schemas.bulk_import import (
+    UserImport, LeaveBalanceImport, LeaveRequestImport, BulkImportRowError, BulkImportResult
+)
\ No newline at end of file
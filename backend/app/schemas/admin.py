@@ -0,0 +1,53 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+# Schéma du résultat du recalcul des jours de congés
+class RecomputeDaysResult(BaseModel):
+    processed: int
+    updated: int
+
+# Schéma du résultat du passage d'année des soldes
+class RolloverResult(BaseModel):
+    year: int
+    carry_over_max: float
+    created: int
+
+# Statistiques d'un cache en mémoire du worker
+class CacheStats(BaseModel):
+    enabled: bool
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+
+# Occupation du pool de hachage des mots de passe
+class PasswordHashingStats(BaseModel):
+    workers: int
+    max_concurrency: int
+    max_queue: int
+    in_flight: int
+    waiting: int
+    max_waiting: int
+    completed: int
+    rejected: int
+
+# Occupation du pool de connexions à la base ; les durées sont en secondes
+class DbPoolStats(BaseModel):
+    size: int
+    max_overflow: int
+    in_use: int
+    idle: int
+    overflow: int
+    checkouts: int
+    checkout_seconds_total: float
+    checkout_seconds_max: float
+    waits: int
+    wait_seconds_total: float
+    timeouts: int
+
+# Statistiques internes du worker ayant traité la requête
+class AdminStats(BaseModel):
+    principal_cache: CacheStats
+    password_hashing: PasswordHashingStats
+    db_pool: Optional[DbPoolStats] = None
\ No newline at end of file
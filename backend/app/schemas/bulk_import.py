@@ -0,0 +1,68 @@
+from typing import List, Optional
+from datetime import date
+from pydantic import BaseModel, EmailStr, model_validator, validator
+
+from app.models.leave_request import LeaveStatus
+from app.schemas.leave_request import check_leave_request_span
+
+# Ligne d'import d'un utilisateur : mot de passe en clair, ou haché bcrypt
+# déjà calculé par le système d'origine (évite le coût du hachage)
+class UserImport(BaseModel):
+    email: EmailStr
+    first_name: str
+    last_name: str
+    password: Optional[str] = None
+    hashed_password: Optional[str] = None
+    is_active: bool = True
+    is_admin: bool = False
+    is_approver: bool = False
+    email_digest: bool = False
+
+    @model_validator(mode="after")
+    def password_or_hash(self):
+        if not self.password and not self.hashed_password:
+            raise ValueError("password ou hashed_password est requis")
+        if self.hashed_password and not self.hashed_password.startswith(("$2a$", "$2b$", "$2y$")):
+            raise ValueError("hashed_password doit être un haché bcrypt")
+        return self
+
+# Ligne d'import d'un solde de congés, référencé par email et nom du type
+class LeaveBalanceImport(BaseModel):
+    user_email: EmailStr
+    leave_type: str
+    year: int
+    balance: float
+
+# Ligne d'import d'une demande de congé historique
+class LeaveRequestImport(BaseModel):
+    employee_email: EmailStr
+    leave_type: str
+    start_date: date
+    end_date: date
+    start_half_day: bool = False
+    end_half_day: bool = False
+    status: LeaveStatus = LeaveStatus.APPROVED
+    comment: Optional[str] = None
+    response_comment: Optional[str] = None
+    approver_email: Optional[EmailStr] = None
+
+    @validator('end_date')
+    def end_date_must_be_after_start_date(cls, v, values):
+        if 'start_date' in values and v < values['start_date']:
+            raise ValueError('La date de fin doit être postérieure à la date de début')
+        if 'start_date' in values:
+            check_leave_request_span(values['start_date'], v)
+        return v
+
+# Erreur sur une ligne du fichier importé
+class BulkImportRowError(BaseModel):
+    line: int
+    errors: List[str]
+
+# Résultat d'un import ; errors est limité aux premières lignes en erreur
+class BulkImportResult(BaseModel):
+    kind: str
+    processed: int
+    imported: int
+    failed: int
+    errors: List[BulkImportRowError]
@@ -1,20 +1,35 @@
 from typing import List, Optional, Union
-from datetime import date, datetime
-from pydantic import BaseModel, validator
+from datetime import date, datetime, timedelta
+from pydantic import BaseModel, Field, validator
 
 from app.models.leave_request import LeaveStatus
 
+# Écart maximal entre début et fin d'une demande : borne aussi la recherche des
+# chevauchements (voir app.crud.leave_request.find_overlapping_leave_request)
+MAX_LEAVE_REQUEST_SPAN = timedelta(days=366)
+
+
+def check_leave_request_span(start_date: date, end_date: date) -> None:
+    if end_date - start_date > MAX_LEAVE_REQUEST_SPAN:
+        raise ValueError(
+            f'Une demande ne peut pas dépasser {MAX_LEAVE_REQUEST_SPAN.days + 1} jours'
+        )
+
 # Schéma de base pour la demande de congé
 class LeaveRequestBase(BaseModel):
     start_date: date
     end_date: date
     leave_type_id: int
     comment: Optional[str] = None
+    start_half_day: bool = False
+    end_half_day: bool = False
     
     @validator('end_date')
     def end_date_must_be_after_start_date(cls, v, values):
         if 'start_date' in values and v < values['start_date']:
             raise ValueError('La date de fin doit être postérieure à la date de début')
+        if 'start_date' in values:
+            check_leave_request_span(values['start_date'], v)
         return v
 
 # Schéma pour la création d'une demande de congé
@@ -28,12 +43,48 @@ class LeaveRequestUpdate(BaseModel):
     leave_type_id: Optional[int] = None
     comment: Optional[str] = None
     proof_document: Optional[str] = None
+    start_half_day: Optional[bool] = None
+    end_half_day: Optional[bool] = None
 
 # Schéma pour l'approbation/rejet d'une demande
 class LeaveRequestApproval(BaseModel):
     status: LeaveStatus
     response_comment: Optional[str] = None
 
+    @validator('status')
+    def status_must_be_a_decision(cls, v):
+        # "pending" n'est pas une décision : la demande resterait en attente, mais
+        # compterait comme traitée et recevrait un email de refus
+        if v not in (LeaveStatus.APPROVED, LeaveStatus.REJECTED):
+            raise ValueError('La décision doit être approved ou rejected')
+        return v
+
+# Décision sur une demande dans une approbation par lot
+class LeaveRequestBatchDecision(LeaveRequestApproval):
+    id: int
+
+# Schéma pour l'approbation/rejet de plusieurs demandes en une fois
+class LeaveRequestBatchApproval(BaseModel):
+    decisions: List[LeaveRequestBatchDecision] = Field(..., min_length=1, max_length=500)
+
+    @validator('decisions')
+    def ids_must_be_unique(cls, v):
+        if len({decision.id for decision in v}) != len(v):
+            raise ValueError('Une demande ne peut figurer qu\'une fois dans le lot')
+        return v
+
+# Résultat d'une décision du lot : statut appliqué (approved, rejected) ou motif
+# du refus (not_found, already_processed, insufficient_balance)
+class LeaveRequestBatchOutcome(BaseModel):
+    id: int
+    outcome: str
+
+# Schéma pour la réponse d'une approbation par lot
+class LeaveRequestBatchResult(BaseModel):
+    processed: int
+    failed: int
+    results: List[LeaveRequestBatchOutcome]
+
 # Schéma pour la réponse de demande de congé
 class LeaveRequestResponse(LeaveRequestBase):
     id: int
@@ -56,4 +107,12 @@ class LeaveRequestDetailResponse(LeaveRequestResponse):
     leave_type_name: str
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+# Schéma d'un jour de la carte des absences ; leave_type_id est absent des totaux tous types confondus
+class DailyOccupancyResponse(BaseModel):
+    day: date
+    leave_type_id: Optional[int] = None
+    absent_count: int
+
+    class Config:
+        from_attributes = True
@@ -7,6 +7,7 @@ class LeaveTypeBase(BaseModel):
     requires_proof: bool = False
     description: Optional[str] = None
     default_days: float = 0
+    consumes_balance: bool = True
 
 # Schéma pour la création d'un type de congé
 class LeaveTypeCreate(LeaveTypeBase):
@@ -18,6 +19,7 @@ class LeaveTypeUpdate(BaseModel):
     requires_proof: Optional[bool] = None
     description: Optional[str] = None
     default_days: Optional[float] = None
+    consumes_balance: Optional[bool] = None
 
 # Schéma pour la réponse de type de congé
 class LeaveTypeResponse(LeaveTypeBase):
@@ -9,6 +9,7 @@ class UserBase(BaseModel):
     is_active: Optional[bool] = True
     is_admin: Optional[bool] = False
     is_approver: Optional[bool] = False
+    email_digest: Optional[bool] = False
 
 # Schéma pour la création d'un utilisateur
 class UserCreate(UserBase):
@@ -23,6 +24,7 @@ class UserUpdate(BaseModel):
     is_active: Optional[bool] = None
     is_admin: Optional[bool] = None
     is_approver: Optional[bool] = None
+    email_digest: Optional[bool] = None
 
 # Schéma pour la réponse utilisateur
 class UserResponse(UserBase):
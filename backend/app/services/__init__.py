@@ -1 +1 @@
-from app.services.email import send_email, send_leave_request_notification, send_leave_approval_notification
\ No newline at end of file
+from app.services.email import send_email, send_leave_request_notification, send_leave_approval_notification, send_leave_approval_batch_notifications
\ No newline at end of file
@@ -0,0 +1,329 @@
+import csv
+import json
+import logging
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.security import password_hasher
+from app.crud.cache_generation import bump_cache_generation
+from app.crud.daily_occupancy import add_daily_occupancy
+from app.crud.user import USERS_CACHE
+from app.crud.leave_request import month_starts
+from app.crud.leave_type_catalog import leave_type_catalog
+from app.models import LeaveBalance, LeaveRequest, LeaveRequestMonth, LeaveStatus, User
+from app.schemas.bulk_import import LeaveBalanceImport, LeaveRequestImport, UserImport
+from app.utils.working_days import count_working_days_batch
+
+logger = logging.getLogger(__name__)
+
+IMPORT_KINDS = ("users", "leave_balances", "leave_requests")
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Ligne lue : (numéro de ligne, enregistrement, erreur de lecture éventuelle)
+Record = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    if not filename:
+        return None
+    suffix = filename.rsplit(".", 1)[-1].lower()
+    if suffix == "csv":
+        return "csv"
+    if suffix in ("ndjson", "jsonl"):
+        return "ndjson"
+    return None
+
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[Record]:
+    """
+    Lire un fichier CSV (avec en-tête) ou NDJSON ligne à ligne, sans le charger en mémoire.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            # Cellules vides : valeur par défaut du schéma plutôt qu'une chaîne vide
+            yield reader.line_num, {key: value for key, value in record.items() if value not in ("", None)}, None
+    elif fmt == "ndjson":
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield line_number, None, f"JSON invalide : {exc.msg}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, "Chaque ligne doit être un objet JSON"
+                continue
+            yield line_number, record, None
+    else:
+        raise ValueError(f"Format d'import inconnu : {fmt}")
+
+
+@dataclass
+class BulkImportReport:
+    kind: str
+    max_errors: int
+    processed: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add_error(self, line: int, *errors: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "errors": list(errors)})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "processed": self.processed,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+def _validation_messages(exc: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in error['loc']) or 'ligne'} : {error['msg']}"
+        for error in exc.errors()
+    ]
+
+
+class BulkImporter:
+    """
+    Import en masse par lots de chunk_size lignes.
+
+    Chaque lot est validé (pydantic), ses références résolues en une requête, puis
+    inséré en INSERT multi-lignes et validé séparément. Une ligne invalide est
+    écartée et signalée dans le rapport sans interrompre l'import ; si l'insertion
+    d'un lot viole une contrainte, ses lignes sont réinsérées une à une (points de
+    sauvegarde) pour isoler les fautives.
+    """
+
+    def __init__(self, db: Session, kind: str, *, chunk_size: int = 1000, max_errors: int = 1000) -> None:
+        if kind not in IMPORT_KINDS:
+            raise ValueError(f"Type d'import inconnu : {kind}")
+        self.db = db
+        self.kind = kind
+        self.chunk_size = chunk_size
+        self.report = BulkImportReport(kind=kind, max_errors=max_errors)
+        self._seen_emails: Set[str] = set()
+
+    def run(self, records: Iterable[Record]) -> BulkImportReport:
+        schema, load_chunk = {
+            "users": (UserImport, self._load_users),
+            "leave_balances": (LeaveBalanceImport, self._load_leave_balances),
+            "leave_requests": (LeaveRequestImport, self._load_leave_requests),
+        }[self.kind]
+
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, self.chunk_size))
+            if not chunk:
+                break
+            load_chunk(self._validate(schema, chunk))
+            logger.info(
+                "Import %s : %s lignes lues, %s importées, %s en erreur",
+                self.kind, self.report.processed, self.report.imported, self.report.failed
+            )
+        self.report.errors.sort(key=lambda error: error["line"])
+        return self.report
+
+    def _validate(self, schema: type, chunk: List[Record]) -> List[Tuple[int, BaseModel]]:
+        valid = []
+        for line, record, error in chunk:
+            self.report.processed += 1
+            if error:
+                self.report.add_error(line, error)
+                continue
+            try:
+                valid.append((line, schema(**record)))
+            except ValidationError as exc:
+                self.report.add_error(line, *_validation_messages(exc))
+        return valid
+
+    def _user_ids(self, emails: Iterable[str]) -> Dict[str, int]:
+        emails = {email.lower() for email in emails}
+        if not emails:
+            return {}
+        # Comparaison insensible à la casse : les comptes créés hors import gardent la leur
+        rows = self.db.execute(
+            select(User.id, User.email).where(func.lower(User.email).in_(emails))
+        ).all()
+        return {row.email.lower(): row.id for row in rows}
+
+    def _leave_type_id(self, name: str) -> Optional[int]:
+        leave_type = leave_type_catalog.get_by_name(self.db, name)
+        return leave_type.id if leave_type else None
+
+    def _insert(
+        self, lines: List[int], rows: List[Dict[str, Any]],
+        insert_rows: Callable[[List[Dict[str, Any]]], None]
+    ) -> None:
+        if not rows:
+            return
+        try:
+            insert_rows(rows)
+            self.db.commit()
+            self.report.imported += len(rows)
+            return
+        except IntegrityError:
+            self.db.rollback()
+
+        # Lot refusé : isoler les lignes en conflit
+        for line, row in zip(lines, rows):
+            try:
+                with self.db.begin_nested():
+                    insert_rows([row])
+                self.report.imported += 1
+            except IntegrityError as exc:
+                self.report.add_error(line, f"Conflit avec une donnée existante : {exc.orig}")
+        self.db.commit()
+
+    def _load_users(self, chunk: List[Tuple[int, UserImport]]) -> None:
+        existing = self._user_ids(user.email for _, user in chunk)
+        accepted: List[Tuple[int, UserImport]] = []
+        for line, user in chunk:
+            email = user.email.lower()
+            if email in existing or email in self._seen_emails:
+                self.report.add_error(line, f"Un utilisateur avec l'email {user.email} existe déjà")
+                continue
+            self._seen_emails.add(email)
+            accepted.append((line, user))
+
+        # Hachage en parallèle, seulement pour les lignes sans haché fourni
+        to_hash = [user.password for _, user in accepted if not user.hashed_password]
+        hashes = iter(password_hasher.hash_many(to_hash))
+        rows = [
+            {
+                # Emails importés en minuscules, comme ils sont recherchés
+                "email": user.email.lower(),
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+                "hashed_password": user.hashed_password or next(hashes),
+                "is_active": user.is_active,
+                "is_admin": user.is_admin,
+                "is_approver": user.is_approver,
+                "email_digest": user.email_digest,
+            }
+            for _, user in accepted
+        ]
+        self._insert([line for line, _ in accepted], rows, self._insert_users)
+
+    def _insert_users(self, rows: List[Dict[str, Any]]) -> None:
+        self.db.execute(insert(User), rows)
+        bump_cache_generation(self.db, USERS_CACHE)
+
+    def _load_leave_balances(self, chunk: List[Tuple[int, LeaveBalanceImport]]) -> None:
+        user_ids = self._user_ids(balance.user_email for _, balance in chunk)
+        lines, rows = [], []
+        for line, balance in chunk:
+            user_id = user_ids.get(balance.user_email.lower())
+            leave_type_id = self._leave_type_id(balance.leave_type)
+            errors = []
+            if user_id is None:
+                errors.append(f"Utilisateur inconnu : {balance.user_email}")
+            if leave_type_id is None:
+                errors.append(f"Type de congé inconnu : {balance.leave_type}")
+            if errors:
+                self.report.add_error(line, *errors)
+                continue
+            lines.append(line)
+            rows.append({
+                "user_id": user_id,
+                "leave_type_id": leave_type_id,
+                "year": balance.year,
+                "balance": balance.balance,
+            })
+        # Doublons (utilisateur, type, année) rejetés par la contrainte unique
+        self._insert(lines, rows, lambda batch: self.db.execute(insert(LeaveBalance), batch))
+
+    def _load_leave_requests(self, chunk: List[Tuple[int, LeaveRequestImport]]) -> None:
+        user_ids = self._user_ids(
+            email
+            for _, leave_request in chunk
+            for email in (leave_request.employee_email, leave_request.approver_email)
+            if email
+        )
+        accepted: List[Tuple[int, LeaveRequestImport, int, int, Optional[int]]] = []
+        for line, leave_request in chunk:
+            employee_id = user_ids.get(leave_request.employee_email.lower())
+            leave_type_id = self._leave_type_id(leave_request.leave_type)
+            approver_id = None
+            errors = []
+            if employee_id is None:
+                errors.append(f"Employé inconnu : {leave_request.employee_email}")
+            if leave_type_id is None:
+                errors.append(f"Type de congé inconnu : {leave_request.leave_type}")
+            if leave_request.approver_email:
+                approver_id = user_ids.get(leave_request.approver_email.lower())
+                if approver_id is None:
+                    errors.append(f"Approbateur inconnu : {leave_request.approver_email}")
+            if errors:
+                self.report.add_error(line, *errors)
+                continue
+            accepted.append((line, leave_request, employee_id, leave_type_id, approver_id))
+        if not accepted:
+            return
+
+        # Jours ouvrés du lot calculés en une passe vectorisée
+        days_counts = count_working_days_batch(
+            [leave_request.start_date for _, leave_request, *_ in accepted],
+            [leave_request.end_date for _, leave_request, *_ in accepted],
+            [leave_request.start_half_day for _, leave_request, *_ in accepted],
+            [leave_request.end_half_day for _, leave_request, *_ in accepted]
+        )
+        rows = [
+            {
+                "employee_id": employee_id,
+                "leave_type_id": leave_type_id,
+                "approver_id": approver_id,
+                "start_date": leave_request.start_date,
+                "end_date": leave_request.end_date,
+                "start_half_day": leave_request.start_half_day,
+                "end_half_day": leave_request.end_half_day,
+                "days_count": float(days_count),
+                "status": leave_request.status.value,
+                "comment": leave_request.comment,
+                "response_comment": leave_request.response_comment,
+            }
+            for (_, leave_request, employee_id, leave_type_id, approver_id), days_count
+            in zip(accepted, days_counts)
+        ]
+        self._insert([line for line, *_ in accepted], rows, self._insert_leave_requests)
+
+    def _insert_leave_requests(self, rows: List[Dict[str, Any]]) -> None:
+        # Les soldes ne sont pas débités : il s'agit d'historique déjà décompté
+        ids = self.db.scalars(
+            insert(LeaveRequest).returning(LeaveRequest.id, sort_by_parameter_order=True), rows
+        ).all()
+        # Index par mois (voir app.crud.leave_request.sync_leave_request_months)
+        buckets = [
+            {"leave_request_id": leave_request_id, "month": month, "status": row["status"]}
+            for leave_request_id, row in zip(ids, rows)
+            for month in month_starts(row["start_date"], row["end_date"])
+        ]
+        self.db.execute(insert(LeaveRequestMonth), buckets)
+        add_daily_occupancy(self.db, [
+            (row["start_date"], row["end_date"], row["leave_type_id"])
+            for row in rows
+            if row["status"] == LeaveStatus.APPROVED
+        ])
+
+
+def bulk_import(
+    db: Session, kind: str, stream: TextIO, fmt: str, *, chunk_size: int = 1000, max_errors: int = 1000
+) -> BulkImportReport:
+    """
+    Importer un fichier CSV ou NDJSON d'utilisateurs, de soldes ou de demandes historiques.
+    """
+    importer = BulkImporter(db, kind, chunk_size=chunk_size, max_errors=max_errors)
+    return importer.run(read_records(stream, fmt))
@@ -1,35 +1,130 @@
-import emails
-from emails.template import JinjaTemplate
-from typing import List, Optional
+import math
+import time
+from datetime import datetime
+
+from jinja2 import Environment, Template
+from typing import Any, Dict, List, Optional
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.models.leave_request import LeaveRequest
-from app.crud import get_user, get_leave_type, get_approvers
+from app.crud import get_user, get_users_by_ids, get_approvers, enqueue_email, leave_type_catalog
+
+
+# Sources des templates des notifications, référencés par leur nom dans la table email_outbox
+_TEMPLATE_SOURCES: Dict[str, str] = {
+    "leave_request": """
+    <div>
+        <h1>Nouvelle demande de congé</h1>
+        <p>Une nouvelle demande de congé a été soumise et nécessite votre approbation :</p>
+        <ul>
+            <li><strong>Employé :</strong> {{ employee_name }}</li>
+            <li><strong>Type de congé :</strong> {{ leave_type_name }}</li>
+            <li><strong>Période :</strong> Du {{ start_date }} au {{ end_date }}</li>
+            <li><strong>Nombre de jours :</strong> {{ days_count }}</li>
+            <li><strong>Commentaire :</strong> {{ comment }}</li>
+        </ul>
+        <p>Veuillez vous connecter à l'application pour approuver ou rejeter cette demande.</p>
+    </div>
+    """,
+    "leave_approval": """
+    <div>
+        <h1>Réponse à votre demande de congé</h1>
+        <p>Votre demande de congé a été <strong>{{ status_text }}</strong> :</p>
+        <ul>
+            <li><strong>Type de congé :</strong> {{ leave_type_name }}</li>
+            <li><strong>Période :</strong> Du {{ start_date }} au {{ end_date }}</li>
+            <li><strong>Nombre de jours :</strong> {{ days_count }}</li>
+        </ul>
+        {% if response_comment %}
+        <p><strong>Commentaire de l'approbateur :</strong> {{ response_comment }}</p>
+        {% endif %}
+        <p>Vous pouvez consulter votre historique de demandes sur l'application.</p>
+    </div>
+    """,
+    "leave_approval_batch": """
+    <div>
+        <h1>Réponses à vos demandes de congé</h1>
+        <p>{{ requests|length }} de vos demandes de congé ont été traitées :</p>
+        <ul>
+        {% for request in requests %}
+            <li>
+                <strong>{{ request.status_text }}</strong> - {{ request.leave_type_name }},
+                du {{ request.start_date }} au {{ request.end_date }} ({{ request.days_count }} jour(s))
+                {% if request.response_comment %}<br><em>{{ request.response_comment }}</em>{% endif %}
+            </li>
+        {% endfor %}
+        </ul>
+        <p>Vous pouvez consulter votre historique de demandes sur l'application.</p>
+    </div>
+    """,
+    "leave_request_digest": """
+    <div>
+        <h1>Demandes de congé en attente</h1>
+        <p>{{ requests|length }} nouvelle(s) demande(s) de congé nécessite(nt) votre approbation :</p>
+        <ul>
+        {% for request in requests %}
+            <li>
+                <strong>{{ request.employee_name }}</strong> - {{ request.leave_type_name }},
+                du {{ request.start_date }} au {{ request.end_date }} ({{ request.days_count }} jour(s))
+                {% if request.comment %}<br><em>{{ request.comment }}</em>{% endif %}
+            </li>
+        {% endfor %}
+        </ul>
+        <p>Veuillez vous connecter à l'application pour approuver ou rejeter ces demandes.</p>
+    </div>
+    """,
+}
+
+# Templates compilés une seule fois, au chargement du module
+_environment = Environment(autoescape=True)
+TEMPLATES: Dict[str, Template] = {
+    name: _environment.from_string(source) for name, source in _TEMPLATE_SOURCES.items()
+}
+
+
+def render_template(template_name: str, environment: Dict[str, Any]) -> str:
+    """
+    Produire le HTML d'un template de notification.
+    """
+    return TEMPLATES[template_name].render(**environment)
+
+
+def next_digest_at() -> datetime:
+    """
+    Prochaine échéance de l'envoi groupé des notifications aux approbateurs en mode résumé.
+    """
+    interval = settings.EMAIL_DIGEST_INTERVAL_MINUTES * 60
+    return datetime.utcfromtimestamp(math.ceil(time.time() / interval) * interval)
 
 
 def send_email(
     email_to: str,
     subject: str,
-    html_template: str,
+    template_name: str,
     environment: dict = None
 ) -> None:
     """
-    Envoyer un email.
+    Envoyer un email immédiatement (SMTP synchrone).
+
+    Réservé aux scripts : les routes de l'API passent par la table email_outbox,
+    vidée en arrière-plan par app.services.email_dispatcher.
     """
     assert email_to, "Recipient email is required"
-    
+
+    # Importé ici : la bibliothèque emails est lourde et l'API ne s'en sert pas
+    import emails
+
     # Créer le message
     message = emails.Message(
         subject=subject,
-        html=JinjaTemplate(html_template),
+        html=render_template(template_name, environment or {}),
         mail_from=(settings.PROJECT_NAME, settings.EMAIL_FROM),
     )
-    
+
     # Envoyer l'email
     response = message.send(
         to=email_to,
-        render=environment or {},
         smtp={
             "host": settings.EMAIL_HOST,
             "port": settings.EMAIL_PORT,
@@ -38,34 +133,21 @@ def send_email(
             "tls": False,
         },
     )
-    
+
     return response
 
 
 def send_leave_request_notification(db: Session, leave_request: LeaveRequest) -> None:
     """
-    Envoyer un email de notification pour une nouvelle demande de congé
+    Mettre en file un email de notification pour une nouvelle demande de congé.
+
+    Les messages sont ajoutés à la transaction courante, sans commit :
+    l'appelant les valide en même temps que la demande.
     """
     employee = get_user(db, user_id=leave_request.employee_id)
-    leave_type = get_leave_type(db, leave_type_id=leave_request.leave_type_id)
+    leave_type = leave_type_catalog.get(db, leave_request.leave_type_id)
     approvers = get_approvers(db)
-    
-    # Préparer le template
-    html_template = """
-    <div>
-        <h1>Nouvelle demande de congé</h1>
-        <p>Une nouvelle demande de congé a été soumise et nécessite votre approbation :</p>
-        <ul>
-            <li><strong>Employé :</strong> {{ employee_name }}</li>
-            <li><strong>Type de congé :</strong> {{ leave_type_name }}</li>
-            <li><strong>Période :</strong> Du {{ start_date }} au {{ end_date }}</li>
-            <li><strong>Nombre de jours :</strong> {{ days_count }}</li>
-            <li><strong>Commentaire :</strong> {{ comment }}</li>
-        </ul>
-        <p>Veuillez vous connecter à l'application pour approuver ou rejeter cette demande.</p>
-    </div>
-    """
-    
+
     # Préparer les données du template
     environment = {
         "employee_name": f"{employee.first_name} {employee.last_name}",
@@ -75,57 +157,83 @@ def send_leave_request_notification(db: Session, leave_request: LeaveRequest) ->
         "days_count": leave_request.days_count,
         "comment": leave_request.comment or "Aucun commentaire"
     }
-    
-    # Envoyer un email à chaque approbateur
+
+    # Un message par approbateur ; ceux en mode résumé le reçoivent groupé
+    # avec les autres demandes de l'intervalle (voir app.services.email_dispatcher)
     for approver in approvers:
-        send_email(
-            email_to=approver.email,
+        enqueue_email(
+            db,
+            recipient=approver.email,
             subject=f"Nouvelle demande de congé de {employee.first_name} {employee.last_name}",
-            html_template=html_template,
-            environment=environment
+            template="leave_request",
+            context=environment,
+            digest=bool(approver.email_digest),
+            send_after=next_digest_at() if approver.email_digest else None
         )
 
 
-def send_leave_approval_notification(db: Session, leave_request: LeaveRequest) -> None:
-    """
-    Envoyer un email de notification pour une demande approuvée ou rejetée
-    """
-    employee = get_user(db, user_id=leave_request.employee_id)
-    leave_type = get_leave_type(db, leave_type_id=leave_request.leave_type_id)
-    
-    status_text = "approuvée" if leave_request.status == "approved" else "refusée"
-    
-    # Préparer le template
-    html_template = """
-    <div>
-        <h1>Réponse à votre demande de congé</h1>
-        <p>Votre demande de congé a été <strong>{{ status_text }}</strong> :</p>
-        <ul>
-            <li><strong>Type de congé :</strong> {{ leave_type_name }}</li>
-            <li><strong>Période :</strong> Du {{ start_date }} au {{ end_date }}</li>
-            <li><strong>Nombre de jours :</strong> {{ days_count }}</li>
-        </ul>
-        {% if response_comment %}
-        <p><strong>Commentaire de l'approbateur :</strong> {{ response_comment }}</p>
-        {% endif %}
-        <p>Vous pouvez consulter votre historique de demandes sur l'application.</p>
-    </div>
-    """
-    
-    # Préparer les données du template
-    environment = {
-        "status_text": status_text,
+def _approval_environment(db: Session, leave_request: LeaveRequest) -> Dict[str, Any]:
+    leave_type = leave_type_catalog.get(db, leave_request.leave_type_id)
+    return {
+        "status_text": "approuvée" if leave_request.status == "approved" else "refusée",
         "leave_type_name": leave_type.name,
         "start_date": leave_request.start_date.strftime("%d/%m/%Y"),
         "end_date": leave_request.end_date.strftime("%d/%m/%Y"),
         "days_count": leave_request.days_count,
         "response_comment": leave_request.response_comment
     }
-    
-    # Envoyer l'email à l'employé
-    send_email(
-        email_to=employee.email,
+
+
+def send_leave_approval_notification(db: Session, leave_request: LeaveRequest) -> None:
+    """
+    Mettre en file un email de notification pour une demande approuvée ou rejetée.
+
+    Comme pour les nouvelles demandes, le commit revient à l'appelant.
+    """
+    employee = get_user(db, user_id=leave_request.employee_id)
+
+    # Préparer les données du template
+    environment = _approval_environment(db, leave_request)
+    status_text = environment["status_text"]
+
+    enqueue_email(
+        db,
+        recipient=employee.email,
         subject=f"Votre demande de congé a été {status_text}",
-        html_template=html_template,
-        environment=environment
-    )
\ No newline at end of file
+        template="leave_approval",
+        context=environment
+    )
+
+
+def send_leave_approval_batch_notifications(db: Session, leave_requests: List[LeaveRequest]) -> None:
+    """
+    Mettre en file les notifications d'une approbation par lot : un seul email par
+    employé, récapitulant toutes ses demandes traitées. Le commit revient à l'appelant.
+    """
+    by_employee: Dict[int, List[LeaveRequest]] = {}
+    for leave_request in leave_requests:
+        by_employee.setdefault(leave_request.employee_id, []).append(leave_request)
+
+    employees = {employee.id: employee for employee in get_users_by_ids(db, list(by_employee))}
+    for employee_id, employee_requests in by_employee.items():
+        employee = employees[employee_id]
+        if len(employee_requests) == 1:
+            environment = _approval_environment(db, employee_requests[0])
+            enqueue_email(
+                db,
+                recipient=employee.email,
+                subject=f"Votre demande de congé a été {environment['status_text']}",
+                template="leave_approval",
+                context=environment
+            )
+            continue
+
+        enqueue_email(
+            db,
+            recipient=employee.email,
+            subject=f"{len(employee_requests)} de vos demandes de congé ont été traitées",
+            template="leave_approval_batch",
+            context={"requests": [
+                _approval_environment(db, leave_request) for leave_request in employee_requests
+            ]}
+        )
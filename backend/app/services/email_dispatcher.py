@@ -0,0 +1,231 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import aiosmtplib
+
+from app.core.config import settings
+from app.core.metrics import record_email_delivery
+from app.crud import claim_due_emails, mark_emails_sent, mark_email_failed
+from app.db.database import SessionLocal
+from app.services.email import render_template
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutboxMessage:
+    id: int
+    recipient: str
+    subject: str
+    template: str
+    context: Dict[str, Any]
+    digest: bool
+    attempts: int
+
+
+class SMTPConnectionPool:
+    """
+    Connexions SMTP conservées d'un envoi à l'autre au lieu d'une session par message.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._idle: Optional["asyncio.Queue[aiosmtplib.SMTP]"] = None
+
+    def _new_client(self) -> aiosmtplib.SMTP:
+        return aiosmtplib.SMTP(
+            hostname=settings.EMAIL_HOST,
+            port=settings.EMAIL_PORT,
+            username=settings.EMAIL_USER or None,
+            password=settings.EMAIL_PASSWORD or None,
+            start_tls=False,
+            timeout=settings.EMAIL_SMTP_TIMEOUT_SECONDS,
+        )
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        # La file est créée dans la boucle d'événements qui l'utilise
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self._size):
+                self._idle.put_nowait(self._new_client())
+
+        client = await self._idle.get()
+        try:
+            if not client.is_connected:
+                await client.connect()
+            yield client
+        except BaseException:
+            # Connexion dans un état inconnu : la remplacer par une neuve
+            client.close()
+            client = self._new_client()
+            raise
+        finally:
+            self._idle.put_nowait(client)
+
+    async def close(self) -> None:
+        if self._idle is None:
+            return
+        while not self._idle.empty():
+            client = self._idle.get_nowait()
+            if client.is_connected:
+                try:
+                    await client.quit()
+                except (aiosmtplib.SMTPException, OSError):
+                    client.close()
+        self._idle = None
+
+
+class EmailDispatcher:
+    """
+    Tâche de fond qui vide la table email_outbox.
+
+    Chaque worker uvicorn en lance une ; les messages sont réservés avec
+    FOR UPDATE SKIP LOCKED, deux workers n'envoient donc jamais le même.
+    """
+
+    def __init__(self) -> None:
+        self._pool = SMTPConnectionPool(settings.EMAIL_SMTP_POOL_SIZE)
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+        await self._pool.close()
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                dispatched = await self.dispatch_once()
+            except Exception:
+                logger.exception("Échec du traitement de la file d'emails")
+                dispatched = 0
+
+            # Lot incomplet : la file est vide, attendre avant de réinterroger
+            if dispatched < settings.EMAIL_DISPATCH_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(
+                        self._stopping.wait(), timeout=settings.EMAIL_DISPATCH_POLL_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+    async def dispatch_once(self) -> int:
+        messages = await asyncio.to_thread(self._claim)
+        if not messages:
+            return 0
+
+        # Les notifications en mode résumé partent en un seul email par destinataire
+        batches: List[List[OutboxMessage]] = [[message] for message in messages if not message.digest]
+        digests: Dict[str, List[OutboxMessage]] = {}
+        for message in messages:
+            if message.digest:
+                digests.setdefault(message.recipient, []).append(message)
+        batches.extend(digests.values())
+
+        errors = await asyncio.gather(*(self._deliver(batch) for batch in batches))
+        await asyncio.to_thread(self._record, batches, errors)
+        return len(messages)
+
+    def _claim(self) -> List[OutboxMessage]:
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            emails = claim_due_emails(
+                db,
+                limit=settings.EMAIL_DISPATCH_BATCH_SIZE,
+                lease_seconds=settings.EMAIL_DISPATCH_LEASE_SECONDS
+            )
+            return [
+                OutboxMessage(
+                    id=email.id,
+                    recipient=email.recipient,
+                    subject=email.subject,
+                    template=email.template,
+                    context=email.context or {},
+                    digest=email.digest,
+                    attempts=email.attempts
+                )
+                for email in emails
+            ]
+        finally:
+            db.close()
+
+    async def _deliver(self, batch: List[OutboxMessage]) -> Optional[str]:
+        first = batch[0]
+        try:
+            if first.digest:
+                subject = f"{len(batch)} nouvelle(s) demande(s) de congé en attente"
+                html = render_template(
+                    "leave_request_digest", {"requests": [message.context for message in batch]}
+                )
+            else:
+                subject = first.subject
+                html = render_template(first.template, first.context)
+
+            email = EmailMessage()
+            email["From"] = formataddr((settings.PROJECT_NAME, settings.EMAIL_FROM))
+            email["To"] = first.recipient
+            email["Subject"] = subject
+            email.set_content(html, subtype="html")
+
+            async with self._pool.connection() as smtp:
+                await smtp.send_message(email)
+        except Exception as exc:
+            return f"{type(exc).__name__}: {exc}"
+        return None
+
+    def _record(self, batches: List[List[OutboxMessage]], errors: List[Optional[str]]) -> None:
+        db = SessionLocal()
+        try:
+            mark_emails_sent(
+                db,
+                email_ids=[
+                    message.id
+                    for batch, error in zip(batches, errors) if error is None
+                    for message in batch
+                ]
+            )
+            for batch, error in zip(batches, errors):
+                record_email_delivery("digest" if batch[0].digest else "notification", error is not None)
+                if error is None:
+                    continue
+                for message in batch:
+                    retry_at = self._retry_at(message.attempts)
+                    if retry_at is None:
+                        logger.error(
+                            "Email %s abandonné après %s tentatives : %s",
+                            message.id, message.attempts, error
+                        )
+                    mark_email_failed(db, email_id=message.id, error=error, retry_at=retry_at)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _retry_at(attempts: int) -> Optional[datetime]:
+        if attempts >= settings.EMAIL_MAX_ATTEMPTS:
+            return None
+        # Backoff exponentiel plafonné : 30 s, 1 min, 2 min, ...
+        delay = min(
+            settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+            settings.EMAIL_RETRY_MAX_SECONDS
+        )
+        return datetime.utcnow() + timedelta(seconds=delay)
+
+
+email_dispatcher = EmailDispatcher()
@@ -0,0 +1,40 @@
+import argparse
+import logging
+
+from app.db.database import SessionLocal
+from app.services.bulk_import import IMPORT_FORMATS, IMPORT_KINDS, bulk_import, detect_format
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Importer en masse des utilisateurs, soldes ou demandes de congés (CSV ou NDJSON)"
+    )
+    parser.add_argument("kind", choices=IMPORT_KINDS)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None,
+                        help="déduit de l'extension du fichier si absent")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    if fmt is None:
+        parser.error("format non reconnu, préciser --format")
+
+    logger.info(f"Import {args.kind} depuis {args.path}")
+    db = SessionLocal()
+    try:
+        # utf-8-sig : tolère le BOM des exports tableur
+        with open(args.path, encoding="utf-8-sig", newline="") as stream:
+            report = bulk_import(db, args.kind, stream, fmt, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+    for error in report.errors:
+        logger.warning(f"Ligne {error['line']} : {'; '.join(error['errors'])}")
+    logger.info(f"{report.processed} lignes traitées, {report.imported} importées, {report.failed} en erreur")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator
+
+# Colonnes des exports de demandes de congés, dans l'ordre du fichier
+EXPORT_COLUMNS = [
+    "id", "employee_id", "employee_email", "employee_name", "leave_type_id", "leave_type_name",
+    "start_date", "end_date", "start_half_day", "end_half_day", "days_count", "status",
+    "approver_id", "approver_name", "comment", "response_comment", "created_at", "updated_at",
+]
+
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def _record(row: Any) -> Dict[str, Any]:
+    record = {
+        "id": row.id,
+        "employee_id": row.employee_id,
+        "employee_email": row.employee_email,
+        "employee_name": f"{row.employee_first_name} {row.employee_last_name}",
+        "leave_type_id": row.leave_type_id,
+        "leave_type_name": row.leave_type_name,
+        "start_date": row.start_date,
+        "end_date": row.end_date,
+        "start_half_day": row.start_half_day,
+        "end_half_day": row.end_half_day,
+        "days_count": row.days_count,
+        "status": row.status,
+        "approver_id": row.approver_id,
+        "approver_name": (
+            f"{row.approver_first_name} {row.approver_last_name}" if row.approver_id is not None else None
+        ),
+        "comment": row.comment,
+        "response_comment": row.response_comment,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+    }
+    for key, value in record.items():
+        if isinstance(value, (date, datetime)):
+            record[key] = value.isoformat()
+    return record
+
+
+def _chunked(rows: Iterable[Any], write: Callable[[Dict[str, Any]], None], buffer: io.StringIO,
+             chunk_rows: int) -> Iterator[str]:
+    # Un morceau de réponse toutes les chunk_rows lignes plutôt qu'un par ligne
+    pending = 0
+    for row in rows:
+        write(_record(row))
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_csv(rows: Iterable[Any], chunk_rows: int = 1000) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    yield from _chunked(rows, writer.writerow, buffer, chunk_rows)
+
+
+def export_ndjson(rows: Iterable[Any], chunk_rows: int = 1000) -> Iterator[str]:
+    buffer = io.StringIO()
+
+    def write(record: Dict[str, Any]) -> None:
+        buffer.write(json.dumps(record, ensure_ascii=False))
+        buffer.write("\n")
+
+    yield from _chunked(rows, write, buffer, chunk_rows)
+
+
+EXPORT_WRITERS = {
+    ExportFormat.CSV: export_csv,
+    ExportFormat.NDJSON: export_ndjson,
+}
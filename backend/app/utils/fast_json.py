@@ -0,0 +1,38 @@
+from typing import Any, Sequence
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # Dépendance facultative : sans orjson, le chemin rapide reste désactivé
+    orjson = None
+
+# Option facultative : sérialiseur JSON d'orjson, et listes servies depuis des lignes
+# plates (app.crud.aio, as_rows=True) sans validation Pydantic par ligne. Les lignes
+# portent déjà les champs et types des schémas de réponse, le JSON produit est identique.
+
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+else:
+    FastJSONResponse = JSONResponse
+
+
+def fast_json_enabled() -> bool:
+    return settings.FAST_JSON_ENABLED and orjson is not None
+
+
+def rows_response(rows: Sequence[Any], response: Response) -> Response:
+    """
+    Réponse JSON construite directement depuis des Row SQLAlchemy, en reprenant les
+    en-têtes déjà posés sur response (curseur, ETag...) : FastAPI ne les fusionne pas
+    quand la route renvoie elle-même une Response.
+    """
+    fast_response = FastJSONResponse([row._asdict() for row in rows])
+    fast_response.raw_headers.extend(
+        (name, value) for name, value in response.raw_headers
+        if name not in (b"content-length", b"content-type")
+    )
+    return fast_response
@@ -0,0 +1,330 @@
+import argparse
+import datetime
+import logging
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.core.security import get_password_hash
+from app.crud.cache_generation import bump_cache_generation
+from app.crud.daily_occupancy import rebuild_daily_occupancy
+from app.crud.leave_request import calculate_days, rebuild_leave_request_months
+from app.crud.leave_type_catalog import LEAVE_TYPES_CACHE
+from app.crud.user import USERS_CACHE
+from app.db.database import SessionLocal
+from app.models import LeaveBalance, LeaveRequest, LeaveStatus, LeaveType, User
+from app.utils.init_db import LEAVE_TYPES
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Utilisateurs par unité de --scale
+USERS_PER_SCALE = 1000
+
+# Poids des mois de début (janvier à décembre) : été, Noël, vacances d'hiver et ponts de mai
+HOLIDAY_MONTHS = (4, 7, 5, 6, 8, 5, 16, 20, 4, 6, 5, 14)
+# Arrêts maladie plus fréquents en hiver
+SICK_MONTHS = (14, 13, 10, 8, 6, 5, 4, 4, 6, 8, 10, 12)
+
+
+@dataclass(frozen=True)
+class LeaveProfile:
+    weight: int  # Part des demandes de ce type
+    durations: Tuple[Tuple[int, int], ...]  # (jours ouvrés, poids)
+    months: Tuple[int, ...]
+
+
+# Profils des types standard de app.utils.init_db ; les types supplémentaires
+# (--leave-types au-delà des types standard) prennent EXTRA_PROFILE
+LEAVE_PROFILES: Dict[str, LeaveProfile] = {
+    "Congés payés": LeaveProfile(70, ((1, 25), (2, 15), (3, 10), (5, 30), (10, 15), (15, 5)), HOLIDAY_MONTHS),
+    "Repos compensatoire": LeaveProfile(15, ((1, 80), (2, 20)), HOLIDAY_MONTHS),
+    "Congé maladie": LeaveProfile(10, ((1, 30), (2, 25), (3, 20), (5, 15), (10, 10)), SICK_MONTHS),
+    "Congé sans solde": LeaveProfile(3, ((1, 40), (5, 40), (20, 20)), HOLIDAY_MONTHS),
+}
+EXTRA_PROFILE = LeaveProfile(2, ((1, 60), (2, 30), (5, 10)), HOLIDAY_MONTHS)
+
+FIRST_NAMES = (
+    "Julien", "Camille", "Sophie", "Thomas", "Léa", "Nicolas", "Manon", "Antoine", "Chloé", "Hugo",
+    "Emma", "Lucas", "Inès", "Maxime", "Sarah", "Louis", "Claire", "Mathieu", "Julie", "Pierre",
+)
+LAST_NAMES = (
+    "Martin", "Bernard", "Dubois", "Durand", "Lefebvre", "Moreau", "Laurent", "Simon", "Michel", "Garcia",
+    "David", "Bertrand", "Roux", "Vincent", "Fournier", "Morel", "Girard", "Andre", "Mercier", "Blanc",
+)
+COMMENTS = (None, None, None, "Vacances", "Rendez-vous", "Raisons familiales", "Pont", "Déménagement")
+
+
+@dataclass
+class GeneratedCounts:
+    users: int = 0
+    leave_types: int = 0
+    leave_balances: int = 0
+    leave_requests: int = 0
+
+
+class DataGenerator:
+    """
+    Jeu de données synthétique et reproductible pour les tests de charge.
+
+    Toutes les valeurs tirées au hasard viennent d'un seul générateur initialisé
+    avec seed : les mêmes paramètres produisent les mêmes données, quel que soit le
+    jour de la génération. Les demandes postérieures à today sont surtout en
+    attente ; sans today, la limite est le 1er juillet de end_year. Les demandes
+    d'un employé ne se chevauchent pas, celles des types débités du solde ne le
+    rendent pas négatif. Les tables dérivées (leave_request_months,
+    daily_occupancy) sont reconstruites entièrement à la fin.
+    """
+
+    def __init__(
+        self, db: Session, *, users: int, approvers: int, leave_types: int, years: int,
+        requests_per_user: int, end_year: int, seed: int, chunk_size: int, domain: str, password: str,
+        today: Optional[datetime.date] = None
+    ) -> None:
+        if approvers < 1:
+            raise ValueError("Au moins un approbateur est requis (--approvers)")
+        self.db = db
+        self.users = users
+        self.approvers = min(approvers, users)
+        self.leave_types = leave_types
+        self.years = list(range(end_year - years + 1, end_year + 1))
+        self.requests_per_user = requests_per_user
+        self.chunk_size = chunk_size
+        self.domain = domain
+        self.password = password
+        self.rng = random.Random(seed)
+        self.today = today or datetime.date(end_year, 7, 1)
+        self.counts = GeneratedCounts()
+
+    def run(self) -> GeneratedCounts:
+        if self.db.scalar(select(User.id).where(User.email.like(f"%@{self.domain}")).limit(1)) is not None:
+            raise ValueError(f"Des utilisateurs @{self.domain} existent déjà : choisir un autre --domain")
+
+        leave_types = self._leave_types()
+        user_ids = self._create_users()
+        approver_ids = user_ids[:self.approvers]
+        for start in range(0, len(user_ids), self.chunk_size):
+            self._create_history(user_ids[start:start + self.chunk_size], approver_ids, leave_types)
+            logger.info(
+                f"{min(start + self.chunk_size, len(user_ids))}/{len(user_ids)} utilisateurs, "
+                f"{self.counts.leave_requests} demandes"
+            )
+
+        # Tables dérivées reconstruites en une passe plutôt que lot par lot
+        logger.info("Reconstruction de leave_request_months et daily_occupancy")
+        rebuild_leave_request_months(self.db)
+        rebuild_daily_occupancy(self.db)
+        return self.counts
+
+    def _leave_types(self) -> List[Tuple[int, str, float, bool, LeaveProfile]]:
+        # Types standard d'abord (créés s'ils manquent), puis types supplémentaires
+        definitions = dict(LEAVE_TYPES)
+        for index in range(1, self.leave_types - len(LEAVE_TYPES) + 1):
+            definitions[f"Type de congé {index}"] = {
+                "requires_proof": False,
+                "description": "Type de congé généré pour les tests de charge",
+                "default_days": self.rng.choice((0, 2, 5)),
+                "consumes_balance": index % 2 == 1,
+            }
+        names = list(definitions)[:max(self.leave_types, 1)]
+
+        existing = {
+            leave_type.name: leave_type
+            for leave_type in self.db.scalars(select(LeaveType).where(LeaveType.name.in_(names)))
+        }
+        missing = [name for name in names if name not in existing]
+        if missing:
+            self.db.execute(insert(LeaveType), [{"name": name, **definitions[name]} for name in missing])
+            bump_cache_generation(self.db, LEAVE_TYPES_CACHE)
+            self.db.commit()
+            self.counts.leave_types = len(missing)
+            existing = {
+                leave_type.name: leave_type
+                for leave_type in self.db.scalars(select(LeaveType).where(LeaveType.name.in_(names)))
+            }
+        return [
+            (
+                existing[name].id, name, existing[name].default_days or 0, existing[name].consumes_balance,
+                LEAVE_PROFILES.get(name, EXTRA_PROFILE)
+            )
+            for name in names
+        ]
+
+    def _create_users(self) -> List[int]:
+        # Un seul haché pour tous : bcrypt coûterait plus que tout le reste
+        hashed_password = get_password_hash(self.password)
+        for start in range(0, self.users, self.chunk_size):
+            rows = [
+                {
+                    "email": f"user{index}@{self.domain}",
+                    "first_name": self.rng.choice(FIRST_NAMES),
+                    "last_name": self.rng.choice(LAST_NAMES),
+                    "hashed_password": hashed_password,
+                    "is_active": self.rng.random() > 0.02,
+                    "is_admin": False,
+                    "is_approver": index < self.approvers,
+                    "email_digest": index < self.approvers and self.rng.random() < 0.5,
+                }
+                for index in range(start, min(start + self.chunk_size, self.users))
+            ]
+            # Sans RETURNING : sous SQLite, des identifiants rendus dans l'ordre des
+            # lignes imposent une instruction par ligne
+            self.db.execute(insert(User.__table__), rows)
+            bump_cache_generation(self.db, USERS_CACHE)
+            self.db.commit()
+        emails = dict(self.db.execute(
+            select(User.email, User.id).where(User.email.like(f"%@{self.domain}"))
+        ).all())
+        self.counts.users = len(emails)
+        return [emails[f"user{index}@{self.domain}"] for index in range(self.users)]
+
+    def _working_end(self, start_date: datetime.date, days: int) -> datetime.date:
+        # Fin d'une absence de days jours ouvrés (hors week-ends), début inclus
+        end_date = start_date
+        while days > 1:
+            end_date += datetime.timedelta(days=1)
+            if end_date.weekday() < 5:
+                days -= 1
+        return end_date
+
+    def _pick(self, choices: Sequence[Tuple[int, int]]) -> int:
+        return self.rng.choices([value for value, _ in choices], [weight for _, weight in choices])[0]
+
+    def _status(self, start_date: datetime.date) -> str:
+        draw = self.rng.random()
+        if start_date > self.today:
+            return LeaveStatus.PENDING if draw < 0.6 else LeaveStatus.APPROVED if draw < 0.95 else LeaveStatus.REJECTED
+        return LeaveStatus.APPROVED if draw < 0.88 else LeaveStatus.REJECTED if draw < 0.96 else LeaveStatus.PENDING
+
+    def _create_history(
+        self, user_ids: List[int], approver_ids: List[int],
+        leave_types: List[Tuple[int, str, float, bool, LeaveProfile]]
+    ) -> None:
+        type_weights = [profile.weight for *_, profile in leave_types]
+        balances: List[Dict] = []
+        requests: List[Dict] = []
+        for user_id in user_ids:
+            last_end = datetime.date.min
+            for year in self.years:
+                # Soldes de l'année pour les types débités
+                remaining: Dict[int, float] = {}
+                for leave_type_id, name, default_days, consumes_balance, _ in leave_types:
+                    if consumes_balance:
+                        remaining[leave_type_id] = default_days or float(self.rng.randint(0, 10))
+
+                count = max(0, round(self.rng.gauss(self.requests_per_user, self.requests_per_user / 3)))
+                drafts = []
+                for _ in range(count):
+                    leave_type_id, _, _, _, profile = self.rng.choices(leave_types, type_weights)[0]
+                    month = self.rng.choices(range(1, 13), profile.months)[0]
+                    start_date = datetime.date(year, month, self.rng.randint(1, 28))
+                    while start_date.weekday() >= 5:
+                        start_date += datetime.timedelta(days=1)
+                    drafts.append((start_date, leave_type_id, self._pick(profile.durations)))
+
+                for start_date, leave_type_id, duration in sorted(drafts):
+                    if start_date <= last_end:
+                        continue
+                    end_date = self._working_end(start_date, duration)
+                    start_half_day = end_half_day = False
+                    if duration == 1 and self.rng.random() < 0.15:
+                        start_half_day = self.rng.random() < 0.5
+                        end_half_day = not start_half_day
+                    days_count = calculate_days(start_date, end_date, start_half_day, end_half_day)
+                    if days_count <= 0:
+                        continue
+                    status = self._status(start_date)
+                    if status == LeaveStatus.APPROVED and leave_type_id in remaining:
+                        if remaining[leave_type_id] < days_count:
+                            continue
+                        remaining[leave_type_id] -= days_count
+
+                    created_at = datetime.datetime.combine(
+                        start_date - datetime.timedelta(days=self.rng.randint(3, 60)),
+                        datetime.time(self.rng.randint(8, 18), self.rng.randint(0, 59))
+                    )
+                    processed = status != LeaveStatus.PENDING
+                    requests.append({
+                        "employee_id": user_id,
+                        "leave_type_id": leave_type_id,
+                        "approver_id": self.rng.choice(approver_ids) if processed else None,
+                        "start_date": start_date,
+                        "end_date": end_date,
+                        "start_half_day": start_half_day,
+                        "end_half_day": end_half_day,
+                        "days_count": days_count,
+                        "status": status.value,
+                        "comment": self.rng.choice(COMMENTS),
+                        "response_comment": None,
+                        "created_at": created_at,
+                        "updated_at": created_at + datetime.timedelta(days=self.rng.randint(0, 2)) if processed else created_at,
+                    })
+                    last_end = end_date
+
+                balances.extend(
+                    {"user_id": user_id, "leave_type_id": leave_type_id, "year": year, "balance": balance}
+                    for leave_type_id, balance in remaining.items()
+                )
+
+        self.db.execute(insert(LeaveBalance.__table__), balances)
+        if requests:
+            self.db.execute(insert(LeaveRequest.__table__), requests)
+        self.db.commit()
+        self.counts.leave_balances += len(balances)
+        self.counts.leave_requests += len(requests)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Générer un jeu de données de test volumineux et reproductible"
+    )
+    parser.add_argument("--scale", type=float, default=1,
+                        help=f"facteur d'échelle : {USERS_PER_SCALE} utilisateurs par unité")
+    parser.add_argument("--users", type=int, default=None, help="remplace --scale")
+    parser.add_argument("--approvers", type=int, default=None, help="5 %% des utilisateurs par défaut")
+    parser.add_argument("--leave-types", type=int, default=len(LEAVE_TYPES))
+    parser.add_argument("--years", type=int, default=3, help="années d'historique")
+    parser.add_argument("--requests-per-user", type=int, default=6, help="demandes par utilisateur et par an")
+    parser.add_argument("--end-year", type=int, default=datetime.date.today().year)
+    parser.add_argument("--today", type=datetime.date.fromisoformat, default=None,
+                        help="date AAAA-MM-JJ séparant passé et futur (1er juillet de --end-year par défaut)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=1000, help="utilisateurs par transaction")
+    parser.add_argument("--domain", default="load.example.com", help="domaine des emails générés")
+    parser.add_argument("--password", default="password123", help="mot de passe de tous les utilisateurs")
+    args = parser.parse_args()
+
+    users = args.users if args.users is not None else max(1, round(args.scale * USERS_PER_SCALE))
+    approvers = args.approvers if args.approvers is not None else max(1, users // 20)
+    logger.info(
+        f"Génération : {users} utilisateurs dont {approvers} approbateurs, {args.years} ans, "
+        f"{args.requests_per_user} demandes par utilisateur et par an (seed {args.seed})"
+    )
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        counts = DataGenerator(
+            db, users=users, approvers=approvers, leave_types=args.leave_types, years=args.years,
+            requests_per_user=args.requests_per_user, end_year=args.end_year, seed=args.seed,
+            chunk_size=args.chunk_size, domain=args.domain, password=args.password, today=args.today
+        ).run()
+    except ValueError as exc:
+        logger.error(str(exc))
+        sys.exit(1)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"{counts.users} utilisateurs, {counts.leave_types} types de congés, {counts.leave_balances} soldes "
+        f"et {counts.leave_requests} demandes créés en {elapsed:.1f} s "
+        f"({counts.leave_requests / elapsed:.0f} demandes/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
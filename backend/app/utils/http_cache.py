@@ -0,0 +1,42 @@
+from typing import Any
+
+from fastapi import Request, Response, status
+
+# À incrémenter quand la forme des réponses change : les ETag déjà distribués
+# ne doivent pas valider une représentation d'une version précédente
+ETAG_VERSION = 1
+
+# Politiques Cache-Control des routes servies avec un ETag ; "private" car les réponses
+# dépendent de l'authentification, le navigateur revalide ensuite avec If-None-Match
+CACHE_REVALIDATE = "private, no-cache"
+CACHE_SHORT = "private, max-age=60, must-revalidate"
+
+
+def make_etag(name: str, generation: int, *parts: Any) -> str:
+    """
+    ETag fort dérivé d'un compteur de génération (table cache_generations) :
+    aucune ligne n'est lue ni sérialisée pour le calculer.
+    """
+    return '"' + "-".join(str(part) for part in (name, ETAG_VERSION, generation, *parts)) + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    # If-None-Match utilise la comparaison faible : W/"x" correspond à "x"
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in header.split(","))
+    return etag in (candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates)
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag, cache_control)
+    return response
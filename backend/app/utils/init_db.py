@@ -5,43 +5,50 @@ import datetime
 from app.db.database import SessionLocal
 from app.core.security import get_password_hash
 from app.models import User, LeaveType, LeaveStatus, LeaveRequest, LeaveBalance
+from app.crud.leave_request import calculate_days, sync_leave_request_months
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Types de congés standard, repris par app.utils.generate_data
+LEAVE_TYPES = {
+    "Congés payés": {
+        "requires_proof": False,
+        "description": "Congés annuels payés",
+        "default_days": 25,
+        "consumes_balance": True
+    },
+    "Repos compensatoire": {
+        "requires_proof": False,
+        "description": "Repos pour compenser les heures supplémentaires",
+        "default_days": 0,
+        "consumes_balance": True
+    },
+    "Congé maladie": {
+        "requires_proof": True,
+        "description": "Absence pour raison de santé avec justificatif médical",
+        "default_days": 0,
+        "consumes_balance": False
+    },
+    "Congé sans solde": {
+        "requires_proof": False,
+        "description": "Congé accordé sans rémunération",
+        "default_days": 0,
+        "consumes_balance": False
+    }
+}
+
 
 def init_db(db: Session) -> None:
     # Créer des types de congés
-    leave_types = {
-        "Congés payés": {
-            "requires_proof": False,
-            "description": "Congés annuels payés",
-            "default_days": 25
-        },
-        "Repos compensatoire": {
-            "requires_proof": False,
-            "description": "Repos pour compenser les heures supplémentaires",
-            "default_days": 0
-        },
-        "Congé maladie": {
-            "requires_proof": True,
-            "description": "Absence pour raison de santé avec justificatif médical",
-            "default_days": 0
-        },
-        "Congé sans solde": {
-            "requires_proof": False,
-            "description": "Congé accordé sans rémunération",
-            "default_days": 0
-        }
-    }
-    
     db_leave_types = {}
-    for name, attributes in leave_types.items():
+    for name, attributes in LEAVE_TYPES.items():
         leave_type = LeaveType(
             name=name,
             requires_proof=attributes["requires_proof"],
             description=attributes["description"],
-            default_days=attributes["default_days"]
+            default_days=attributes["default_days"],
+            consumes_balance=attributes["consumes_balance"]
         )
         db.add(leave_type)
         db.commit()
@@ -165,7 +172,7 @@ def init_db(db: Session) -> None:
         employee = db_users[request_data["employee_email"]]
         leave_type = db_leave_types[request_data["leave_type"]]
         
-        days_count = (request_data["end_date"] - request_data["start_date"]).days + 1
+        days_count = calculate_days(request_data["start_date"], request_data["end_date"])
         
         leave_request = LeaveRequest(
             employee_id=employee.id,
@@ -194,6 +201,7 @@ def init_db(db: Session) -> None:
                     balance.balance -= days_count
                     db.add(balance)
         
+        sync_leave_request_months(leave_request)
         db.add(leave_request)
     
     db.commit()
@@ -0,0 +1,26 @@
+import argparse
+import logging
+
+from app.db.database import SessionLocal
+from app.crud import rebuild_daily_occupancy
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconstruire la table daily_occupancy à partir des demandes approuvées")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    logger.info("Reconstruction de l'occupation journalière")
+    db = SessionLocal()
+    try:
+        count = rebuild_daily_occupancy(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    logger.info(f"{count} demandes approuvées prises en compte")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import argparse
+import logging
+
+from app.db.database import SessionLocal
+from app.crud import recompute_days_counts
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recalculer days_count de toutes les demandes de congés")
+    parser.add_argument("--batch-size", type=int, default=50000)
+    args = parser.parse_args()
+
+    logger.info("Recalcul des jours ouvrés des demandes de congés")
+    db = SessionLocal()
+    try:
+        processed, updated = recompute_days_counts(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    logger.info(f"{processed} demandes traitées, {updated} mises à jour")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
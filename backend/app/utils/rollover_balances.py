@@ -0,0 +1,31 @@
+import argparse
+import datetime
+import logging
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.crud import rollover_leave_balances
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Créer les soldes de congés d'une année (jours par défaut et reliquat plafonné)"
+    )
+    parser.add_argument("--year", type=int, default=datetime.datetime.now().year)
+    parser.add_argument("--carry-over-max", type=float, default=settings.LEAVE_CARRY_OVER_MAX_DAYS)
+    args = parser.parse_args()
+
+    logger.info(f"Passage à l'année {args.year} (report plafonné à {args.carry_over_max} jours)")
+    db = SessionLocal()
+    try:
+        created = rollover_leave_balances(db, year=args.year, carry_over_max=args.carry_over_max)
+    finally:
+        db.close()
+    logger.info(f"{created} soldes créés")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import logging
+import sys
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.db.database import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def wait_for_db(timeout: float, interval: float) -> bool:
+    # Réessayer une requête triviale jusqu'à ce que la base réponde ou que le délai expire
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            logger.info(f"Base de données disponible (tentative {attempt})")
+            return True
+        except OperationalError as exc:
+            if time.monotonic() + interval > deadline:
+                logger.error(f"Base de données injoignable après {attempt} tentatives : {exc.orig}")
+                return False
+            logger.info(f"Base de données indisponible, nouvelle tentative dans {interval} s")
+            time.sleep(interval)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Attendre que la base de données accepte les connexions")
+    parser.add_argument("--timeout", type=float, default=60, help="délai maximal en secondes")
+    parser.add_argument("--interval", type=float, default=1, help="pause entre deux tentatives")
+    args = parser.parse_args()
+
+    available = wait_for_db(args.timeout, args.interval)
+    engine.dispose()
+    if not available:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, List, Optional, Sequence
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    # Annotations seulement : à l'exécution, numpy n'est importé que par les fonctions vectorisées
+    import numpy
+
+
+def easter_sunday(year: int) -> date:
+    # Algorithme de Meeus/Jones/Butcher (calendrier grégorien)
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _france_holidays(year: int) -> List[date]:
+    easter = easter_sunday(year)
+    return [
+        date(year, 1, 1),             # Jour de l'an
+        easter + timedelta(days=1),   # Lundi de Pâques
+        date(year, 5, 1),             # Fête du travail
+        date(year, 5, 8),             # Victoire 1945
+        easter + timedelta(days=39),  # Ascension
+        easter + timedelta(days=50),  # Lundi de Pentecôte
+        date(year, 7, 14),            # Fête nationale
+        date(year, 8, 15),            # Assomption
+        date(year, 11, 1),            # Toussaint
+        date(year, 11, 11),           # Armistice
+        date(year, 12, 25),           # Noël
+    ]
+
+
+# Calendriers de jours fériés par code pays (ISO 3166-1 alpha-2)
+HOLIDAY_CALENDARS: Dict[str, Callable[[int], List[date]]] = {
+    "FR": _france_holidays,
+}
+
+
+@lru_cache(maxsize=None)
+def _public_holidays(year: int, country: str) -> FrozenSet[date]:
+    try:
+        calendar = HOLIDAY_CALENDARS[country]
+    except KeyError:
+        raise ValueError(f"Calendrier de jours fériés inconnu : {country}")
+    return frozenset(calendar(year))
+
+
+def public_holidays(year: int, country: Optional[str] = None) -> FrozenSet[date]:
+    """
+    Jours fériés d'une année, calculés une seule fois par (année, pays).
+    """
+    return _public_holidays(year, (country or settings.HOLIDAY_COUNTRY).upper())
+
+
+def is_working_day(day: date, country: Optional[str] = None) -> bool:
+    return day.weekday() < 5 and day not in public_holidays(day.year, country)
+
+
+def working_days_between(start_date: date, end_date: date, country: Optional[str] = None) -> List[date]:
+    # Jours ouvrés entre deux dates incluses, dans l'ordre
+    return [
+        start_date + timedelta(days=offset)
+        for offset in range((end_date - start_date).days + 1)
+        if is_working_day(start_date + timedelta(days=offset), country)
+    ]
+
+
+def count_working_days(
+    start_date: date,
+    end_date: date,
+    *,
+    start_half_day: bool = False,
+    end_half_day: bool = False,
+    country: Optional[str] = None
+) -> float:
+    """
+    Nombre de jours ouvrés entre deux dates incluses, hors week-ends et jours fériés.
+
+    start_half_day : le premier jour n'est pris qu'à partir de midi.
+    end_half_day : le dernier jour n'est pris que le matin.
+    """
+    if end_date < start_date:
+        return 0
+
+    # Semaines complètes d'abord, puis les jours restants
+    full_weeks, remainder = divmod((end_date - start_date).days + 1, 7)
+    days: float = full_weeks * 5
+    for offset in range(remainder):
+        if (start_date + timedelta(days=full_weeks * 7 + offset)).weekday() < 5:
+            days += 1
+
+    for year in range(start_date.year, end_date.year + 1):
+        days -= sum(
+            1 for holiday in public_holidays(year, country)
+            if start_date <= holiday <= end_date and holiday.weekday() < 5
+        )
+
+    if start_half_day and is_working_day(start_date, country):
+        days -= 0.5
+    # Une seule demi-journée retirée pour une demande d'un jour avec les deux options
+    if end_half_day and is_working_day(end_date, country) and not (start_half_day and start_date == end_date):
+        days -= 0.5
+    return days
+
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _to_datetime64(days: Sequence[date]) -> "numpy.ndarray":
+    # Passer par les ordinaux : bien plus rapide que numpy.asarray sur des objets date
+    import numpy as np
+
+    ordinals = np.fromiter((day.toordinal() for day in days), dtype=np.int64, count=len(days))
+    return (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]")
+
+
+def count_working_days_batch(
+    start_dates: Sequence[date],
+    end_dates: Sequence[date],
+    start_half_days: Optional[Sequence[bool]] = None,
+    end_half_days: Optional[Sequence[bool]] = None,
+    country: Optional[str] = None
+) -> "numpy.ndarray":
+    """
+    Version vectorisée de count_working_days (numpy.busday_count), pour recalculer
+    days_count sur des millions de demandes sans boucle Python par ligne.
+    """
+    import numpy as np
+
+    starts = _to_datetime64(start_dates)
+    ends = _to_datetime64(end_dates)
+    if starts.size == 0:
+        return np.zeros(0)
+
+    first_year = int(starts.min().astype("datetime64[Y]").astype(int)) + 1970
+    last_year = int(ends.max().astype("datetime64[Y]").astype(int)) + 1970
+    holidays = sorted(
+        holiday
+        for year in range(first_year, last_year + 1)
+        for holiday in public_holidays(year, country)
+    )
+    calendar = np.busdaycalendar(weekmask="1111100", holidays=holidays)
+
+    days = np.maximum(np.busday_count(starts, ends + 1, busdaycal=calendar), 0).astype(float)
+
+    start_half = np.zeros(starts.shape, dtype=bool)
+    if start_half_days is not None:
+        start_half = np.asarray(start_half_days, dtype=bool) & np.is_busday(starts, busdaycal=calendar)
+        days -= 0.5 * start_half
+    if end_half_days is not None:
+        end_half = np.asarray(end_half_days, dtype=bool) & np.is_busday(ends, busdaycal=calendar)
+        end_half &= ~(start_half & (starts == ends))
+        days -= 0.5 * end_half
+    return days
@@ -0,0 +1,99 @@
+"""
+Temps de recherche des congés d'un mois selon la profondeur de l'historique.
+
+Compare l'ancienne requête (start_date <= fin AND end_date >= début, puis statut)
+et la recherche par l'index leave_request_months. Sans DATABASE_URL, une base
+SQLite temporaire est utilisée :
+
+    python -m benchmarks.bench_calendar --years 1 5 10 20
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_calendar.db')}"
+)
+
+from sqlalchemy import and_, delete, insert  # noqa: E402
+
+from app.crud.leave_request import (  # noqa: E402
+    get_leave_requests_by_date_range, rebuild_leave_request_months
+)
+from app.db.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import LeaveRequest, LeaveRequestMonth, LeaveStatus  # noqa: E402
+
+STATUSES = [LeaveStatus.APPROVED, LeaveStatus.APPROVED, LeaveStatus.REJECTED, LeaveStatus.PENDING]
+
+
+def load_history(db, years: int, requests_per_year: int, seed: int) -> date:
+    rng = random.Random(seed)
+    last_year = date.today().year
+    first_day = date(last_year - years + 1, 1, 1)
+    span = (date(last_year, 12, 31) - first_day).days
+
+    db.execute(delete(LeaveRequestMonth))
+    db.execute(delete(LeaveRequest))
+    rows = []
+    for _ in range(years * requests_per_year):
+        start = first_day + timedelta(days=rng.randrange(span))
+        rows.append({
+            "start_date": start,
+            "end_date": start + timedelta(days=rng.randrange(15)),
+            "days_count": 1,
+            "status": rng.choice(STATUSES),
+            "employee_id": rng.randrange(1, 1000),
+            "leave_type_id": 1,
+        })
+    db.execute(insert(LeaveRequest), rows)
+    db.commit()
+    rebuild_leave_request_months(db)
+    return date(last_year, 6, 1)
+
+
+def legacy_lookup(db, start: date, end: date):
+    return db.query(LeaveRequest).filter(
+        and_(LeaveRequest.start_date <= end, LeaveRequest.end_date >= start)
+    ).filter(LeaveRequest.status == LeaveStatus.APPROVED).all()
+
+
+def measure(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 10, 20])
+    parser.add_argument("--requests-per-year", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    print(f"{'années':>7} {'demandes':>9} {'ancienne (ms)':>14} {'index mois (ms)':>16}")
+    for years in args.years:
+        month = load_history(db, years, args.requests_per_year, args.seed)
+        month_end = (month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        legacy = measure(lambda: legacy_lookup(db, month, month_end), args.repeat)
+        indexed = measure(
+            lambda: get_leave_requests_by_date_range(
+                db, start_date=month, end_date=month_end, status=LeaveStatus.APPROVED
+            ),
+            args.repeat
+        )
+        print(f"{years:>7} {years * args.requests_per_year:>9} {legacy:>14.2f} {indexed:>16.2f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Export en flux : la mémoire ne doit pas croître avec le nombre de demandes exportées.
+
+Insère --rows demandes, puis exporte successivement 10 %, 50 % et 100 % d'entre
+elles (filtre par période) via stream_leave_requests_for_export et l'écrivain du
+format choisi, en consommant le flux comme le ferait StreamingResponse. Affiche
+le débit et le pic de mémoire Python (tracemalloc) de chaque export ; le pic doit
+rester à peu près constant. Sans DATABASE_URL, une base SQLite temporaire est utilisée :
+
+    python -m benchmarks.bench_export --rows 200000 --format ndjson
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import date, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_export.db')}"
+)
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.crud import stream_leave_requests_for_export  # noqa: E402
+from app.db.database import SessionLocal, create_tables  # noqa: E402
+from app.models import LeaveRequest, LeaveStatus, LeaveType, User  # noqa: E402
+from app.utils.export import EXPORT_WRITERS, ExportFormat  # noqa: E402
+
+FIRST_DAY = date(2000, 1, 1)
+
+
+def setup(rows: int) -> int:
+    db = SessionLocal()
+    try:
+        tag = uuid.uuid4().hex[:8]
+        leave_type = LeaveType(name=f"Bench {tag}", default_days=25)
+        employee = User(email=f"export-{tag}@conges.fr", first_name="Bench", last_name="Export",
+                        hashed_password="-", is_active=True)
+        db.add_all([leave_type, employee])
+        db.flush()
+        for offset in range(0, rows, 10000):
+            db.execute(insert(LeaveRequest), [
+                {
+                    "employee_id": employee.id, "leave_type_id": leave_type.id,
+                    "start_date": FIRST_DAY + timedelta(days=i), "end_date": FIRST_DAY + timedelta(days=i),
+                    "days_count": 1, "status": LeaveStatus.APPROVED.value, "comment": "Bench export",
+                }
+                for i in range(offset, min(offset + 10000, rows))
+            ])
+        db.commit()
+        return employee.id
+    finally:
+        db.close()
+
+
+def export(employee_id: int, rows: int, fmt: ExportFormat):
+    db = SessionLocal()
+    try:
+        tracemalloc.start()
+        started = time.perf_counter()
+        size = 0
+        stream = stream_leave_requests_for_export(
+            db, employee_id=employee_id, end_date=FIRST_DAY + timedelta(days=rows - 1)
+        )
+        for chunk in EXPORT_WRITERS[fmt](stream):
+            size += len(chunk)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, size, peak
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--format", choices=[fmt.value for fmt in ExportFormat], default="csv")
+    args = parser.parse_args()
+
+    create_tables()
+    employee_id = setup(args.rows)
+    for share in (0.1, 0.5, 1.0):
+        rows = int(args.rows * share)
+        elapsed, size, peak = export(employee_id, rows, ExportFormat(args.format))
+        print(f"{rows:>9} lignes : {rows / elapsed:10.0f} lignes/s  {size / 1e6:8.1f} Mo produits  "
+              f"pic mémoire={peak / 1e6:6.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Pic de connexions : latence des logins et des autres requêtes pendant le pic.
+
+Envoie --logins connexions simultanées pendant que --clients clients appellent
+en boucle GET /api/leave-types/, puis affiche p50/p99 des deux. --workers fixe
+PASSWORD_HASH_WORKERS (0 : bcrypt dans le pool de threads, sans processus dédiés)
+pour comparer les deux modes. Sans DATABASE_URL, une base SQLite temporaire est utilisée :
+
+    python -m benchmarks.bench_login --workers 0
+    python -m benchmarks.bench_login --workers 4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_login.db')}"
+)
+os.environ.setdefault("EMAIL_DISPATCHER_ENABLED", "false")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rounds", type=int, default=None, help="coût bcrypt (BCRYPT_ROUNDS)")
+    return parser.parse_args()
+
+
+ARGS = parse_args()
+if ARGS.workers is not None:
+    os.environ["PASSWORD_HASH_WORKERS"] = str(ARGS.workers)
+if ARGS.rounds is not None:
+    os.environ["BCRYPT_ROUNDS"] = str(ARGS.rounds)
+
+import httpx  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token, get_password_hash, password_hasher  # noqa: E402
+from app.db.database import SessionLocal, create_tables  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import User  # noqa: E402
+
+PASSWORD = "bench-password"
+
+
+def setup(logins: int):
+    db = SessionLocal()
+    try:
+        tag = uuid.uuid4().hex[:8]
+        # Un seul haché pour tous : la préparation ne doit pas coûter autant que le test
+        hashed_password = get_password_hash(PASSWORD)
+        users = [
+            User(email=f"login{i}-{tag}@conges.fr", first_name="Bench", last_name=f"Login {i}",
+                 hashed_password=hashed_password, is_active=True)
+            for i in range(logins)
+        ]
+        db.add_all(users)
+        db.commit()
+        return [user.email for user in users], create_access_token(users[0].id)
+    finally:
+        db.close()
+
+
+def percentiles(latencies):
+    if len(latencies) < 2:
+        return latencies[0] if latencies else 0, latencies[0] if latencies else 0
+    cuts = statistics.quantiles(latencies, n=100)
+    return cuts[49], cuts[98]
+
+
+async def run(emails, token, clients: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        login_latencies, other_latencies, failures = [], [], []
+        done = asyncio.Event()
+
+        async def login(email: str):
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/auth/login", data={"username": email, "password": PASSWORD}
+            )
+            login_latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                failures.append(response.status_code)
+
+        async def browse():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/api/leave-types/", headers={"Authorization": f"Bearer {token}"})
+                other_latencies.append(time.perf_counter() - started)
+
+        # Réchauffer le cache des utilisateurs et démarrer le pool avant de mesurer
+        await client.get("/api/leave-types/", headers={"Authorization": f"Bearer {token}"})
+        await login(emails[0])
+        login_latencies.clear()
+
+        browsers = [asyncio.create_task(browse()) for _ in range(clients)]
+        started = time.perf_counter()
+        await asyncio.gather(*(login(email) for email in emails))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await asyncio.gather(*browsers)
+        return login_latencies, other_latencies, failures, elapsed
+
+
+def main() -> None:
+    create_tables()
+    emails, token = setup(ARGS.logins)
+
+    async def lifespan_run():
+        # Démarrage et arrêt de l'application comme sous uvicorn
+        await app.router.startup()
+        try:
+            return await run(emails, token, ARGS.clients)
+        finally:
+            await app.router.shutdown()
+
+    login_latencies, other_latencies, failures, elapsed = asyncio.run(lifespan_run())
+
+    print(f"bcrypt rounds={settings.BCRYPT_ROUNDS}, workers={settings.PASSWORD_HASH_WORKERS}, "
+          f"concurrence={settings.PASSWORD_HASH_MAX_CONCURRENCY}")
+    print(f"{len(login_latencies)} connexions en {elapsed:.2f} s ({len(login_latencies) / elapsed:.1f}/s)")
+    for label, latencies in (("login", login_latencies), ("autres", other_latencies)):
+        p50, p99 = percentiles(sorted(latencies))
+        print(f"{label:>8} : n={len(latencies):>6}  p50={p50 * 1000:8.1f} ms  p99={p99 * 1000:8.1f} ms")
+    print(f"file d'attente max : {password_hasher.stats()['max_waiting']}")
+    if failures:
+        print(f"échecs : {len(failures)} ({sorted(set(failures))})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
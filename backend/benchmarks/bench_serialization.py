@@ -0,0 +1,111 @@
+"""
+Coût de sérialisation par ligne des listes de demandes, avec et sans FAST_JSON_ENABLED.
+
+Crée --rows demandes (avec approbateur), puis appelle --iterations fois
+GET /api/leave-requests/?limit=--rows et GET /api/leave-requests/details?limit=--rows
+dans les deux modes : objets ORM validés par response_model puis json, ou lignes
+plates sérialisées par orjson. Affiche le temps par requête et par ligne, et vérifie
+que les deux modes produisent le même JSON. Sans DATABASE_URL, une base SQLite
+temporaire est utilisée :
+
+    python -m benchmarks.bench_serialization --rows 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_serialization.db')}"
+)
+os.environ.setdefault("EMAIL_DISPATCHER_ENABLED", "false")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db.database import SessionLocal, create_tables, dispose_async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import LeaveRequest, LeaveStatus, LeaveType, User  # noqa: E402
+from app.utils.fast_json import orjson  # noqa: E402
+
+PATHS = ("/api/leave-requests/", "/api/leave-requests/details")
+
+
+def setup(rows: int) -> str:
+    db = SessionLocal()
+    try:
+        tag = uuid.uuid4().hex[:8]
+        leave_type = LeaveType(name=f"Bench {tag}", default_days=25)
+        employee = User(email=f"serial-{tag}@conges.fr", first_name="Bench", last_name="Employé",
+                        hashed_password="-", is_active=True)
+        approver = User(email=f"serial-approver-{tag}@conges.fr", first_name="Bench", last_name="Approbateur",
+                        hashed_password="-", is_active=True, is_approver=True)
+        db.add_all([leave_type, employee, approver])
+        db.flush()
+        first_day = date(2000, 1, 3)
+        db.execute(insert(LeaveRequest), [
+            {
+                "employee_id": employee.id, "leave_type_id": leave_type.id, "approver_id": approver.id,
+                "start_date": first_day + timedelta(days=i), "end_date": first_day + timedelta(days=i),
+                "days_count": 1.0, "status": LeaveStatus.APPROVED.value, "comment": f"Demande {i}",
+                "response_comment": "Accordé",
+            }
+            for i in range(rows)
+        ])
+        db.commit()
+        return create_access_token(approver.id)
+    finally:
+        db.close()
+
+
+async def measure(rows: int, iterations: int, token: str):
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    results, bodies = {}, {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for fast in (False, True):
+            settings.FAST_JSON_ENABLED = fast
+            for path in PATHS:
+                url = f"{path}?limit={rows}"
+                response = await client.get(url, headers=headers)
+                bodies[(fast, path)] = response.json()
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    await client.get(url, headers=headers)
+                results[(fast, path)] = (time.perf_counter() - started) / iterations
+    await dispose_async_engine()
+    return results, bodies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    if orjson is None:
+        sys.exit("orjson n'est pas installé : le chemin rapide est indisponible")
+
+    create_tables()
+    token = setup(args.rows)
+    results, bodies = asyncio.run(measure(args.rows, args.iterations, token))
+
+    for path in PATHS:
+        slow, fast = results[(False, path)], results[(True, path)]
+        print(f"{path:<30} standard : {slow * 1000:7.1f} ms ({slow / args.rows * 1e6:5.1f} µs/ligne)  "
+              f"rapide : {fast * 1000:7.1f} ms ({fast / args.rows * 1e6:5.1f} µs/ligne)  x{slow / fast:.1f}")
+        if bodies[(False, path)] != bodies[(True, path)]:
+            print(f"  réponses différentes pour {path}")
+            print("  standard :", json.dumps(bodies[(False, path)][:1], ensure_ascii=False))
+            print("  rapide   :", json.dumps(bodies[(True, path)][:1], ensure_ascii=False))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Temps d'import au démarrage : résumé de python -X importtime pour app.main.
+
+Lance --runs fois un interpréteur neuf qui importe --module, garde pour chaque
+module le meilleur temps des exécutions (le moins bruité), puis affiche le total,
+les paquets les plus coûteux (temps propre cumulé par paquet de premier niveau)
+et les modules au temps cumulé le plus élevé. Les modules de --deferred (emails
+et jose par défaut) ne doivent être importés qu'au premier usage : leur présence
+au démarrage fait échouer le script, comme un total supérieur à --max-ms.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 5 --json import_time.json --max-ms 1500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Import = (temps propre, temps cumulé) en microsecondes
+Timings = Dict[str, Tuple[int, int]]
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str) -> Timings:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'import_time.db')}")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Échec de l'import de {module} :\n{result.stderr}")
+
+    timings: Timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def best_of(runs: List[Timings]) -> Timings:
+    best: Timings = {}
+    for timings in runs:
+        for name, (self_us, cumulative_us) in timings.items():
+            if name not in best or cumulative_us < best[name][1]:
+                best[name] = (self_us, cumulative_us)
+    return best
+
+
+def by_package(timings: Timings) -> List[Tuple[str, int]]:
+    totals: Dict[str, int] = defaultdict(int)
+    for name, (self_us, _) in timings.items():
+        totals[name.split(".", 1)[0]] += self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--deferred", nargs="*", default=["emails", "jose"],
+                        help="modules qui ne doivent pas être importés au démarrage")
+    parser.add_argument("--max-ms", type=float, default=None, help="échec au-delà de ce total")
+    parser.add_argument("--json", help="fichier où écrire le résumé")
+    args = parser.parse_args()
+
+    timings = best_of([measure(args.module) for _ in range(args.runs)])
+    total_ms = timings[args.module][1] / 1000
+    packages = by_package(timings)
+    modules = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)
+    imported_deferred = [name for name in args.deferred if name in timings]
+
+    print(f"{args.module} : {total_ms:.1f} ms, {len(timings)} modules (meilleur de {args.runs})")
+    print(f"\n{'paquet':<30} {'propre (ms)':>12}")
+    for name, self_us in packages[:args.top]:
+        print(f"{name:<30} {self_us / 1000:12.1f}")
+    print(f"\n{'module':<50} {'cumulé (ms)':>12}")
+    for name, (_, cumulative_us) in modules[:args.top]:
+        print(f"{name:<50} {cumulative_us / 1000:12.1f}")
+
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump({
+                "module": args.module,
+                "total_ms": round(total_ms, 1),
+                "modules": len(timings),
+                "packages_ms": {name: round(self_us / 1000, 1) for name, self_us in packages[:args.top]},
+                "imported_deferred": imported_deferred,
+            }, output, indent=2)
+
+    failed = False
+    if imported_deferred:
+        print(f"\nimportés au démarrage alors qu'ils devraient être différés : {', '.join(imported_deferred)}")
+        failed = True
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"\ntotal {total_ms:.1f} ms au-delà du seuil de {args.max_ms:.1f} ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
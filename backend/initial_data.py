@@ -1,22 +1,34 @@
 import logging
 
+from sqlalchemy import select
+
 from app.db.database import SessionLocal
+from app.models import User
 from app.utils.init_db import init_db
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def init() -> None:
+def init() -> bool:
     db = SessionLocal()
-    init_db(db)
+    try:
+        # Idempotent : rien n'est créé si la base contient déjà des utilisateurs
+        if db.scalar(select(User.id).limit(1)) is not None:
+            return False
+        init_db(db)
+        return True
+    finally:
+        db.close()
 
 
 def main() -> None:
     logger.info("Création des données initiales")
-    init()
-    logger.info("Données initiales créées")
+    if init():
+        logger.info("Données initiales créées")
+    else:
+        logger.info("Données déjà présentes, rien à créer")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
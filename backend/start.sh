@@ -1,11 +1,34 @@
 #!/bin/bash
+set -e
 
-# Attendre que la base de données soit prête
+# APP_ENV=development : code rechargé à chaque modification et données de test
+# créées au premier démarrage ; sinon démarrage de production, sans --reload
+APP_ENV="${APP_ENV:-production}"
+if [ "$APP_ENV" = "development" ]; then
+    SEED_DATA="${SEED_DATA:-true}"
+fi
+
+# Attendre que la base de données accepte les connexions
 echo "Attente de la base de données..."
-sleep 5
+python -m app.utils.wait_for_db --timeout "${DB_WAIT_TIMEOUT:-60}"
+
+# Appliquer les migrations du schéma, une seule fois avant de lancer les workers
+alembic upgrade head
+
+# Initialiser les données de test (ignoré si la base contient déjà des utilisateurs)
+if [ "${SEED_DATA:-false}" = "true" ]; then
+    python initial_data.py
+fi
 
-# Initialiser les données de test
-python initial_data.py
+# Métriques Prometheus agrégées entre les workers : fichiers partagés, vidés au démarrage
+if [ "${METRICS_ENABLED:-false}" = "true" ] && [ "$APP_ENV" != "development" ]; then
+    export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+    rm -f "$PROMETHEUS_MULTIPROC_DIR"/*.db
+fi
 
 # Démarrer l'application
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
\ No newline at end of file
+if [ "$APP_ENV" = "development" ]; then
+    exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
+fi
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers "${WEB_CONCURRENCY:-2}" --proxy-headers
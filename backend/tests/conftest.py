@@ -0,0 +1,96 @@
+import datetime
+import os
+import tempfile
+from typing import AsyncIterator, Callable, Dict, Iterator
+
+# Configuration fixée avant l'import de l'application : base SQLite jetable (ou
+# TEST_DATABASE_URL), hachage rapide et sans pool de processus, pas d'envoi d'emails
+os.environ["DATABASE_URL"] = os.environ.get(
+    "TEST_DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["EMAIL_DISPATCHER_ENABLED"] = "false"
+os.environ["EMAIL_FROM"] = "noreply@conges.example.com"
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.core.cache import principal_cache  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.crud import leave_type_catalog  # noqa: E402
+from app.db.database import Base, SessionLocal, engine  # noqa: E402
+from app.db.database import dispose_async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import LeaveType, User  # noqa: E402
+from app.utils.init_db import init_db  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def database() -> Iterator[None]:
+    # Base recréée et données de démonstration rechargées pour chaque test
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        init_db(db)
+    finally:
+        db.close()
+    leave_type_catalog.invalidate()
+    principal_cache.clear()
+    yield
+
+
+@pytest.fixture
+def db() -> Iterator[Session]:
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+async def client() -> AsyncIterator[httpx.AsyncClient]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        yield http
+    # Connexions asynchrones liées à la boucle du test
+    await dispose_async_engine()
+
+
+@pytest.fixture
+def auth(db: Session) -> Callable[[str], Dict[str, str]]:
+    def headers(email: str) -> Dict[str, str]:
+        user = db.query(User).filter(User.email == email).one()
+        return {"Authorization": f"Bearer {create_access_token(user.id)}"}
+
+    return headers
+
+
+@pytest.fixture
+def leave_type_id(db: Session) -> Callable[[str], int]:
+    def lookup(name: str) -> int:
+        return db.query(LeaveType).filter(LeaveType.name == name).one().id
+
+    return lookup
+
+
+def next_monday(year: int, month: int) -> datetime.date:
+    day = datetime.date(year, month, 1)
+    return day + datetime.timedelta(days=(7 - day.weekday()) % 7)
+
+
+@pytest.fixture
+def february_week() -> Callable[[int], Dict[str, str]]:
+    # Semaines ouvrées de février de l'an prochain : aucun jour férié
+    monday = next_monday(datetime.date.today().year + 1, 2)
+
+    def week(index: int = 0) -> Dict[str, str]:
+        start = monday + datetime.timedelta(weeks=index)
+        end = start + datetime.timedelta(days=4)
+        return {"start_date": start.isoformat(), "end_date": end.isoformat()}
+
+    return week
@@ -0,0 +1,50 @@
+from app.core.config import settings
+from app.crud import USERS_CACHE, bump_cache_generation
+from app.models import User
+
+
+async def test_login_returns_usable_token(client):
+    response = await client.post(
+        "/api/auth/login",
+        data={"username": "employee1@example.com", "password": "employee123"},
+    )
+    token = response.json()["access_token"]
+
+    me = await client.get("/api/users/me", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert me.json()["email"] == "employee1@example.com"
+
+
+async def test_login_rejects_wrong_password(client):
+    response = await client.post(
+        "/api/auth/login",
+        data={"username": "employee1@example.com", "password": "nope"},
+    )
+
+    assert response.status_code == 401
+
+
+async def test_invalid_token_is_rejected(client):
+    response = await client.get(
+        "/api/users/me", headers={"Authorization": "Bearer invalide"}
+    )
+
+    assert response.status_code == 401
+
+
+async def test_deactivation_by_another_worker_is_seen(client, db, auth, monkeypatch):
+    monkeypatch.setattr(settings, "PRINCIPAL_CACHE_CHECK_SECONDS", 0)
+    headers = auth("employee1@example.com")
+    assert (await client.get("/api/users/me", headers=headers)).status_code == 200
+
+    # Modification faite par un autre worker : seule la génération "users" avance,
+    # le principal en cache dans ce worker n'est pas retiré
+    user = db.query(User).filter(User.email == "employee1@example.com").one()
+    user.is_active = False
+    bump_cache_generation(db, USERS_CACHE)
+    db.commit()
+
+    response = await client.get("/api/users/me", headers=headers)
+
+    assert response.status_code == 403
@@ -0,0 +1,74 @@
+import io
+
+from app.models import LeaveBalance, LeaveRequest, User
+from app.services.bulk_import import bulk_import
+
+
+def _import(db, kind, csv):
+    return bulk_import(db, kind, io.StringIO(csv), "csv")
+
+
+def test_mixed_case_email_is_matched_across_imports(db):
+    users = _import(
+        db,
+        "users",
+        "email,first_name,last_name,password\n"
+        "Jean.Dupont@example.com,Jean,Dupont,secret123\n",
+    )
+    duplicate = _import(
+        db,
+        "users",
+        "email,first_name,last_name,password\n"
+        "jean.dupont@example.com,Jean,Dupont,secret123\n",
+    )
+    balances = _import(
+        db,
+        "leave_balances",
+        "user_email,leave_type,year,balance\n"
+        "JEAN.DUPONT@example.com,Congés payés,2027,25\n",
+    )
+    requests = _import(
+        db,
+        "leave_requests",
+        "employee_email,leave_type,start_date,end_date\n"
+        "jean.DUPONT@example.com,Congés payés,2027-02-01,2027-02-05\n",
+    )
+
+    assert (users.imported, duplicate.imported) == (1, 0)
+    assert (balances.imported, balances.errors) == (1, [])
+    assert (requests.imported, requests.errors) == (1, [])
+    user = db.query(User).filter(User.email == "jean.dupont@example.com").one()
+    assert db.query(LeaveBalance).filter(LeaveBalance.user_id == user.id).count() == 1
+    assert (
+        db.query(LeaveRequest).filter(LeaveRequest.employee_id == user.id).count() == 1
+    )
+
+
+def test_existing_mixed_case_account_is_matched(db):
+    # Compte créé hors import, avec sa casse d'origine
+    _import(
+        db,
+        "users",
+        "email,first_name,last_name,password\n"
+        "marie.curie@example.com,Marie,Curie,secret123\n",
+    )
+    db.query(User).filter(User.email == "marie.curie@example.com").update(
+        {"email": "Marie.Curie@example.com"}
+    )
+    db.commit()
+
+    duplicate = _import(
+        db,
+        "users",
+        "email,first_name,last_name,password\n"
+        "marie.curie@example.com,Marie,Curie,secret123\n",
+    )
+    balances = _import(
+        db,
+        "leave_balances",
+        "user_email,leave_type,year,balance\n"
+        "marie.curie@example.com,Congés payés,2027,25\n",
+    )
+
+    assert duplicate.imported == 0
+    assert balances.imported == 1
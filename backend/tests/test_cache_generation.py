@@ -0,0 +1,43 @@
+from app.crud import bump_cache_generation, get_cache_generation
+from app.models import User
+
+NAME = "test_cache"
+
+
+def test_bump_applied_once_at_commit(db):
+    bump_cache_generation(db, NAME)
+    bump_cache_generation(db, NAME)
+    # Rien n'est écrit avant le commit
+    assert get_cache_generation(db, NAME) == 0
+
+    db.commit()
+
+    assert get_cache_generation(db, NAME) == 1
+
+
+def test_bump_discarded_on_rollback(db):
+    bump_cache_generation(db, NAME)
+    db.rollback()
+    db.commit()
+
+    assert get_cache_generation(db, NAME) == 0
+
+
+def test_bump_survives_savepoint_rollback(db):
+    bump_cache_generation(db, NAME)
+    savepoint = db.begin_nested()
+    db.add(User(email="temp@example.com", hashed_password="x"))
+    savepoint.rollback()
+    db.commit()
+
+    assert get_cache_generation(db, NAME) == 1
+
+
+def test_bump_waits_for_outer_commit(db):
+    with db.begin_nested():
+        bump_cache_generation(db, NAME)
+    assert get_cache_generation(db, NAME) == 0
+
+    db.commit()
+
+    assert get_cache_generation(db, NAME) == 1
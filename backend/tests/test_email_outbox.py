@@ -0,0 +1,31 @@
+from collections import Counter
+
+from app.crud import claim_due_emails, enqueue_email
+from app.models import EmailOutbox
+
+APPROVER = "approver1@example.com"
+
+
+def _enqueue(db, recipient, count, digest):
+    for _ in range(count):
+        enqueue_email(
+            db,
+            recipient=recipient,
+            subject="Nouvelle demande",
+            template="leave_request",
+            context={},
+            digest=digest,
+        )
+    db.commit()
+
+
+def test_digest_claims_every_due_notification_of_the_recipient(db):
+    db.query(EmailOutbox).delete()
+    _enqueue(db, APPROVER, 5, digest=True)
+    _enqueue(db, "approver2@example.com", 3, digest=False)
+
+    claimed = claim_due_emails(db, limit=2, lease_seconds=60)
+
+    # Le lot de 2 contient des notifications à résumer : toutes celles du
+    # destinataire sont réservées, les autres messages attendent le lot suivant
+    assert Counter(email.recipient for email in claimed) == {APPROVER: 5}
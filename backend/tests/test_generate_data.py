@@ -0,0 +1,33 @@
+import datetime
+
+import pytest
+
+from app.utils.generate_data import DataGenerator
+
+OPTIONS = dict(
+    users=5,
+    leave_types=4,
+    years=1,
+    requests_per_user=2,
+    end_year=2030,
+    seed=1,
+    chunk_size=10,
+    domain="gen.example.com",
+    password="password123",
+)
+
+
+def test_generator_requires_an_approver(db):
+    with pytest.raises(ValueError):
+        DataGenerator(db, approvers=0, **OPTIONS)
+
+
+def test_status_cutoff_does_not_depend_on_the_current_date(db):
+    generator = DataGenerator(db, approvers=1, **OPTIONS)
+    explicit = DataGenerator(
+        db, approvers=1, today=datetime.date(2030, 3, 1), **OPTIONS
+    )
+
+    assert generator.today == datetime.date(2030, 7, 1)
+    assert explicit.today == datetime.date(2030, 3, 1)
+    assert generator.run().leave_requests > 0
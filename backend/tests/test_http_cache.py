@@ -0,0 +1,97 @@
+from app.crud import recompute_days_counts
+from app.models import LeaveRequest
+
+EMPLOYEE = "employee2@example.com"
+APPROVER = "approver1@example.com"
+
+
+async def test_leave_types_revalidate_with_etag(client, auth):
+    first = await client.get("/api/leave-types/", headers=auth(EMPLOYEE))
+    etag = first.headers["ETag"]
+
+    cached = await client.get(
+        "/api/leave-types/", headers={**auth(EMPLOYEE), "If-None-Match": etag}
+    )
+
+    assert first.status_code == 200
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+async def test_leave_types_etag_changes_after_update(client, auth, leave_type_id):
+    etag = (await client.get("/api/leave-types/", headers=auth(EMPLOYEE))).headers[
+        "ETag"
+    ]
+
+    updated = await client.put(
+        f"/api/leave-types/{leave_type_id('Congé sans solde')}",
+        headers=auth("admin@example.com"),
+        json={"description": "Nouvelle description"},
+    )
+    response = await client.get(
+        "/api/leave-types/", headers={**auth(EMPLOYEE), "If-None-Match": etag}
+    )
+
+    assert updated.status_code == 200
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+async def test_calendar_etag_changes_after_approval(
+    client, auth, leave_type_id, february_week
+):
+    period = february_week()
+    year, month = period["start_date"][:4], int(period["start_date"][5:7])
+    url = f"/api/leave-requests/calendar/{year}/{month}"
+    etag = (await client.get(url, headers=auth(EMPLOYEE))).headers["ETag"]
+
+    leave_request = (
+        await client.post(
+            "/api/leave-requests/",
+            headers=auth(EMPLOYEE),
+            json={"leave_type_id": leave_type_id("Congés payés"), **period},
+        )
+    ).json()
+    unchanged = await client.get(url, headers={**auth(EMPLOYEE), "If-None-Match": etag})
+    await client.post(
+        f"/api/leave-requests/{leave_request['id']}/approve",
+        headers=auth(APPROVER),
+        json={"status": "approved"},
+    )
+    changed = await client.get(url, headers={**auth(EMPLOYEE), "If-None-Match": etag})
+
+    # Une demande en attente n'apparaît pas au calendrier : même ETag
+    assert unchanged.status_code == 304
+    assert changed.status_code == 200
+    assert [item["id"] for item in changed.json()] == [leave_request["id"]]
+
+
+async def test_calendar_etag_changes_after_days_recompute(
+    client, db, auth, leave_type_id, february_week
+):
+    period = february_week()
+    year, month = period["start_date"][:4], int(period["start_date"][5:7])
+    url = f"/api/leave-requests/calendar/{year}/{month}"
+    leave_request = (
+        await client.post(
+            "/api/leave-requests/",
+            headers=auth(EMPLOYEE),
+            json={"leave_type_id": leave_type_id("Congés payés"), **period},
+        )
+    ).json()
+    await client.post(
+        f"/api/leave-requests/{leave_request['id']}/approve",
+        headers=auth(APPROVER),
+        json={"status": "approved"},
+    )
+    # days_count calculé par une ancienne règle
+    db.get(LeaveRequest, leave_request["id"]).days_count = 7
+    db.commit()
+    etag = (await client.get(url, headers=auth(EMPLOYEE))).headers["ETag"]
+
+    _, updated = recompute_days_counts(db)
+    response = await client.get(url, headers={**auth(EMPLOYEE), "If-None-Match": etag})
+
+    assert updated == 1
+    assert response.status_code == 200
+    assert response.json()[0]["days_count"] == 5
@@ -0,0 +1,347 @@
+import datetime
+
+from sqlalchemy import event
+
+from app.crud import get_user_leave_balance_by_type
+from app.db.database import engine
+from app.models import EmailOutbox, LeaveRequest, LeaveStatus, User
+
+EMPLOYEE = "employee2@example.com"
+APPROVER = "approver1@example.com"
+
+
+def _balance(db, email, leave_type_id):
+    user = db.query(User).filter(User.email == email).one()
+    db.expire_all()
+    return get_user_leave_balance_by_type(
+        db, user_id=user.id, leave_type_id=leave_type_id
+    ).balance
+
+
+async def _submit(client, auth, leave_type_id, period, email=EMPLOYEE):
+    return await client.post(
+        "/api/leave-requests/",
+        headers=auth(email),
+        json={"leave_type_id": leave_type_id, **period},
+    )
+
+
+async def test_create_queues_notification_in_outbox(
+    client, db, auth, leave_type_id, february_week
+):
+    response = await _submit(
+        client, auth, leave_type_id("Congés payés"), february_week()
+    )
+
+    assert response.status_code == 200
+    assert response.json()["days_count"] == 5
+    recipients = {email.recipient for email in db.query(EmailOutbox).all()}
+    assert {"approver1@example.com", "approver2@example.com"} <= recipients
+
+
+async def test_create_rejects_overlapping_period(
+    client, auth, leave_type_id, february_week
+):
+    paid = leave_type_id("Congés payés")
+    assert (await _submit(client, auth, paid, february_week())).status_code == 200
+
+    response = await _submit(client, auth, paid, february_week())
+
+    assert response.status_code == 409
+    assert (await _submit(client, auth, paid, february_week(1))).status_code == 200
+
+
+async def test_approve_debits_balance(client, db, auth, leave_type_id, february_week):
+    paid = leave_type_id("Congés payés")
+    before = _balance(db, EMPLOYEE, paid)
+    leave_request = (await _submit(client, auth, paid, february_week())).json()
+
+    response = await client.post(
+        f"/api/leave-requests/{leave_request['id']}/approve",
+        headers=auth(APPROVER),
+        json={"status": "approved"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "approved"
+    assert _balance(db, EMPLOYEE, paid) == before - 5
+
+
+async def test_approve_refuses_insufficient_balance(
+    client, db, auth, leave_type_id, february_week
+):
+    compensatory = leave_type_id("Repos compensatoire")  # 5 jours
+    first = (await _submit(client, auth, compensatory, february_week())).json()
+    second = (await _submit(client, auth, compensatory, february_week(1))).json()
+    decide = {"status": "approved"}
+
+    ok = await client.post(
+        f"/api/leave-requests/{first['id']}/approve",
+        headers=auth(APPROVER),
+        json=decide,
+    )
+    refused = await client.post(
+        f"/api/leave-requests/{second['id']}/approve",
+        headers=auth(APPROVER),
+        json=decide,
+    )
+
+    assert ok.status_code == 200
+    assert refused.status_code == 400
+    assert db.get(LeaveRequest, second["id"]).status == "pending"
+    assert _balance(db, EMPLOYEE, compensatory) == 0
+
+
+async def test_batch_applies_each_decision_independently(
+    client, db, auth, leave_type_id, february_week
+):
+    compensatory = leave_type_id("Repos compensatoire")
+    first = (await _submit(client, auth, compensatory, february_week())).json()
+    second = (await _submit(client, auth, compensatory, february_week(1))).json()
+    third = (
+        await _submit(client, auth, leave_type_id("Congés payés"), february_week(2))
+    ).json()
+
+    response = await client.post(
+        "/api/leave-requests/approve-batch",
+        headers=auth(APPROVER),
+        json={
+            "decisions": [
+                {"id": first["id"], "status": "approved"},
+                {"id": second["id"], "status": "approved"},
+                {"id": third["id"], "status": "rejected"},
+                {"id": 999999, "status": "approved"},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["processed"], body["failed"]) == (2, 2)
+    assert [result["outcome"] for result in body["results"]] == [
+        "approved",
+        "insufficient_balance",
+        "rejected",
+        "not_found",
+    ]
+    assert _balance(db, EMPLOYEE, compensatory) == 0
+
+
+async def test_batch_rejects_duplicate_ids(client, auth):
+    response = await client.post(
+        "/api/leave-requests/approve-batch",
+        headers=auth(APPROVER),
+        json={
+            "decisions": [
+                {"id": 1, "status": "approved"},
+                {"id": 1, "status": "rejected"},
+            ]
+        },
+    )
+
+    assert response.status_code == 422
+
+
+async def test_cursor_pagination_walks_every_request(
+    client, auth, leave_type_id, february_week
+):
+    for index in range(5):
+        await _submit(
+            client, auth, leave_type_id("Congé sans solde"), february_week(index)
+        )
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(
+            "/api/leave-requests/me", headers=auth(EMPLOYEE), params=params
+        )
+        assert response.status_code == 200
+        seen.extend(leave_request["id"] for leave_request in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    # 5 demandes créées + celle des données de démonstration, sans doublon
+    assert len(seen) == len(set(seen)) == 6
+
+
+async def test_invalid_cursor_is_rejected(client, auth):
+    response = await client.get(
+        "/api/leave-requests/me", headers=auth(EMPLOYEE), params={"cursor": "x"}
+    )
+
+    assert response.status_code == 400
+
+
+async def test_overlap_detected_despite_overlapping_history(
+    client, db, auth, leave_type_id
+):
+    # Historique importé ou antérieur au contrôle : demandes qui se chevauchent
+    employee = db.query(User).filter(User.email == EMPLOYEE).one()
+    year = datetime.date.today().year + 1
+    for start, end in ((1, 30), (10, 12)):
+        db.add(
+            LeaveRequest(
+                employee_id=employee.id,
+                leave_type_id=leave_type_id("Congé sans solde"),
+                start_date=datetime.date(year, 6, start),
+                end_date=datetime.date(year, 6, end),
+                days_count=1,
+                status=LeaveStatus.APPROVED,
+            )
+        )
+    db.commit()
+
+    response = await _submit(
+        client,
+        auth,
+        leave_type_id("Congé sans solde"),
+        {"start_date": f"{year}-06-22", "end_date": f"{year}-06-24"},
+    )
+
+    assert response.status_code == 409
+
+
+async def test_batch_rejects_pending_as_a_decision(
+    client, db, auth, leave_type_id, february_week
+):
+    leave_request = (
+        await _submit(client, auth, leave_type_id("Congés payés"), february_week())
+    ).json()
+    outbox_before = db.query(EmailOutbox).count()
+
+    response = await client.post(
+        "/api/leave-requests/approve-batch",
+        headers=auth(APPROVER),
+        json={"decisions": [{"id": leave_request["id"], "status": "pending"}]},
+    )
+
+    assert response.status_code == 422
+    stored = db.get(LeaveRequest, leave_request["id"])
+    assert stored.approver_id is None
+    assert db.query(EmailOutbox).count() == outbox_before
+
+
+async def test_approve_rejects_pending_as_a_decision(
+    client, auth, leave_type_id, february_week
+):
+    leave_request = (
+        await _submit(client, auth, leave_type_id("Congés payés"), february_week())
+    ).json()
+
+    response = await client.post(
+        f"/api/leave-requests/{leave_request['id']}/approve",
+        headers=auth(APPROVER),
+        json={"status": "pending"},
+    )
+
+    assert response.status_code == 422
+
+
+async def test_approve_locks_rows_in_batch_order(
+    client, auth, leave_type_id, february_week
+):
+    # Même ordre que l'approbation par lot : demande, solde, occupation, génération
+    leave_request = (
+        await _submit(client, auth, leave_type_id("Congés payés"), february_week())
+    ).json()
+    tables = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        for table in (
+            "leave_requests",
+            "leave_balances",
+            "daily_occupancy",
+            "cache_generations",
+        ):
+            if statement.startswith(("UPDATE", "INSERT")) and f" {table} " in statement:
+                tables.append(table)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = await client.post(
+            f"/api/leave-requests/{leave_request['id']}/approve",
+            headers=auth(APPROVER),
+            json={"status": "approved"},
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    # Ordre de la première écriture de chaque table
+    assert list(dict.fromkeys(tables)) == [
+        "leave_requests",
+        "leave_balances",
+        "daily_occupancy",
+        "cache_generations",
+    ]
+
+
+async def test_period_without_working_days_is_rejected(
+    client, auth, leave_type_id, february_week
+):
+    paid = leave_type_id("Congés payés")
+    monday = datetime.date.fromisoformat(february_week()["start_date"])
+    weekend = {
+        "start_date": (monday - datetime.timedelta(days=2)).isoformat(),
+        "end_date": (monday - datetime.timedelta(days=1)).isoformat(),
+    }
+    leave_request = (await _submit(client, auth, paid, february_week())).json()
+
+    created = await _submit(client, auth, paid, weekend)
+    updated = await client.put(
+        f"/api/leave-requests/{leave_request['id']}",
+        headers=auth(EMPLOYEE),
+        json=weekend,
+    )
+
+    assert created.status_code == 400
+    assert updated.status_code == 400
+
+
+async def test_request_longer_than_the_maximum_span_is_rejected(
+    client, auth, leave_type_id, february_week
+):
+    paid = leave_type_id("Congé sans solde")
+    period = february_week()
+    start = datetime.date.fromisoformat(period["start_date"])
+    too_long = (start + datetime.timedelta(days=367)).isoformat()
+    leave_request = (await _submit(client, auth, paid, period)).json()
+
+    created = await _submit(
+        client, auth, paid, {"start_date": period["start_date"], "end_date": too_long}
+    )
+    updated = await client.put(
+        f"/api/leave-requests/{leave_request['id']}",
+        headers=auth(EMPLOYEE),
+        json={"end_date": too_long},
+    )
+
+    assert created.status_code == 422
+    assert updated.status_code == 400
+
+
+async def test_overlap_with_a_request_of_the_maximum_span_is_detected(
+    client, auth, leave_type_id, february_week
+):
+    paid = leave_type_id("Congé sans solde")
+    start = datetime.date.fromisoformat(february_week()["start_date"])
+    end = start + datetime.timedelta(days=366)
+    assert (
+        await _submit(
+            client,
+            auth,
+            paid,
+            {"start_date": start.isoformat(), "end_date": end.isoformat()},
+        )
+    ).status_code == 200
+    # Dernier jour ouvré de la demande (février : aucun jour férié)
+    while end.weekday() >= 5:
+        end -= datetime.timedelta(days=1)
+
+    response = await _submit(
+        client, auth, paid, {"start_date": end.isoformat(), "end_date": end.isoformat()}
+    )
+
+    assert response.status_code == 409
@@ -0,0 +1,32 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import exc
+
+from app.db.database import InstrumentedQueuePool
+
+
+def _pool() -> InstrumentedQueuePool:
+    return InstrumentedQueuePool(
+        lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.01
+    )
+
+
+def test_idle_connection_is_not_counted_as_a_wait():
+    pool = _pool()
+    pool.connect().close()
+
+    pool.connect().close()
+
+    assert (pool.stats()["checkouts"], pool.stats()["waits"]) == (2, 0)
+
+
+def test_checkout_on_a_busy_pool_is_counted_as_a_wait():
+    pool = _pool()
+    held = pool.connect()
+
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+    held.close()
+
+    assert (pool.stats()["waits"], pool.stats()["timeouts"]) == (1, 1)
@@ -20,6 +20,15 @@ export const leaveRequestService = {
     return response.data;
   },
   
+  // Récupérer une page de demandes avec les noms (employé, approbateur, type) en un seul appel
+  getLeaveRequestDetails: async (params = {}) => {
+    const response = await api.get('/leave-requests/details', { params });
+    return {
+      items: response.data,
+      nextCursor: response.headers['x-next-cursor'] || null
+    };
+  },
+  
   // Récupérer une demande de congé par ID
   getLeaveRequest: async (id) => {
     const response = await api.get(`/leave-requests/${id}`);